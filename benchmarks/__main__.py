@@ -0,0 +1,127 @@
+"""
+Run benchmarks and compare results with stored baseline::
+
+    $ python -m benchmarks --sizes 10,1000 --save
+    $ python -m benchmarks --sizes 10,1000
+"""
+
+from argparse import ArgumentParser
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from benchmarks.cases import CASES, Case
+from benchmarks.layouts import LAYOUTS
+
+Result = Dict[str, float]
+
+DEFAULT_BASELINE = os.path.join('.tmp', 'benchmarks', 'baseline.json')
+DEFAULT_SIZES = '10,1000,100000,1000000'
+MIN_TIME_DIFF = 0.001  # seconds, timing differences below are noise
+
+
+def measure(case: Case, data: Dict[str, Any], repeat: int) -> Result:
+    # time, best of repeat
+    best = float('inf')
+    for _ in range(repeat):
+        state = case.setup(data)
+        gc.collect()
+        start = time.perf_counter()
+        case.run(state)
+        best = min(best, time.perf_counter() - start)
+        case.teardown(state)
+    # peak memory, separate run because tracing slows down execution
+    state = case.setup(data)
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    result = case.run(state)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    case.teardown(state)
+    return {
+        'time': best,
+        'peak': float(peak - base),
+        'retained': float(current - base),
+    }
+
+
+def compare(result: Result, baseline: Optional[Result], tolerance: float) -> str:
+    if baseline is None:
+        return ''
+    marks = []
+    for metric in ('time', 'peak'):
+        old, new = baseline[metric], result[metric]
+        ratio = new / old if old else 1.0
+        regressed = ratio > 1 + tolerance and not (
+            metric == 'time' and new - old < MIN_TIME_DIFF
+        )
+        marks.append('{}{} x{:.2f}'.format('!' if regressed else '', metric, ratio))
+    return ', '.join(marks)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--layouts', default=','.join(LAYOUTS))
+    parser.add_argument('--sizes', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-limits', action='store_true', help='ignore case limits')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help='save results as baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, Result] = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results: Dict[str, Result] = {}
+    regressions = 0
+    for size in (int(s) for s in args.sizes.split(',')):
+        for layout in args.layouts.split(','):
+            data = LAYOUTS[layout](size)
+            for name in args.cases.split(','):
+                case = CASES[name]()
+                if not case.available():
+                    continue
+                if case.limit is not None and size > case.limit and not args.no_limits:
+                    continue
+                key = '{}[{}-{}]'.format(name, layout, size)
+                result = results[key] = measure(case, data, repeat=args.repeat)
+                cmp = compare(result, baseline.get(key), tolerance=args.tolerance)
+                regressions += cmp.count('!')
+                print(
+                    '{:<36} {:>12.6f} s {:>12.1f} KiB {:>8.1f} B/node  {}'.format(
+                        key,
+                        result['time'],
+                        result['peak'] / 1024,
+                        result['retained'] / size,
+                        cmp,
+                    )
+                )
+                sys.stdout.flush()
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print('Baseline saved to {}'.format(args.baseline))
+    elif regressions:
+        print(
+            '{} regression(s) above {:.0%} tolerance'.format(
+                regressions, args.tolerance
+            )
+        )
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
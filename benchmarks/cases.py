@@ -0,0 +1,299 @@
+"""
+Benchmarked operations. Each case prepares state in ``setup``, which is excluded
+from measurement, runs measured operation in ``run``, and cleans up in ``teardown``.
+Value returned by ``run`` is kept alive until memory is measured, to report memory
+retained by the result.
+"""
+
+import os
+from typing import Any, Callable, Dict, Optional
+
+from dirlay import Dir, key as split_key
+from dirlay.content import FileRef
+from dirlay.types import StrDict
+
+
+class Case:
+    name = ''
+    limit: Optional[int] = None  # max number of entries, to keep default runs sane
+
+    def available(self) -> bool:
+        return True
+
+    def setup(self, data: StrDict) -> Any:
+        return Dir(data)
+
+    def run(self, state: Any) -> Any:
+        raise NotImplementedError
+
+    def teardown(self, state: Any) -> None:
+        pass
+
+
+class Construct(Case):
+    name = 'construct'
+
+    def setup(self, data: StrDict) -> Any:
+        return data
+
+    def run(self, state: StrDict) -> Any:
+        return Dir(state)
+
+
+class Compact(Case):
+    name = 'compact'
+
+    def run(self, state: Dir) -> Any:
+        return state.compact()
+
+
+class TraverseCompact(Case):
+    name = 'traverse_compact'
+
+    def setup(self, data: StrDict) -> Any:
+        tree = Dir(data).compact()
+        return tree._tree, tree.keys()
+
+    def run(self, state: Any) -> None:
+        nested, keys = state
+        traverse = nested._traverse
+        for key in keys:
+            traverse(key, create_parents=False, base=nested.data)
+
+
+class Traverse(Case):
+    name = 'traverse'
+
+    def setup(self, data: StrDict) -> Any:
+        tree = Dir(data)
+        return tree._tree, tree.keys()
+
+    def run(self, state: Any) -> None:
+        nested, keys = state
+        traverse = nested._traverse
+        for key in keys:
+            traverse(key, create_parents=False, base=nested.data)
+
+
+class Contains(Case):
+    name = 'contains'
+
+    def setup(self, data: StrDict) -> Any:
+        tree = Dir(data)
+        return tree, tree.keys()
+
+    def run(self, state: Any) -> None:
+        tree, keys = state
+        for path in keys:
+            if path not in tree:
+                raise KeyError(path)
+
+
+class ContainsKey(Contains):
+    name = 'contains_key'
+
+    def setup(self, data: StrDict) -> Any:
+        tree = Dir(data)
+        return tree, [split_key(k) for k in tree.keys()]
+
+
+class Items(Case):
+    name = 'items'
+
+    def run(self, state: Dir) -> None:
+        for _ in state.items():
+            pass
+
+
+class Walk(Case):
+    name = 'walk'
+
+    def run(self, state: Dir) -> None:
+        for _ in state.walk():
+            pass
+
+
+class Setitem(Case):
+    name = 'setitem'
+
+    def setup(self, data: StrDict) -> Any:
+        tree = Dir(data)
+        return tree, [k for k, n in tree.items() if not n.isdir]
+
+    def run(self, state: Any) -> None:
+        tree, keys = state
+        for key in keys:
+            tree[key] = ''
+
+
+class SetitemBatch(Setitem):
+    name = 'setitem_batch'
+
+    def run(self, state: Any) -> None:
+        tree, keys = state
+        with tree.batch():
+            for key in keys:
+                tree[key] = ''
+
+
+class Move(Case):
+    name = 'move'
+
+    def run(self, state: Dir) -> None:
+        for name in list(state.data):  # relink top-level entries
+            state.move(name, 'moved/' + name)
+
+
+class Mktree(Case):
+    name = 'mktree'
+    limit = 100000
+
+    def run(self, state: Dir) -> None:
+        state.mktree()
+
+    def teardown(self, state: Dir) -> None:
+        state.rmtree()
+
+
+class MktreeProcesses(Mktree):
+    name = 'mktree_processes'
+
+    def run(self, state: Dir) -> None:
+        state.mktree(workers=os.cpu_count() or 1, pool='process')
+
+
+class MktreeInclude(Mktree):
+    name = 'mktree_include'
+    include = ''
+
+    def setup(self, data: StrDict) -> Any:
+        self.include = '{}/**'.format(next(iter(data)))  # first top-level entry
+        return Dir(data)
+
+    def run(self, state: Dir) -> None:
+        state.mktree(include=self.include)
+
+
+class MktreeFileRef(Mktree):
+    name = 'fileref'
+
+    def setup(self, data: StrDict) -> Any:
+        source = Dir(data).mktree()
+        tree = Dir(data)
+        for node in source.leaves():
+            if not node.isdir:
+                tree[node.key] = FileRef(node.abspath)
+        return source, tree
+
+    def run(self, state: Any) -> None:
+        state[1].mktree()
+
+    def teardown(self, state: Any) -> None:
+        for tree in state:
+            tree.rmtree()
+
+
+class Rmtree(Case):
+    name = 'rmtree'
+    limit = 100000
+
+    def setup(self, data: StrDict) -> Any:
+        return Dir(data).mktree()
+
+    def run(self, state: Dir) -> None:
+        state.rmtree()
+
+
+class Reset(Case):
+    name = 'reset'
+    limit = 100000
+
+    def setup(self, data: StrDict) -> Any:
+        tree = Dir(data).mktree()
+        for node in tree.leaves()[::100]:  # change 1% of entries
+            if node.isdir:
+                os.rmdir(str(node.abspath))
+            else:
+                os.remove(str(node.abspath))
+        return tree
+
+    def run(self, state: Dir) -> None:
+        state.reset()
+
+    def teardown(self, state: Dir) -> None:
+        state.rmtree()
+
+
+class PatchApply(Case):
+    name = 'patch'
+    limit = 100000
+
+    def setup(self, data: StrDict) -> Any:
+        old = Dir(data).mktree()
+        new = old.copy()
+        for node in old.leaves()[::100]:  # change 1% of entries
+            new[node.key] = 'changed' if node.isdir else {}
+        return old, new
+
+    def run(self, state: Any) -> None:
+        old, new = state
+        old.diff(new).apply(old.basedir)
+
+    def teardown(self, state: Any) -> None:
+        state[0].rmtree()
+
+
+class AsRich(Case):
+    name = 'as_rich_tree'
+    limit = 10000
+
+    def available(self) -> bool:
+        try:
+            import rich  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def run(self, state: Dir) -> None:
+        state.as_rich()
+
+
+class FormatTree(Case):
+    name = 'format_tree'
+
+    def setup(self, data: StrDict) -> Any:
+        return Dir(data), open(os.devnull, 'w')
+
+    def run(self, state: Any) -> None:
+        tree, fp = state
+        tree.format_tree(fp=fp)
+
+    def teardown(self, state: Any) -> None:
+        state[1].close()
+
+
+CASES: Dict[str, Callable[[], Case]] = {
+    c.name: c
+    for c in (
+        Construct,
+        Compact,
+        Traverse,
+        TraverseCompact,
+        Contains,
+        ContainsKey,
+        Items,
+        Walk,
+        Setitem,
+        SetitemBatch,
+        Move,
+        Mktree,
+        MktreeProcesses,
+        MktreeInclude,
+        MktreeFileRef,
+        Rmtree,
+        Reset,
+        PatchApply,
+        AsRich,
+        FormatTree,
+    )
+}
@@ -0,0 +1,81 @@
+"""
+Parametrized directory layouts of given number of entries.
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict
+
+from dirlay.types import StrDict
+
+
+LINE = 'lorem ipsum dolor sit amet, consectetur adipiscing elit\n'
+
+
+def text(size: int) -> str:
+    return (LINE * (size // len(LINE) + 1))[:size]
+
+
+def wide(n: int) -> StrDict:
+    """
+    All files in a single directory.
+    """
+    return {'f{}.txt'.format(i): '' for i in range(n)}
+
+
+def deep(n: int, depth: int = 64) -> StrDict:
+    """
+    Chains of nested directories ``depth`` levels deep with a file at the bottom.
+    """
+    ret: StrDict = {}
+    chains, rest = divmod(n, depth)
+    for c in range(chains + (1 if rest else 0)):
+        levels = depth if c < chains else rest
+        node = ret['c{}'.format(c)] = {}
+        for d in range(1, levels - 1):
+            node = node.setdefault('d{}'.format(d), {})
+        if levels > 1:
+            node['f.txt'] = ''
+    return ret
+
+
+def small(n: int, files: int = 8, dirs: int = 4, size: int = 128) -> StrDict:
+    """
+    Balanced tree of many small files, ``files`` files and ``dirs`` subdirectories
+    per directory.
+    """
+    ret: StrDict = {}
+    content = text(size)
+    queue: Deque[StrDict] = deque([ret])
+    count = 0
+    while count < n:
+        node = queue.popleft()
+        for i in range(files):
+            if count == n:
+                break
+            node['f{}.txt'.format(i)] = content
+            count += 1
+        for i in range(dirs):
+            if count == n:
+                break
+            child: StrDict = {}
+            node['d{}'.format(i)] = child
+            queue.append(child)
+            count += 1
+    return ret
+
+
+def big(n: int, files: int = 10, bytes_per_entry: int = 100) -> StrDict:
+    """
+    Few big files, total size is proportional to ``n``.
+    """
+    files = min(files, n)
+    content = text(n * bytes_per_entry // files)
+    return {'f{}.bin'.format(i): content for i in range(files)}
+
+
+LAYOUTS: Dict[str, Callable[[int], StrDict]] = {
+    'wide': wide,
+    'deep': deep,
+    'small': small,
+    'big': big,
+}
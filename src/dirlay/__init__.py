@@ -1,7 +1,14 @@
+# encoding: utf-8
+from contextlib import contextmanager
+import errno
+from importlib import import_module
 import os
-import shutil
 import sys
-from tempfile import mkdtemp
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
 
 try:
     from reprlib import aRepr
@@ -10,13 +17,25 @@ try:
 except ImportError:  # pragma: no cover
     a_repr = repr
 
+# feature modules are imported on first use to keep `import dirlay` fast
+from dirlay import optional
 from dirlay.__version__ import __version__ as __version__
-from dirlay.nested_dict import NestedDict as BaseNestedDict
-from dirlay.optional import pathlib, rich
+from dirlay.content import (
+    CHUNK_SIZE,
+    CompressedContent,
+    Content,
+    SizedContent,
+    compressor,
+)
+from dirlay.nested_dict import NestedDict as BaseNestedDict, copy_tree
+from dirlay.optional import pathlib
+from dirlay.stats import MaterializationStats, Observer, perf_counter
 
 if sys.version_info > (3,):
     NestedDict = BaseNestedDict
+    TEXT = (str,)
 else:  # pragma: no cover
+    TEXT = (str, unicode)  # noqa: F821
     from collections import OrderedDict as BaseOrderedDict
 
     class OrderedDict(BaseOrderedDict):
@@ -32,21 +51,19 @@ else:  # pragma: no cover
         dict_class = OrderedDict
 
 
-if rich is not None:
-    from dirlay.format_rich import as_rich_tree, rich_print
-else:  # pragma: no cover
-    as_rich_tree = None
-
-    def rich_print(*args):
-        pass
-
-
 __all__ = [
     'Dir',
+    'FrozenDir',
+    'MaterializationStats',
     'NestedDict',
     'Node',
+    'Observer',
+    'Patch',
     'Path',
+    'Plan',
+    'WHITEOUT',
     'getcwd',
+    'key',
 ]
 
 Path = pathlib.Path
@@ -67,7 +84,8 @@ class Node(object):
 
         data (``str | dict[str, str | dict]``):
             In-memory file content if the node is a file, or, if `~dirlay.Node.isdir`
-            is ``True``, a dictionary, representing directory structure.
+            is ``True``, a dictionary, representing directory structure. Content of
+            `~dirlay.content.Content` files is returned as ``str``.
 
         abspath (`~pathlib.Path` | ``None``):
             Absolute node path, if directory layout is linked to the filesystem,
@@ -81,42 +99,74 @@ class Node(object):
             Whether the node is a directory.
     """
 
-    def __init__(self, key, base, basedir):
+    def __init__(self, key, base, basedir, tree=None):
         self.key = key
         self.relpath = Path(key)
         self.abspath = basedir / key if basedir is not None else None
         self._base = base
         self._name = '.' if key == '.' else self.relpath.name
+        self._tree = tree
+        self._storage = None if tree is None else tree.data
+
+    def _parent(self):
+        # parent dict in current storage of tree, that is replaced by copy-on-write
+        tree = self._tree
+        if tree is not None and tree.data is not self._storage:
+            self._base, _ = tree.traverse(self.key)
+            self._storage = tree.data
+        return self._base
 
     def __eq__(self, other):
         return (
             isinstance(other, Node)
             and self.key == other.key
             and self.abspath == other.abspath
-            and self._base is other._base
+            and self._parent() is other._parent()
         )
 
     @property
     def data(self):
-        return self._base[self._name]
+        value = self._parent()[self._name]
+        if isinstance(value, Content):
+            return value.read()
+        tree = self._tree
+        if tree is not None and isinstance(value, Mapping):
+            if tree._shared:  # directory may be modified by caller
+                tree._unshare()
+                value = self._parent()[self._name]
+        return value
 
     @data.setter
     def data(self, value):
-        self._base[self._name] = value
+        if self._tree is None:
+            self._base[self._name] = value
+        else:
+            self._tree.replace(self._parent(), self._name, value)
 
     @property
     def isdir(self):
-        return isinstance(self.data, NestedDict.dict_class)
+        return isinstance(self._parent()[self._name], Mapping)
 
     def __repr__(self):
-        return '<Node {!r}: {}>'.format(str(self.key), a_repr(self.data))
+        value = self._parent()[self._name]
+        return '<Node {!r}: {}>'.format(str(self.key), a_repr(value))
 
 
 class Dir:
     """
     Directory layout class. See :ref:`Use cases` for examples.
+
+    Attributes:
+
+        temp (``str``):
+            Default location policy for temporary base directories, used by
+            `~dirlay.Dir.mktree` when ``temp`` argument is not passed; defaults to
+            ``'disk'``. Assign to the class to change it for all layouts.
     """
 
+    temp = 'disk'
+    _node_class = Node
+
     def __init__(self, entries=None):
         r"""
         Example:
@@ -136,6 +186,14 @@ class Dir:
         self._basedir = None
         self._basedir_remove = False
         self._original_cwd = None
+        self._observers = []
+        self._stats = None
+        self._snapshot = None
+        self._snapshot_version = None
+        self._foreign = frozenset()
+        self._manifest = None
+        self._unchecked = False
+        self._selection = None
 
     def __repr__(self):
         return '<Dir {!r}: {}>'.format(
@@ -148,13 +206,16 @@ class Dir:
         """
         Internal data mapping.
         """
-        return self._tree.data
+        tree = self._tree
+        if tree._shared:  # data may be modified by caller
+            tree._unshare()
+        return tree.data
 
     def __contains__(self, path):
         """
         Check whether directory layout object contains path defined.
         """
-        return norm(path) in self._tree
+        return (path if isinstance(path, tuple) else norm(path)) in self._tree
 
     def __eq__(self, other):
         """
@@ -171,15 +232,39 @@ class Dir:
 
     def __getitem__(self, path):
         """
-        Return `~dirlay.Node` object from string path.
+        Return `~dirlay.Node` object from string path, or from tuple of names
+        returned by `~dirlay.key`.
         """
-        key = norm(path)
-        if os.path.isabs(key):
-            raise ValueError('Absolute path not allowed: {!r}'.format(path))
-        base, name = self._tree.traverse(key)
+        if isinstance(path, tuple):  # normalized and split, see dirlay.key
+            base, name = self._tree.traverse(path)
+            k = self._tree.sep.join(path)
+        else:
+            k = norm(path)
+            if os.path.isabs(k):
+                raise ValueError('Absolute path not allowed: {!r}'.format(path))
+            base, name = self._tree.traverse(k)
         if name not in base:
-            raise KeyError(key)
-        return Node(key, base=base, basedir=self.basedir)
+            raise KeyError(k)
+        return self._node_class(k, base, self.basedir, tree=self._tree)
+
+    def __setitem__(self, path, value):
+        """
+        Set file content or directory entries at path, creating parent
+        directories. Existing entry is replaced, not merged.
+        """
+        if isinstance(path, tuple):  # normalized, see dirlay.key
+            k = check_key(path)
+        else:
+            k = norm(path)
+            if os.path.isabs(k):
+                raise ValueError('Absolute path not allowed: {!r}'.format(path))
+        self._tree.put(k, value)
+
+    def __delitem__(self, path):
+        """
+        Remove file or directory at path.
+        """
+        del self._tree[path if isinstance(path, tuple) else norm(path)]
 
     def __floordiv__(self, path):
         """
@@ -213,7 +298,7 @@ class Dir:
         """
         for k in self._tree.keys():
             parent, _ = self._tree.traverse(k)
-            yield k, Node(k, base=parent, basedir=self.basedir)
+            yield k, self._node_class(k, parent, self.basedir, tree=self._tree)
 
     def keys(self):
         """
@@ -227,11 +312,53 @@ class Dir:
         """
         return tuple(v for _, v in self.items())
 
+    def walk(self, top='.', topdown=True):
+        """
+        Generate ``(dirpath, dirnames, filenames)`` tuples for directories of the
+        layout, like `os.walk`, without creating `~dirlay.Node` objects. Paths are
+        relative to layout root and joined to ``top``, as by `os.walk`. If
+        ``topdown`` is ``True`` (default), subdirectories removed from ``dirnames``
+        in place are not visited.
+
+        >>> tree = Dir({'a': {'b.txt': 'B', 'c': {'d.txt': 'D'}}, 'e': {'f.txt': ''}})
+        >>> for dirpath, dirnames, filenames in tree.walk():
+        ...     dirnames[:] = [d for d in dirnames if d != 'e']
+        ...     print(dirpath, dirnames, filenames)
+        . ['a'] []
+        ./a ['c'] ['b.txt']
+        ./a/c [] ['d.txt']
+
+        Args:
+
+            top (``str`` | ``Path``):
+                Path of directory to walk; nothing is generated if it is not a
+                directory of the layout.
+
+            topdown (``bool``):
+                Whether to generate tuple of directory before tuples of its
+                subdirectories.
+
+        Returns:
+
+            ``Iterator[tuple[str, list[str], list[str]]]``
+
+        Raises:
+
+            ValueError: If ``top`` is absolute.
+        """
+        k = norm(top)
+        if os.path.isabs(k):
+            raise ValueError('Absolute path not allowed: {!r}'.format(top))
+        entries = self._tree.data if k == '.' else self._tree.get(k)
+        if not isinstance(entries, Mapping):
+            return iter(())
+        return walk(str(top), entries, topdown)
+
     def root(self):
         """
         Get root `~dirlay.Node` object.
         """
-        return Node('.', base={'.': self._tree.data}, basedir=self.basedir)
+        return Node('.', base={'.': self.data}, basedir=self.basedir)
 
     def leaves(self):
         """
@@ -277,12 +404,549 @@ class Dir:
         """
         self._tree.update(entries)
 
+    @contextmanager
+    def batch(self):
+        """
+        Context manager grouping modifications of directory layout. Parent
+        directories are looked up once for paths sharing them, and if exception is
+        raised, all changes made in the block are undone.
+
+        >>> tree = Dir({'a': {'b.txt': 'B'}})
+        >>> with tree.batch():
+        ...     tree['a/c.txt'] = 'C'
+        ...     tree |= {'d/e.txt': 'E'}
+        ...     del tree['a/b.txt']
+        >>> tree.keys()
+        ('a', 'a/c.txt', 'd', 'd/e.txt')
+        >>> with tree.batch():
+        ...     del tree['a']
+        ...     tree['d/e.txt/f'] = ''
+        Traceback (most recent call last):
+          ...
+        ValueError: Not a dictionary: d/e.txt
+        >>> tree.keys()
+        ('a', 'a/c.txt', 'd', 'd/e.txt')
+
+        Yields:
+
+            `~dirlay.Dir`: Self.
+
+        Raises:
+
+            TypeError: If directory layout is compact.
+        """
+        with self._tree.batch():
+            yield self
+
     def copy(self):
         """
-        Return a deep copy of self.
+        Return a deep copy of self. Copy of compact layout is not compact.
         """
         return Dir(self._tree.data)
 
+    def subtree(self, path):
+        """
+        Return directory layout of directory at ``path``, sharing data with self:
+        changes made through either layout are visible in both. The view is not
+        linked to the filesystem. Views of frozen, compact, and overlay layouts are
+        read-only.
+
+        >>> tree = Dir({'services': {'api': {'app.py': ''}}, 'README.md': ''})
+        >>> api = tree.subtree('services/api')
+        >>> api['tests/test_app.py'] = 'T'
+        >>> api.keys(), tree['services/api/tests/test_app.py'].data
+        (('app.py', 'tests', 'tests/test_app.py'), 'T')
+
+        Args:
+
+            path (``str`` | ``Path``):
+                Path of directory.
+
+        Returns:
+
+            `~dirlay.Dir`
+
+        Raises:
+
+            KeyError: If ``path`` is not found.
+
+            ValueError: If ``path`` is absolute or is not a directory.
+        """
+        k = norm(path)
+        if os.path.isabs(k):
+            raise ValueError('Absolute path not allowed: {!r}'.format(path))
+        self._check()
+        ret = self.__class__()
+        ret._tree = self._tree.subtree(k)
+        return ret
+
+    def freeze(self):
+        """
+        Return immutable copy of directory layout, that can be shared by threads.
+        Directories are copied, file contents are shared.
+
+        Returns:
+
+            `~dirlay.FrozenDir`
+        """
+        self._check()
+        data, _ = copy_tree(self._tree.data, NestedDict.dict_class)
+        ret = lazy_import('FrozenDir')()
+        ret._tree = lazy_import('FrozenTree').adopt(data)
+        ret._tree._len = len(self._tree)
+        return ret
+
+    @classmethod
+    def adopt(cls, entries, validate='lazy'):
+        """
+        Create directory layout that takes ownership of well-formed nested
+        ``entries`` and uses them as `~dirlay.Dir.data` without copying. Unlike
+        `~dirlay.Dir` constructor, keys must be single names, not paths, and nested
+        directories must be ``NestedDict.dict_class`` objects (``dict``, or
+        ``OrderedDict`` on Python 2). The caller must not modify ``entries``
+        afterwards, except through `~dirlay.Dir` methods.
+
+        >>> data = {'a': {'b.txt': 'B'}, 'c': {}}
+        >>> tree = Dir.adopt(data)
+        >>> tree.data is data, tree['a/b.txt'].data
+        (True, 'B')
+        >>> Dir.adopt({'a/b.txt': 'B'}, validate='eager')
+        Traceback (most recent call last):
+          ...
+        ValueError: Invalid name: 'a/b.txt'
+
+        Args:
+
+            entries (``dict``):
+                Nested ``dict`` of directories and files.
+
+            validate (``str``):
+                When to check entries and count them: ``'lazy'`` (default) before the
+                layout is first materialized or compiled, ``'eager'`` immediately, or
+                ``'none'`` to never check and count on demand.
+
+        Returns:
+
+            `~dirlay.Dir`
+
+        Raises:
+
+            ValueError: If ``validate`` mode is not supported, or entry name is
+                invalid.
+
+            TypeError: If entry value is not a directory or file.
+        """
+        if validate not in ('lazy', 'eager', 'none'):
+            raise ValueError('Unsupported validate mode: {!r}'.format(validate))
+        ret = cls()
+        ret._tree = NestedDict.adopt(entries)
+        if validate == 'eager':
+            ret._tree._len = check(entries)
+        ret._unchecked = validate == 'lazy'
+        return ret
+
+    def _check(self):
+        if self._unchecked:
+            self._tree._len = check(self._tree.data)
+            self._unchecked = False
+
+    def compact(self):
+        """
+        Return read-only copy of directory layout in memory-compact storage, for
+        very large layouts. Names are interned and stored once, tree structure is
+        stored in flat arrays, and text content is stored encoded in one shared
+        buffer. Directories are returned as read-only mappings; use
+        `~dirlay.Dir.copy` to get a mutable copy.
+
+        >>> tree = Dir({'a': {'b.txt': 'B'}, 'c.txt': 'C'}).compact()
+        >>> tree['a/b.txt'].data, tree.keys()
+        ('B', ('a', 'a/b.txt', 'c.txt'))
+        >>> tree == Dir({'a': {'b.txt': 'B'}, 'c.txt': 'C'})
+        True
+        >>> tree |= {'d': {}}
+        Traceback (most recent call last):
+          ...
+        TypeError: Compact directory layout is read-only
+
+        Returns:
+
+            `~dirlay.Dir`
+        """
+        self._check()
+        ret = Dir()
+        ret._tree = lazy_import('CompactTree')(self._tree.data)
+        return ret
+
+    def publish(self, path=None):
+        """
+        Write directory layout in compact serialized form to file, to be shared by
+        processes with `~dirlay.Dir.attach`. File is written under temporary name
+        and renamed, so it is never attached partially written. The caller is
+        responsible for removing the file; attached layouts stay valid after that.
+
+        >>> path = Dir({'a': {'b.txt': 'B'}}).publish()
+        >>> Dir.attach(path)['a/b.txt'].data
+        'B'
+        >>> os.remove(str(path))
+
+        Args:
+
+            path (``str`` | ``Path`` | ``None``):
+                Target file path; if ``None`` (default), new temporary file is
+                created, on tmpfs if available.
+
+        Returns:
+
+            ``Path``: Path of published file.
+        """
+        self._check()
+        tree = self._tree
+        compact_tree = lazy_import('CompactTree')
+        if not isinstance(tree, compact_tree) or tree.data._index:
+            tree = compact_tree(tree.data)  # compact subtree views are dumped alone
+        if path is None:
+            parent = lazy_import('temp_parent')('auto', tree.store.nbytes())
+            mkstemp = lazy_import('mkstemp')
+            fd, path = mkstemp(prefix='dirlay-', suffix='.layout', dir=parent)
+            os.close(fd)
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(tmp, 'wb') as f:
+                tree.store.dump(f)
+            os.rename(tmp, str(path))  # atomic
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return Path(path)
+
+    @classmethod
+    def attach(cls, path):
+        """
+        Create read-only directory layout from file written by
+        `~dirlay.Dir.publish`. File is memory-mapped, so processes attached to the
+        same file share one copy of tree structure and text content in page cache;
+        nodes are decoded on access. Use only files from trusted sources:
+        `~dirlay.content.Content` objects are unpickled.
+
+        Args:
+
+            path (``str`` | ``Path``):
+                Path of published file.
+
+        Returns:
+
+            `~dirlay.Dir`: Compact directory layout, see `~dirlay.Dir.compact`.
+
+        Raises:
+
+            ValueError: If file is not a published directory layout.
+        """
+        with open(str(path), 'rb') as f:
+            if sys.version_info < (3,):  # pragma: no cover  # no buffer protocol
+                source = f.read()
+            else:
+                mmap = lazy_import('mmap')
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        ret = cls()
+        store = lazy_import('CompactStore').load(source)
+        ret._tree = lazy_import('CompactTree')(store=store)
+        return ret
+
+    @classmethod
+    def overlay(cls, *layers):
+        """
+        Create read-only union view of directory layouts, like ``|`` operator, but
+        without merging: every path is resolved on access, and later layers take
+        precedence. Directories are merged with directories of lower layers; file
+        or `~dirlay.WHITEOUT` entry hides lower layers. Layers are not copied, so
+        changes of `~dirlay.Dir` layers are visible in the view, and make its plans
+        and patches stale.
+
+        >>> base = Dir({'a': {'b.txt': 'B', 'c.txt': 'C'}, 'd.txt': 'D'})
+        >>> from dirlay import WHITEOUT
+        >>> view = Dir.overlay(base, {'a/b.txt': 'B2', 'd.txt': WHITEOUT})
+        >>> view.data
+        {'a': {'b.txt': 'B2', 'c.txt': 'C'}}
+        >>> view.keys()
+        ('a', 'a/b.txt', 'a/c.txt')
+        >>> view['d.txt']
+        Traceback (most recent call last):
+          ...
+        KeyError: 'd.txt'
+
+        Args:
+
+            layers (`~dirlay.Dir` | ``dict``):
+                Directory layouts, lowest first. ``dict`` layers may use paths as
+                keys, like `~dirlay.Dir` constructor, and are copied.
+
+        Returns:
+
+            `~dirlay.Dir`
+        """
+        data = []
+        sources = []
+        for layer in reversed(layers):
+            if isinstance(layer, Dir):
+                layer._check()
+                if layer._tree._shared:  # storage must not be replaced later
+                    layer._tree._unshare()
+                data.append(layer._tree.data)
+                sources.append(layer._tree)
+            else:
+                data.append(NestedDict(layer).data)
+        ret = cls()
+        ret._tree = lazy_import('OverlayTree')(data, sources)
+        return ret
+
+    def compress(self, threshold=CHUNK_SIZE, codec='zlib'):
+        """
+        Compress in place text files of at least ``threshold`` characters, to reduce
+        memory held by large text fixtures. Compressed files are stored as
+        `~dirlay.content.CompressedContent`: `~dirlay.Node.data` returns full text,
+        recently used texts are cached, and `~dirlay.Dir.mktree` writes files
+        decompressing them chunk by chunk. Files already materialized are not
+        rewritten, because their content does not change.
+
+        >>> tree = Dir({'a.log': 'line\\n' * 100000, 'b.txt': 'B'}).compress()
+        >>> tree['a.log'].data == 'line\\n' * 100000, tree['b.txt'].data
+        (True, 'B')
+        >>> tree == Dir({'a.log': 'line\\n' * 100000, 'b.txt': 'B'})
+        True
+
+        Args:
+
+            threshold (``int``):
+                Minimal text length in characters; defaults to
+                `~dirlay.content.CHUNK_SIZE`.
+
+            codec (``str``):
+                Compression codec, ``'zlib'`` (default) or ``'lzma'``.
+
+        Returns:
+
+            `~dirlay.Dir`: Self.
+
+        Raises:
+
+            ValueError: If ``codec`` is not supported or not available.
+
+            TypeError: If directory layout is compact or overlay.
+        """
+        compressor(codec)  # fail early
+        if hasattr(self._tree, '_readonly'):  # compact, overlay, or frozen view
+            self._tree._readonly()
+        if self._tree._shared:
+            self._tree._unshare()
+        sep = self._tree.sep
+        found = [
+            (parent, k.rsplit(sep, 1)[-1], value)
+            for k, value, parent in self._tree._walk(self._tree.data)
+            if isinstance(value, TEXT) and len(value) >= threshold
+        ]
+        if not found:
+            return self
+        for parent, name, value in found:
+            parent[name] = CompressedContent.from_text(value, codec)
+        # plans and patches become stale, but materialized files stay pristine
+        trusted = self._snapshot_version == self._tree.version
+        self._tree._modified()
+        if trusted:
+            self._snapshot_version = self._tree.version
+        return self
+
+    @classmethod
+    def synthetic(
+        cls,
+        depth,
+        fanout,
+        files_per_dir,
+        size_dist=0,
+        seed=0,
+        name_pattern='{kind}{index}',
+        lazy=True,
+    ):
+        """
+        Generate deterministic directory layout for load and scale testing. Nodes are
+        built directly, without parsing paths, and with lazy content file sizes are
+        not limited by available memory.
+
+        >>> tree = Dir.synthetic(depth=2, fanout=2, files_per_dir=1, size_dist=3)
+        >>> tree.format_tree()
+        .
+        ├── d0/
+        │   ├── d0/
+        │   │   └── f0
+        │   ├── d1/
+        │   │   └── f0
+        │   └── f0
+        ├── d1/
+        │   ├── d0/
+        │   │   └── f0
+        │   ├── d1/
+        │   │   └── f0
+        │   └── f0
+        └── f0
+        >>> len(tree.keys()), len(tree['d0/f0'].data)
+        (13, 3)
+
+        Args:
+
+            depth (``int``):
+                Number of nested directory levels below the root.
+
+            fanout (``int``):
+                Number of subdirectories in every directory above ``depth``.
+
+            files_per_dir (``int``):
+                Number of files in every directory, including the root.
+
+            size_dist (``int`` | ``tuple[int, int]`` | ``Callable[[Random], int]``):
+                File size in characters: constant, uniformly distributed between
+                inclusive bounds, or drawn by a function of `random.Random`; defaults
+                to ``0``.
+
+            seed (``int``):
+                Random seed, defaults to ``0``.
+
+            name_pattern (``str``):
+                Format string for entry names, with fields ``kind`` (``'d'`` for
+                directory, ``'f'`` for file), ``index`` (position among siblings of
+                the same kind), and ``level`` (``1`` for root entries); defaults to
+                ``'{kind}{index}'``.
+
+            lazy (``bool``):
+                Whether to store non-empty files as `~dirlay.content.SizedContent`
+                generated on demand, or as ``str``; defaults to ``True``. Lazy and
+                eager layouts materialize the same files, but are not equal, because
+                sized content is compared by size and seed, not by text.
+
+        Returns:
+
+            `~dirlay.Dir`
+
+        Raises:
+
+            ValueError: If ``name_pattern`` produces duplicate sibling names.
+        """
+        rng = lazy_import('Random')(seed)  # noqa: S311  # not used for security
+        if isinstance(size_dist, int):
+            const = size_dist
+            size_dist = lambda _: const  # noqa: E731
+        elif isinstance(size_dist, tuple):
+            low, high = size_dist
+            size_dist = lambda r: r.randint(low, high)  # noqa: E731
+
+        names = {}
+
+        def name(kind, index, level):
+            k = (kind, index, level)
+            if k not in names:
+                names[k] = name_pattern.format(kind=kind, index=index, level=level)
+            return names[k]
+
+        dict_class = NestedDict.dict_class
+        root = dict_class()
+        count = 0
+        stack = [(root, 1)]
+        while stack:
+            node, level = stack.pop()
+            for i in range(files_per_dir):
+                size = size_dist(rng)
+                file_seed = rng.getrandbits(32)
+                if size == 0:
+                    value = ''
+                elif lazy:
+                    value = SizedContent(size, seed=file_seed)
+                else:
+                    value = SizedContent(size, seed=file_seed).read()
+                node[name('f', i, level)] = value
+            if level <= depth:
+                for i in range(fanout):
+                    child = node[name('d', i, level)] = dict_class()
+                    stack.append((child, level + 1))
+            if len(node) != files_per_dir + (fanout if level <= depth else 0):
+                raise ValueError('Duplicate names: {!r}'.format(name_pattern))
+            count += len(node)
+        ret = cls()
+        ret._tree.data = root
+        ret._tree._len = count
+        return ret
+
+    def compile(self, encoding=None, newline=None):
+        r"""
+        Compile directory layout to reusable `~dirlay.Plan` of directory and file
+        operations with pre-encoded content, that can be applied many times without
+        traversing the layout. The plan becomes stale and can't be applied after the
+        layout is modified through `~dirlay.Dir` or `~dirlay.Node` methods.
+
+        >>> tree = Dir({'a': {'b.txt': 'B'}})
+        >>> plan = tree.compile(encoding='utf-8')
+        >>> tmp = tree.mktree().basedir
+        >>> plan.apply(tmp / 'copy').files
+        1
+        >>> (tmp / 'copy/a/b.txt').read_text()
+        'B'
+        >>> tree |= {'c': {}}
+        >>> plan.stale
+        True
+        >>> tree.rmtree()
+
+        Args:
+
+            encoding (``str`` | ``None``, optional):
+                Text encoding; defaults to locale preferred encoding.
+
+            newline (``str`` | ``None``, optional):
+                Line separator that ``'\n'`` is translated to; defaults to
+                `os.linesep`.
+
+        Returns:
+
+            `~dirlay.Plan`
+        """
+        self._check()
+        plan = lazy_import('Plan')
+        return plan.compile(self._tree.data, encoding, newline, source=self._tree)
+
+    def diff(self, other):
+        """
+        Compute `~dirlay.Patch` that changes directory layout materialized from self
+        to ``other`` layout, making only needed filesystem changes. Both layouts
+        are walked in parallel, and subtrees shared by them, e.g. by
+        `~dirlay.Dir.adopt` or `~dirlay.Dir.overlay`, are skipped by identity.
+
+        >>> old = Dir({'a': {'b.txt': 'B'}, 'c.txt': 'C'}).mktree()
+        >>> new = old | {'a/b.txt': 'B2', 'd': {}}
+        >>> del new['c.txt']
+        >>> patch = old.diff(new)
+        >>> patch.removed, patch.modified, patch.added
+        (('c.txt',), ('a/b.txt',), ('d',))
+        >>> patch.apply(old.basedir).files
+        1
+        >>> sorted(os.listdir(str(old.basedir))), (old // 'a/b.txt').read_text()
+        (['a', 'd'], 'B2')
+        >>> old.rmtree()
+
+        Args:
+
+            other (`~dirlay.Dir` | ``dict``):
+                Target directory layout.
+
+        Returns:
+
+            `~dirlay.Patch`: Patch that becomes stale when either layout is
+            modified.
+        """
+        if not isinstance(other, Dir):
+            other = Dir(other)
+        self._check()
+        other._check()
+        return lazy_import('Patch').compute(
+            self._tree.data, other._tree.data, sources=(self._tree, other._tree)
+        )
+
     # filesystem operations
 
     @property
@@ -295,10 +959,26 @@ class Dir:
         """
         return None if self._basedir is None else self._basedir
 
-    def mktree(self, basedir=None, chdir=None):
+    def mktree(
+        self,
+        basedir=None,
+        chdir=None,
+        workers=None,
+        pool='process',
+        temp=None,
+        include=None,
+        exclude=None,
+    ):
         """
         Create directories and files in given or temporary directory.
 
+        >>> tree = Dir({'src': {'a.py': '', 'b.txt': ''}, 'docs': {'c.py': ''}})
+        >>> tree.mktree(include='**/*.py', exclude='docs').stats.files
+        1
+        >>> os.listdir(str(tree // 'src'))
+        ['a.py']
+        >>> tree.rmtree()
+
         Args:
 
             basedir (`~pathlib.Path` | ``str`` | ``None``, optional):
@@ -311,17 +991,80 @@ class Dir:
                 Change the current directory to given path. If ``None`` (default) or
                 ``False``, directory is not changed; ``True`` is equivalent to ``'.'``.
 
+            workers (``int`` | ``None``, optional):
+                Number of parallel workers; if ``None`` (default), directories and
+                files are created in the current thread. Layout is split into
+                size-balanced shards, directories shared by shards are created first,
+                and shards are materialized by workers independently. Observers are
+                not notified of entries created by workers.
+
+            pool (``str``, optional):
+                Type of worker pool when ``workers`` is set, ``'process'`` (default)
+                or ``'thread'``. Process pool is not limited by GIL and pays off for
+                very large layouts.
+
+            temp (``str`` | ``None``, optional):
+                Location of temporary ``basedir``: ``'disk'`` for `tempfile` default
+                location, ``'tmpfs'`` for memory-backed ``/dev/shm`` or
+                ``$XDG_RUNTIME_DIR`` with room for estimated layout size, or
+                ``'auto'`` to prefer tmpfs and fall back to disk; if ``None``
+                (default), `~dirlay.Dir.temp` is used. Ignored when ``basedir`` is
+                passed.
+
+            include (``str`` | ``list[str]`` | ``None``, optional):
+                Glob patterns of entries to create, relative to ``basedir``: ``*``,
+                ``?``, ``[...]`` match within one path part, ``**`` matches any number
+                of parts. Directory matching a pattern is created with all its
+                contents, parents of matching entries are created too. If ``None``
+                (default), all entries are created.
+
+            exclude (``str`` | ``list[str]`` | ``None``, optional):
+                Glob patterns of entries not to create, with all their contents.
+
+            Subtrees that cannot contain selected entries are skipped, and
+            `~dirlay.Dir.reset` restores selected entries only.
+
         Returns:
 
-            ``None``
+            `~dirlay.Dir`: Self; statistics are available as `~dirlay.Dir.stats`.
 
         Raises:
 
             FileExistsError: If ``basedir`` path already exists.
+
+            ValueError: If ``workers`` is less than 1, ``pool`` type or ``temp`` mode
+                is not supported, or entries adopted with `~dirlay.Dir.adopt` are
+                invalid.
+
+            RuntimeError: If ``temp`` is ``'tmpfs'`` and tmpfs is not available.
         """
+        if workers is not None and workers < 1:
+            raise ValueError('Number of workers must be positive: {!r}'.format(workers))
+        if pool not in ('process', 'thread'):
+            raise ValueError('Unsupported pool type: {!r}'.format(pool))
+        if temp is not None and temp not in lazy_import('TEMP_MODES'):
+            raise ValueError('Unsupported temp mode: {!r}'.format(temp))
+        self._check()
+        stats = self._stats = MaterializationStats()
         # prepare
+        start = perf_counter()
+        if isinstance(include, TEXT):
+            include = [include]
+        if isinstance(exclude, TEXT):
+            exclude = [exclude]
+        if include is None and not exclude:
+            self._selection = None
+        else:
+            self._selection = (
+                None if include is None else tuple(include),
+                tuple(exclude or ()),
+            )
+        entries = self._selected()
         if basedir is None:
-            self._basedir = Path(mkdtemp())
+            mode = self.temp if temp is None else temp
+            size = 0 if mode == 'disk' else lazy_import('estimate_size')(entries)
+            parent = lazy_import('temp_parent')(mode, size)
+            self._basedir = Path(lazy_import('mkdtemp')(dir=parent))
             self._basedir_remove = True
         else:
             basedir = Path(basedir)
@@ -329,34 +1072,218 @@ class Dir:
                 basedir.mkdir(parents=True, exist_ok=True)
                 self._basedir_remove = True
             self._basedir = basedir.resolve()
+        if self._basedir_remove:
+            self._foreign = frozenset()
+            self._manifest = None
+        else:
+            self._foreign = lazy_import('foreign')(self._basedir, entries)
+            self._manifest = lazy_import('missing')(self._basedir, entries)
+        stats.times['prepare'] += perf_counter() - start
+        if self._basedir_remove:
+            stats.dirs += 1
+            self._notify('on_mkdir', self._basedir)
         # create
-        for node in self.leaves():
-            if node.isdir:
-                node.abspath.mkdir(parents=True, exist_ok=True)
-            else:
-                node.abspath.parent.mkdir(parents=True, exist_ok=True)
-                if sys.version_info > (3,):
-                    node.abspath.write_text(node.data)
-                else:  # pragma: no cover
-                    node.abspath.write_text(node.data.decode('utf-8'))
+        snap = {}
+        if workers is None:
+            materialize = lazy_import('materialize')
+            materialize(self._basedir, entries, stats, self._observers, snap=snap)
+        else:
+            lazy_import('materialize_parallel')(
+                self._basedir,
+                entries,
+                stats,
+                workers=workers,
+                pool=pool,
+                observers=self._observers,
+                snap=snap,
+            )
+        self._snapshot = lazy_import('settle')(snap)
+        self._snapshot_version = self._tree.version
         # chdir
         if chdir not in (None, False):
             self.chdir('.' if chdir is True else chdir)
         #
         return self
 
+    def _selected(self):
+        # entries selected by patterns passed to mktree
+        if self._selection is None:
+            return self._tree.data
+        include, exclude = self._selection
+        select = lazy_import('select')
+        return select(self._tree.data, include, exclude, NestedDict.dict_class)
+
+    def reset(self):
+        """
+        Restore materialized directory layout to pristine state, rewriting or removing
+        only entries that were changed, added, or deleted since `~dirlay.Dir.mktree`
+        or previous `~dirlay.Dir.reset` call. Changes are detected in one scanning
+        pass: files are compared by inode, size, and modification time recorded when
+        they were written or last verified, and files written too recently to trust
+        their timestamps are compared by content. Modification times are never
+        changed. If layout was
+        modified in memory, all files are rewritten. Entries present in ``basedir``
+        before `~dirlay.Dir.mktree` call are left untouched.
+
+        >>> tree = Dir({'a': {'b.txt': 'B'}}).mktree()
+        >>> (tree // 'a/b.txt').write_text('changed')
+        7
+        >>> (tree // 'a' / 'c.txt').write_text('added')
+        5
+        >>> tree.reset().stats.files
+        1
+        >>> sorted(os.listdir(str(tree // 'a'))), (tree // 'a/b.txt').read_text()
+        (['b.txt'], 'B')
+        >>> tree.rmtree()
+
+        Returns:
+
+            `~dirlay.Dir`: Self; statistics of restored entries are available as
+            `~dirlay.Dir.stats`.
+        """
+        self._require_linked_to_filesystem()
+        stats = self._stats = MaterializationStats()
+        if self._snapshot is None:  # linked without snapshot
+            self._snapshot = {}
+        trusted = self._snapshot_version == self._tree.version
+        entries = self._selected()
+        if self._manifest is not None and not trusted:
+            known = set(self._manifest)
+            new = lazy_import('missing')(self._basedir, entries)
+            self._manifest.extend(k for k in new if k not in known)
+        lazy_import('reset')(
+            self._basedir,
+            entries,
+            self._snapshot,
+            stats,
+            self._observers,
+            trusted=trusted,
+            skip=self._foreign,
+        )
+        self._snapshot_version = self._tree.version
+        return self
+
+    def move(self, src, dst):
+        """
+        Move file or directory from ``src`` to ``dst`` path, creating parent
+        directories. Entries are relinked in memory, not copied. If directory layout
+        is linked to the filesystem, the entry is moved with one `os.rename` call,
+        and files are not rewritten by subsequent `~dirlay.Dir.reset`.
+
+        >>> tree = Dir({'a': {'b': {'c.txt': 'C'}}}).mktree()
+        >>> tree.move('a/b', 'x/y')
+        >>> tree.keys(), (tree // 'x/y/c.txt').read_text()
+        (('a', 'x', 'x/y', 'x/y/c.txt'), 'C')
+        >>> tree.reset().stats.files
+        0
+        >>> tree.rmtree()
+
+        Args:
+
+            src (``str`` | ``Path`` | ``tuple[str, ...]``):
+                Path of entry to move.
+
+            dst (``str`` | ``Path`` | ``tuple[str, ...]``):
+                New path of entry.
+
+        Raises:
+
+            KeyError: If ``src`` is not found.
+
+            ValueError: If path is absolute or tuple key is invalid, ``dst`` exists or
+                is inside ``src``, or parent of ``dst`` is a file.
+
+            FileExistsError: If ``dst`` exists in the filesystem.
+
+            TypeError: If directory layout is read-only.
+        """
+        tree = self._tree
+        sep = tree.sep
+        keys = []
+        for path in (src, dst):
+            if isinstance(path, tuple):  # normalized and split, see dirlay.key
+                keys.append(check_key(path))
+                continue
+            k = norm(path)
+            if os.path.isabs(k):
+                raise ValueError('Absolute path not allowed: {!r}'.format(path))
+            keys.append(tuple(k.split(sep)))
+        src, dst = keys
+        if self._basedir is None:
+            tree.move(src, dst)
+            return
+        trusted = self._snapshot_version == tree.version
+        created = next(
+            (dst[:i] for i in range(1, len(dst)) if dst[:i] not in tree), None
+        )
+        tree.move(src, dst)
+        try:
+            renamed = self._rename(sep.join(src), sep.join(dst))
+        except BaseException:  # undo
+            tree.move(dst, src)
+            if created is not None:
+                del tree[created]
+            raise
+        if renamed and trusted and self._selection is None:
+            self._snapshot_version = tree.version
+
+    def _rename(self, src, dst):
+        # move materialized entry, return False if it is missing
+        basedir = str(self._basedir)
+        src_path = os.path.join(basedir, src)
+        dst_path = os.path.join(basedir, dst)
+        if os.path.lexists(dst_path):
+            raise OSError(errno.EEXIST, os.strerror(errno.EEXIST), dst_path)
+        if not os.path.lexists(src_path):
+            return False
+        created = []
+        parts = dst.split('/')
+        for i in range(1, len(parts)):
+            k = '/'.join(parts[:i])
+            path = os.path.join(basedir, k)
+            if lazy_import('mkdir')(path):
+                created.append(k + '/')
+                self._notify('on_mkdir', Path(path))
+        os.rename(src_path, dst_path)
+        # rename entries of snapshot and manifest
+        prefix = src + '/'
+        moved = [k for k in self._snapshot or () if k == src or k.startswith(prefix)]
+        for k in moved:
+            self._snapshot[dst + k[len(src) :]] = self._snapshot.pop(k)
+        if self._manifest is not None:
+            manifest = [k for k in self._manifest if k == src or k.startswith(prefix)]
+            moved = set(manifest)
+            self._manifest[:] = [k for k in self._manifest if k not in moved]
+            self._manifest.extend(created)
+            self._manifest.extend(dst + k[len(src) :] for k in manifest)
+        return True
+
     def rmtree(self):
         """
         Remove directory and all its contents.
 
-        If ``basedir`` was created, it will be removed. If ``chdir`` argument
-        was passed, current working directory will be restored to the original one.
+        If ``basedir`` was created, it will be removed. If ``basedir`` existed
+        before `~dirlay.Dir.mktree` call, only directories and files that did not
+        exist are removed, deepest first. If ``chdir`` argument was passed, current
+        working directory will be restored to the original one.
+
+        >>> import shutil
+        >>> from tempfile import mkdtemp
+        >>> scratch = Path(mkdtemp())
+        >>> (scratch / 'keep.txt').write_text('K')
+        1
+        >>> tree = Dir({'a': {'b.txt': 'B'}, 'keep.txt': 'K'}).mktree(scratch)
+        >>> tree.rmtree()
+        >>> os.listdir(str(scratch))
+        ['keep.txt']
+        >>> shutil.rmtree(str(scratch))
 
         Returns:
 
             ``None``
         """
         self._require_linked_to_filesystem()
+        start = perf_counter()
         # chdir back if needed
         if self._original_cwd is not None:
             os.chdir(str(self._original_cwd))
@@ -364,9 +1291,16 @@ class Dir:
         # remove basedir if needed
         if self._basedir_remove:
             if self._basedir.exists():
-                shutil.rmtree(str(self._basedir))
+                lazy_import('rmtree')(str(self._basedir))
             self._basedir_remove = False
-        self._basedir = None
+        elif self._manifest:
+            lazy_import('cleanup')(self._basedir, self._manifest)
+        self._manifest = None
+        basedir, self._basedir = self._basedir, None
+        self._snapshot = self._snapshot_version = None
+        if self._stats is not None:
+            self._stats.times['rmtree'] += perf_counter() - start
+        self._notify('on_rmtree', basedir)
 
     # current directory operations
 
@@ -400,9 +1334,51 @@ class Dir:
         if path.is_absolute():
             raise ValueError('Absolute path not allowed')
         # chdir
+        start = perf_counter()
         if self._original_cwd is None:
             self._original_cwd = getcwd()
-        os.chdir(str(self.basedir / path))
+        path = self.basedir / path
+        os.chdir(str(path))
+        if self._stats is not None:
+            self._stats.times['chdir'] += perf_counter() - start
+        self._notify('on_chdir', path)
+
+    # instrumentation
+
+    @property
+    def stats(self):
+        """
+        `~dirlay.MaterializationStats` of the last `~dirlay.Dir.mktree` call, updated
+        by subsequent `~dirlay.Dir.chdir` and `~dirlay.Dir.rmtree` calls; ``None`` if
+        layout was never created on the file system.
+        """
+        return self._stats
+
+    def add_observer(self, observer):
+        """
+        Register `~dirlay.Observer` to be notified on every directory created, file
+        written, current directory change, and layout removal.
+
+        Returns:
+
+            ``None``
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Unregister `~dirlay.Observer` previously registered with
+        `~dirlay.Dir.add_observer`.
+
+        Returns:
+
+            ``None``
+
+        Raises:
+
+            ValueError: If ``observer`` is not registered.
+        """
+        self._observers.remove(observer)
 
     # helpers
 
@@ -410,6 +1386,10 @@ class Dir:
         if self._basedir is None:
             raise RuntimeError('Directory tree must be linked to filesystem')
 
+    def _notify(self, event, *args):
+        for observer in self._observers:
+            getattr(observer, event)(*args)
+
     # formatting
 
     def as_rich(self, real_basedir=False, show_data=False, **kwargs):
@@ -435,9 +1415,7 @@ class Dir:
 
             :external+rich:py:obj:`~rich.tree.Tree`
         """
-        if rich is None:
-            raise NotImplementedError('Optional dependency required: dirlay[rich]')
-        return as_rich_tree(
+        return import_format_rich().as_rich_tree(
             self, real_basedir=real_basedir, show_data=show_data, **kwargs
         )
 
@@ -450,10 +1428,33 @@ class Dir:
 
             ``None``
         """
-        if rich is None:
-            raise NotImplementedError('Optional dependency required: dirlay[rich]')
         tree = self.as_rich(real_basedir=real_basedir, show_data=show_data, **kwargs)
-        rich_print(tree)
+        import_format_rich().rich_print(tree)
+
+    def format_tree(self, fp=None, show_data=False, max_depth=None):
+        """
+        Write plain text tree representation to text stream, line by line, without
+        building intermediate objects; does not require optional dependencies.
+        See :ref:`Print as plain text tree` for examples.
+
+        Args:
+
+            fp (``TextIO`` | ``None``):
+                Text stream to write to; defaults to `sys.stdout`.
+
+            show_data (``bool``):
+                Whether to include file content indented under the file name; defaults
+                to ``False``.
+
+            max_depth (``int`` | ``None``):
+                Maximum number of levels to display below the root; ``None``
+                (default) means no limit.
+
+        Returns:
+
+            ``None``
+        """
+        lazy_import('write_tree')(self, fp=fp, show_data=show_data, max_depth=max_depth)
 
 
 # public helpers
@@ -475,5 +1476,181 @@ def getcwd():
 # internal helpers
 
 
+# names imported on first use to keep `import dirlay` fast, see `lazy_import`;
+# values are module names, or ``module:attribute`` pairs
+LAZY = {
+    'CompactStore': 'dirlay.compact:CompactStore',
+    'CompactTree': 'dirlay.compact:CompactTree',
+    'FrozenDir': 'dirlay.frozen:FrozenDir',
+    'FrozenTree': 'dirlay.frozen:FrozenTree',
+    'OverlayTree': 'dirlay.overlay:OverlayTree',
+    'Patch': 'dirlay.patch:Patch',
+    'Plan': 'dirlay.plan:Plan',
+    'Random': 'random:Random',
+    'TEMP_MODES': 'dirlay.tempdir:MODES',
+    'WHITEOUT': 'dirlay.overlay:WHITEOUT',
+    'cleanup': 'dirlay.manifest:cleanup',
+    'estimate_size': 'dirlay.tempdir:estimate_size',
+    'foreign': 'dirlay.manifest:foreign',
+    'materialize': 'dirlay.materialize:materialize',
+    'materialize_parallel': 'dirlay.materialize:materialize_parallel',
+    'missing': 'dirlay.manifest:missing',
+    'mkdir': 'dirlay.materialize:mkdir',
+    'mkdtemp': 'tempfile:mkdtemp',
+    'mkstemp': 'tempfile:mkstemp',
+    'mmap': 'mmap',
+    'reset': 'dirlay.snapshot:reset',
+    'rmtree': 'shutil:rmtree',
+    'select': 'dirlay.patterns:select',
+    'settle': 'dirlay.snapshot:settle',
+    'temp_parent': 'dirlay.tempdir:temp_parent',
+    'write_tree': 'dirlay.format_text:write_tree',
+}
+lazy_imported = {}
+
+
+def lazy_import(name):
+    """
+    Return object ``name`` listed in `LAZY`, importing its module on first use.
+    """
+    if name not in lazy_imported:
+        module, _, attr = LAZY[name].partition(':')
+        value = import_module(module)
+        lazy_imported[name] = getattr(value, attr) if attr else value
+    return lazy_imported[name]
+
+
+def __getattr__(name):
+    # import public names of feature modules on first access, and keep backward
+    # compatibility for names that used to be imported eagerly (PEP 562)
+    if name in LAZY and name in __all__:
+        value = globals()[name] = lazy_import(name)
+        return value
+    if name in ('as_rich_tree', 'rich_print'):
+        return getattr(import_format_rich(), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def import_format_rich():
+    # rich is imported on first use to keep `import dirlay` fast
+    if optional.rich is None:
+        raise NotImplementedError('Optional dependency required: dirlay[rich]')
+    from dirlay import format_rich as module
+
+    return module
+
+
 def norm(path):
     return os.path.normpath(str(path))
+
+
+KEY_CACHE_SIZE = 65536  # max number of paths cached by key
+key_cache = {}
+
+
+def key(path):
+    """
+    Return relative path normalized and split to tuple of names, to be used as
+    `~dirlay.Dir` key. Results are cached, so lookups in hot loops skip path
+    normalization and parsing. Tuple keys are checked with `check_key` only by
+    `~dirlay.Dir` methods that write; use this function to make them.
+
+    >>> key('a/./b/../c.md')
+    ('a', 'c.md')
+    >>> tree = Dir({'a/c.md': 'C'})
+    >>> tree[key('a/c.md')].data, key('a/c.md') in tree
+    ('C', True)
+
+    Args:
+
+        path (``str`` | ``Path`` | ``tuple[str, ...]``):
+            Relative path; tuple is returned as is.
+
+    Returns:
+
+        ``tuple[str, ...]``: Empty tuple for root.
+
+    Raises:
+
+        ValueError: If ``path`` is absolute or outside of layout.
+    """
+    if isinstance(path, tuple):
+        return path
+    ret = key_cache.get(path)
+    if ret is None:
+        value = norm(path)
+        if os.path.isabs(value):
+            raise ValueError('Absolute path not allowed: {!r}'.format(path))
+        ret = () if value == '.' else tuple(value.split(os.sep))
+        if ret[:1] == ('..',):  # other parts are normalized
+            raise ValueError('Path outside of layout not allowed: {!r}'.format(path))
+        if len(key_cache) >= KEY_CACHE_SIZE:  # forget all, cheaper than LRU
+            key_cache.clear()
+        key_cache[path] = ret
+    return ret
+
+
+def check_key(parts):
+    """
+    Check names of tuple key ``parts`` like `check` does, and return it.
+
+    >>> check_key(('a', '..', 'b'))
+    Traceback (most recent call last):
+      ...
+    ValueError: Invalid key: ('a', '..', 'b')
+    """
+    sep = NestedDict.sep
+    for name in parts:
+        if not name or sep in name or name in ('.', '..'):
+            raise ValueError('Invalid key: {!r}'.format(parts))
+    return parts
+
+
+def walk(top, entries, topdown=True):
+    """
+    Generate `os.walk` tuples for nested ``entries`` of directory ``top``.
+    """
+    stack = [(top, entries)]
+    while stack:
+        dirpath, entries = stack.pop()
+        dirnames, filenames = [], []
+        for name, value in entries.items():
+            (dirnames if isinstance(value, Mapping) else filenames).append(name)
+        if topdown:
+            yield dirpath, dirnames, filenames
+            for name in reversed(dirnames):  # names may be removed or added in place
+                value = entries.get(name)
+                if isinstance(value, Mapping):
+                    stack.append((os.path.join(dirpath, name), value))
+        else:
+            for name in dirnames:
+                for item in walk(os.path.join(dirpath, name), entries[name], False):
+                    yield item  # Python 2 support
+            yield dirpath, dirnames, filenames
+
+
+def check(entries):
+    """
+    Check that nested ``entries`` are well-formed and return their number.
+    """
+    dict_class = NestedDict.dict_class
+    sep = NestedDict.sep
+    count = 0
+    stack = [entries]
+    while stack:
+        for name, value in stack.pop().items():
+            if not name or sep in name or name in ('.', '..'):
+                raise ValueError('Invalid name: {!r}'.format(name))
+            if isinstance(value, dict_class):
+                stack.append(value)
+            elif not isinstance(value, TEXT + (Content,)):
+                raise TypeError('Invalid value of {!r}: {!r}'.format(name, value))
+            count += 1
+    return count
+
+
+if sys.version_info < (3, 7):  # pragma: no cover  # PEP 562 not supported
+    from dirlay.frozen import FrozenDir  # noqa: F401  # exported
+    from dirlay.overlay import WHITEOUT  # noqa: F401  # exported
+    from dirlay.patch import Patch  # noqa: F401  # exported
+    from dirlay.plan import Plan  # noqa: F401  # exported
@@ -1,24 +1,58 @@
-from collections.abc import Iterable
-from typing import Any, MutableMapping, Optional, Tuple, Union
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import AbstractContextManager
+from random import Random
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    MutableMapping,
+    NoReturn,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+    Union,
+)
 
 from typing_extensions import TypeAlias
 
+from dirlay.frozen import FrozenDir as FrozenDir
 from dirlay.nested_dict import NestedDict
-from dirlay.optional import rich
-from dirlay.types import DictTree, DictNode, Path as Path, PathType
+from dirlay.overlay import WHITEOUT as WHITEOUT
+from dirlay.patch import Patch as Patch
+from dirlay.plan import Plan as Plan
+from dirlay.snapshot import Signature
+from dirlay.stats import (
+    MaterializationStats as MaterializationStats,
+    Observer as Observer,
+)
+from dirlay.types import DictTree, DictNode, KeyType, Path as Path, PathType
 
-if rich is not None:
-    from rich.tree import Tree as RichTree
-else:
-    RichTree = None  # type: ignore[misc]  # assign to type
+try:
+    from rich.tree import Tree as RichTree  # type: ignore[import-not-found,unused-ignore]
+except ImportError:
+    RichTree = None  # type: ignore[assignment,misc]  # assign to type
 
 class Node(object):
     key: str
-    data: 'DictNode'
     abspath: Path
     relpath: Path
     isdir: bool
-    def __init__(self, key: str, base: DictTree, basedir: Optional[Path]) -> None: ...
+    _tree: Optional[NestedDict[Any]]
+    _storage: Optional[DictTree]
+    def __init__(
+        self,
+        key: str,
+        base: DictTree,
+        basedir: Optional[Path],
+        tree: Optional[NestedDict[Any]] = ...,
+    ) -> None: ...
+    @property
+    def data(self) -> DictNode: ...
+    @data.setter
+    def data(self, value: DictNode) -> None: ...
+    def _parent(self) -> DictTree: ...
     def __eq__(self, other: Any) -> bool: ...
     def __repr__(self) -> str: ...
 
@@ -26,29 +60,76 @@ MutableDictTree: TypeAlias = MutableMapping[str, 'MutableDictNode']
 MutableDictNode: TypeAlias = Union[MutableDictTree, str]
 
 class Dir:
+    temp: str
+    _node_class: Type[Node]
     _tree: NestedDict[MutableDictTree]
     _basedir: Optional[Path]
     _basedir_remove: bool
     _original_cwd: Optional[Path]
+    _observers: List[Observer]
+    _stats: Optional[MaterializationStats]
+    _snapshot: Optional[Dict[str, Signature]]
+    _snapshot_version: Optional[int]
+    _foreign: FrozenSet[str]
+    _manifest: Optional[List[str]]
+    _unchecked: bool
+    _selection: Optional[Tuple[Optional[Tuple[str, ...]], Tuple[str, ...]]]
     def __init__(self, entries: Optional[DictTree] = ...) -> None: ...
     @property
     def data(self) -> DictTree: ...
-    def __contains__(self, path: PathType) -> bool: ...
+    def __contains__(self, path: KeyType) -> bool: ...
     def __eq__(self, other: Any) -> bool: ...
-    def __getitem__(self, path: PathType) -> Node: ...
-    def __floordiv__(self, path: PathType) -> Path: ...
-    def __truediv__(self, path: PathType) -> Path: ...
+    def __getitem__(self, path: KeyType) -> Node: ...
+    def __setitem__(self, path: KeyType, value: DictNode) -> None: ...
+    def __delitem__(self, path: KeyType) -> None: ...
+    def __floordiv__(self, path: KeyType) -> Path: ...
+    def __truediv__(self, path: KeyType) -> Path: ...
     def __iter__(self) -> Iterable[str]: ...
     def items(self) -> Iterable[Tuple[str, Node]]: ...
     def keys(self) -> Tuple[str]: ...
     def values(self) -> Tuple[Node]: ...
+    def walk(
+        self,
+        top: PathType = ...,
+        topdown: bool = ...,
+    ) -> Iterator[Tuple[str, List[str], List[str]]]: ...
     def root(self) -> Node: ...
     def leaves(self) -> Tuple[Node]: ...
     def __or__(self, entries: Union[Dir, DictTree]) -> 'Dir': ...
     def __ior__(self, entries: Union[Dir, DictTree]) -> 'Dir': ...
     def __enter__(self) -> 'Dir': ...
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> 'Dir': ...
+    def batch(self) -> AbstractContextManager['Dir']: ...
     def copy(self) -> 'Dir': ...
+    def subtree(self, path: PathType) -> 'Dir': ...
+    def freeze(self) -> 'FrozenDir': ...
+    @classmethod
+    def adopt(cls, entries: DictTree, validate: str = ...) -> 'Dir': ...
+    def _check(self) -> None: ...
+    def compact(self) -> 'Dir': ...
+    def publish(self, path: Optional[PathType] = ...) -> Path: ...
+    @classmethod
+    def attach(cls, path: PathType) -> 'Dir': ...
+    @classmethod
+    def overlay(cls, *layers: Union[Dir, Mapping[str, Any]]) -> 'Dir': ...
+    def compress(self, threshold: int = ..., codec: str = ...) -> 'Dir': ...
+    @classmethod
+    def synthetic(
+        cls,
+        depth: int,
+        fanout: int,
+        files_per_dir: int,
+        size_dist: Union[int, Tuple[int, int], Callable[[Random], int]] = ...,
+        seed: int = ...,
+        name_pattern: str = ...,
+        lazy: bool = ...,
+    ) -> 'Dir': ...
+    def compile(
+        self,
+        encoding: Optional[str] = ...,
+        newline: Optional[str] = ...,
+    ) -> Plan: ...
+    def diff(self, other: Union['Dir', DictTree]) -> Patch: ...
     def update(self, entries: Union[Dir, DictTree], exist_ok: bool = ...) -> None: ...
     def _require_linked_to_filesystem(self) -> None: ...
     @property
@@ -58,8 +139,22 @@ class Dir:
         self,
         basedir: Optional[PathType] = ...,
         chdir: Union[PathType | bool | None] = ...,
+        workers: Optional[int] = ...,
+        pool: str = ...,
+        temp: Optional[str] = ...,
+        include: Union[str, Iterable[str], None] = ...,
+        exclude: Union[str, Iterable[str], None] = ...,
     ) -> 'Dir': ...
+    def _selected(self) -> DictTree: ...
+    def reset(self) -> 'Dir': ...
+    def move(self, src: KeyType, dst: KeyType) -> None: ...
+    def _rename(self, src: str, dst: str) -> bool: ...
     def rmtree(self) -> None: ...
+    @property
+    def stats(self) -> Optional[MaterializationStats]: ...
+    def add_observer(self, observer: Observer) -> None: ...
+    def remove_observer(self, observer: Observer) -> None: ...
+    def _notify(self, event: str, *args: Any) -> None: ...
     def as_rich(
         self,
         real_basedir: bool = ...,
@@ -72,5 +167,29 @@ class Dir:
         show_data: bool = ...,
         **kwargs: Any,
     ) -> None: ...
+    def format_tree(
+        self,
+        fp: Optional[TextIO] = ...,
+        show_data: bool = ...,
+        max_depth: Optional[int] = ...,
+    ) -> None: ...
 
 def getcwd() -> Path: ...
+
+LAZY: Dict[str, str]
+lazy_imported: Dict[str, Any]
+
+def lazy_import(name: str) -> Any: ...
+def norm(path: PathType) -> str: ...
+
+KEY_CACHE_SIZE: int
+key_cache: Dict[PathType, Tuple[str, ...]]
+
+def key(path: KeyType) -> Tuple[str, ...]: ...
+def check_key(parts: Tuple[str, ...]) -> Tuple[str, ...]: ...
+def walk(
+    top: str,
+    entries: DictTree,
+    topdown: bool = ...,
+) -> Iterator[Tuple[str, List[str], List[str]]]: ...
+def check(entries: DictTree) -> int: ...
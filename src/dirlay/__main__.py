@@ -0,0 +1,6 @@
+import sys
+
+from dirlay.cli import main
+
+
+sys.exit(main())
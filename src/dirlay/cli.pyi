@@ -0,0 +1,31 @@
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable, Mapping
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from dirlay.types import PathType, StrDict
+
+POOLS: Tuple[str, ...]
+TEXT: type
+UNDECODABLE: object
+DIFFERENCES: Dict[str, str]
+
+Log = Callable[[str], None]
+Result = Tuple[int, str, Dict[str, Any]]
+
+def load(path: str) -> Mapping[str, Any]: ...
+def scan(
+    path: PathType,
+    encoding: Optional[str] = ...,
+    undecodable: Optional[object] = ...,
+) -> StrDict: ...
+def build(task: Tuple[Mapping[str, Any], str]) -> Dict[str, Any]: ...
+def run_mktree(args: Namespace, log: Log) -> Result: ...
+def run_scan(args: Namespace, log: Log) -> Result: ...
+def run_verify(args: Namespace, log: Log) -> Result: ...
+def run_render(args: Namespace, log: Log) -> Result: ...
+def parser() -> ArgumentParser: ...
+def main(
+    argv: Optional[List[str]] = ...,
+    stdout: Optional[TextIO] = ...,
+    stderr: Optional[TextIO] = ...,
+) -> int: ...
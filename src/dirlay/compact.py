@@ -0,0 +1,418 @@
+from array import array
+import codecs
+import pickle
+import struct
+import sys
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+try:
+    from reprlib import aRepr
+except ImportError:  # pragma: no cover
+    from repr import aRepr
+
+from dirlay.content import Content
+from dirlay.nested_dict import NestedDict
+
+try:
+    intern = sys.intern
+except AttributeError:  # pragma: no cover  # Python 2
+
+    def intern(name):
+        return name
+
+
+DIR = 0
+TEXT = 1
+CONTENT = 2
+
+try:
+    OFFSET = array('q').typecode
+except ValueError:  # pragma: no cover  # Python 2
+    OFFSET = 'l'
+
+LINEAR_SEARCH = 16  # max number of children to search without index
+
+ENCODING = 'utf-8'
+ERRORS = 'surrogatepass' if sys.version_info >= (3,) else 'strict'
+
+MAGIC = b'DIRLAY\x00\x01'
+HEADER = struct.Struct('=8s4Q')  # magic, nodes, names, buffer, contents sizes
+
+
+class CompactStore(object):
+    """
+    Read-only storage of directory layout in flat arrays. Nodes are numbered in
+    breadth-first order, root is node ``0``, and children of every directory are
+    stored contiguously. Per node arrays:
+
+    - ``name_ids``: index in interned ``names`` table
+    - ``parents``: parent node index, ``-1`` for root
+    - ``kinds``: `DIR`, `TEXT`, or `CONTENT`
+    - ``starts``, ``lengths``: range of children for directories, range of encoded
+      text in shared ``buffer`` for text files
+    - ``by_name``: children of every directory, ordered by name id, for lookups
+
+    `~dirlay.content.Content` objects are stored as is in ``contents`` by node
+    index.
+
+    Store can be serialized with `dump` and loaded with `load` from any buffer,
+    e.g. memory-mapped file: arrays and text content are then read from the buffer
+    without copying.
+    """
+
+    __slots__ = (
+        'names',
+        'name_index',
+        'name_ids',
+        'parents',
+        'kinds',
+        'starts',
+        'lengths',
+        'by_name',
+        'buffer',
+        'contents',
+        'source',
+    )
+
+    def __init__(self, entries):
+        self.names = []
+        self.name_index = {}
+        self.name_ids = array('I')
+        self.parents = array('i')
+        self.kinds = array('b')
+        self.starts = array(OFFSET)
+        self.lengths = array(OFFSET)
+        self.by_name = array('i')
+        self.contents = {}
+        self.source = None
+        buffer = bytearray()
+
+        self._append('', -1, DIR)
+        self.by_name.append(0)
+        queue = [(0, entries)]
+        for index, entries in queue:  # breadth-first, queue grows while iterating
+            first = len(self.kinds)
+            for name, value in entries.items():
+                child = len(self.kinds)
+                if isinstance(value, Mapping):
+                    self._append(name, index, DIR)
+                    queue.append((child, value))
+                elif isinstance(value, Content):
+                    self._append(name, index, CONTENT)
+                    self.contents[child] = value
+                else:
+                    data = value.encode(ENCODING, ERRORS)
+                    self._append(name, index, TEXT, len(buffer), len(data))
+                    buffer.extend(data)
+            self.starts[index] = first
+            self.lengths[index] = len(self.kinds) - first
+            ids = self.name_ids
+            self.by_name.extend(sorted(range(first, len(ids)), key=ids.__getitem__))
+        self.buffer = bytes(buffer)
+
+    def _append(self, name, parent, kind, start=0, length=0):
+        name_id = self.name_index.get(name)
+        if name_id is None:
+            name_id = self.name_index[name] = len(self.names)
+            self.names.append(intern(name))
+        self.name_ids.append(name_id)
+        self.parents.append(parent)
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def nbytes(self):
+        """
+        Approximate memory used by arrays and content buffer, in bytes; interned
+        names and `~dirlay.content.Content` objects are not counted.
+        """
+        arrays = (
+            self.name_ids,
+            self.parents,
+            self.kinds,
+            self.starts,
+            self.lengths,
+            self.by_name,
+        )
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.buffer)
+
+    def value(self, index):
+        """
+        Return node value: `CompactMapping` for directory, ``str`` or
+        `~dirlay.content.Content` for file.
+        """
+        kind = self.kinds[index]
+        if kind == DIR:
+            return CompactMapping(self, index)
+        elif kind == TEXT:
+            start = self.starts[index]
+            data = self.buffer[start : start + self.lengths[index]]
+            return codecs.decode(data, ENCODING, ERRORS)
+        else:
+            return self.contents[index]
+
+    def child(self, index, name):
+        """
+        Return index of child node by name, or ``-1`` if there is no such child.
+        """
+        name_id = self.name_index.get(name)
+        if name_id is None:
+            return -1
+        ids = self.name_ids
+        first = self.starts[index]
+        last = first + self.lengths[index]
+        if last - first <= LINEAR_SEARCH:
+            try:
+                return first + ids[first:last].tolist().index(name_id)
+            except ValueError:
+                return -1
+        by_name = self.by_name
+        lo, hi = first, last
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids[by_name[mid]] < name_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < last and ids[by_name[lo]] == name_id:
+            return by_name[lo]
+        return -1
+
+    def key(self, index, sep='/'):
+        """
+        Return path of node relative to root.
+        """
+        parts = []
+        while index > 0:
+            parts.append(self.names[self.name_ids[index]])
+            index = self.parents[index]
+        return sep.join(reversed(parts))
+
+    def _arrays(self):
+        # ordered by item size, to keep sections aligned
+        return (
+            self.starts,
+            self.lengths,
+            self.name_ids,
+            self.parents,
+            self.by_name,
+            self.kinds,
+        )
+
+    def dump(self, f):
+        """
+        Write store to binary file object ``f``, in native byte order, and return
+        number of bytes written. `~dirlay.content.Content` objects are pickled.
+        """
+        names = '\0'.join(self.names).encode(ENCODING, ERRORS)
+        contents = pickle.dumps(self.contents, protocol=2)
+        header = HEADER.pack(
+            MAGIC, len(self), len(names), len(self.buffer), len(contents)
+        )
+        f.write(header)
+        for a in self._arrays():
+            f.write(a.tobytes() if hasattr(a, 'tobytes') else a.tostring())
+        f.write(names)
+        f.write(self.buffer)
+        f.write(contents)
+        return HEADER.size + self.nbytes() + len(names) + len(contents)
+
+    @classmethod
+    def load(cls, source):
+        """
+        Load store written by `dump` from ``source`` buffer. Arrays and text content
+        are views of ``source``, which is referenced by the store; names and
+        `~dirlay.content.Content` objects are decoded.
+
+        Raises:
+
+            ValueError: If ``source`` is not a serialized store.
+        """
+        view = memoryview(source)
+        if len(view) < HEADER.size or view[:8].tobytes() != MAGIC:
+            raise ValueError('Not a serialized directory layout')
+        _, nodes, names_size, buffer_size, contents_size = HEADER.unpack(
+            view[: HEADER.size].tobytes()
+        )
+        self = cls.__new__(cls)
+        self.source = source
+        pos = HEADER.size
+        for name, typecode in (
+            ('starts', OFFSET),
+            ('lengths', OFFSET),
+            ('name_ids', 'I'),
+            ('parents', 'i'),
+            ('by_name', 'i'),
+            ('kinds', 'b'),
+        ):
+            end = pos + nodes * array(typecode).itemsize
+            setattr(self, name, cast(view[pos:end], typecode))
+            pos = end
+        names = view[pos : pos + names_size].tobytes().decode(ENCODING, ERRORS)
+        self.names = [intern(n) for n in names.split('\0')]
+        self.name_index = {n: i for i, n in enumerate(self.names)}
+        pos += names_size
+        self.buffer = view[pos : pos + buffer_size]
+        pos += buffer_size
+        self.contents = pickle.loads(view[pos : pos + contents_size].tobytes())  # noqa: S301
+        return self
+
+
+def cast(view, typecode):
+    """
+    Return ``view`` of bytes as sequence of ``typecode`` items, without copying if
+    supported.
+    """
+    if hasattr(view, 'cast'):
+        return view.cast(typecode)
+    return array(typecode, view.tobytes())  # pragma: no cover  # Python 2
+
+
+class CompactMapping(Mapping):
+    """
+    Read-only directory view over `CompactStore`.
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index=0):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, name):
+        child = self._store.child(self._index, name)
+        if child < 0:
+            raise KeyError(name)
+        return self._store.value(child)
+
+    def __contains__(self, name):
+        return self._store.child(self._index, name) >= 0
+
+    def __iter__(self):
+        store = self._store
+        start = store.starts[self._index]
+        names, ids = store.names, store.name_ids
+        for i in range(start, start + store.lengths[self._index]):
+            yield names[ids[i]]
+
+    def __len__(self):
+        return self._store.lengths[self._index]
+
+    def items(self):
+        store = self._store
+        start = store.starts[self._index]
+        names, ids, value = store.names, store.name_ids, store.value
+        for i in range(start, start + store.lengths[self._index]):
+            yield names[ids[i]], value(i)
+
+    def __repr__(self):
+        return aRepr.repr_dict(self, aRepr.maxlevel)
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
+
+    def to_dict(self, dict_class=dict):
+        """
+        Return deep copy as nested ``dict_class`` objects.
+        """
+        ret = dict_class()
+        stack = [(self, ret)]
+        while stack:
+            src, dst = stack.pop()
+            for name, value in src.items():
+                if isinstance(value, CompactMapping):
+                    dst[name] = dict_class()
+                    stack.append((value, dst[name]))
+                else:
+                    dst[name] = value
+        return ret
+
+
+class CompactTree(NestedDict):
+    """
+    Read-only `~dirlay.nested_dict.NestedDict` backed by `CompactStore`.
+    """
+
+    def __init__(self, entries=None, store=None):
+        if store is None:
+            store = CompactStore({} if entries is None else entries)
+        self.store = store
+        self.data = CompactMapping(store)
+        self._len = len(store) - 1
+        self._version = 0
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Compact directory layout is read-only')
+
+    __setitem__ = __delitem__ = update = replace = put = clear = batch = _readonly
+    move = _readonly
+
+    def _traverse(self, key, create_parents, base):
+        if create_parents:
+            self._readonly()
+        store = base._store
+        child, kinds, sep = store.child, store.kinds, self.sep
+        index = base._index
+        parts = key if isinstance(key, tuple) else key.split(sep)
+        if not parts:
+            raise KeyError(key)
+        for i in range(len(parts) - 1):
+            index = child(index, parts[i])
+            if index < 0:
+                raise KeyError(sep.join(parts[: i + 1]))
+            if kinds[index] != DIR:
+                raise ValueError(
+                    'Not a dictionary: {}'.format(sep.join(parts[: i + 1]))
+                )
+        return CompactMapping(store, index), parts[-1]
+
+    def _count(self, item):
+        if not isinstance(item, CompactMapping):
+            return 1
+        store = item._store
+        count, stack = 1, [item._index]
+        while stack:
+            index = stack.pop()
+            start, length = store.starts[index], store.lengths[index]
+            count += length
+            stack.extend(
+                i for i in range(start, start + length) if store.kinds[i] == DIR
+            )
+        return count
+
+    def _walk(self, entries, prefix=None):
+        store = entries._store
+        names, ids, kinds = store.names, store.name_ids, store.kinds
+        starts, lengths, value = store.starts, store.lengths, store.value
+        sep = self.sep
+        stack = [(entries._index, prefix, entries, starts[entries._index])]
+        while stack:
+            index, prefix, parent, i = stack.pop()
+            if i == starts[index] + lengths[index]:
+                continue
+            stack.append((index, prefix, parent, i + 1))
+            name = names[ids[i]]
+            key = name if prefix is None else prefix + sep + name
+            if kinds[i] == DIR:
+                item = CompactMapping(store, i)
+                yield key, item, parent
+                stack.append((i, key, item, starts[i]))
+            else:
+                yield key, value(i), parent
+
+    def subtree(self, key):
+        ret = NestedDict.subtree(self, key)
+        ret.store = self.store
+        return ret
+
+    def __copy__(self):
+        ret = self.adopt(self.data)
+        ret.store = self.store
+        return ret
@@ -0,0 +1,97 @@
+from array import array
+from struct import Struct
+from collections.abc import Iterator, Mapping
+from typing import (
+    Any,
+    Dict,
+    BinaryIO,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from dirlay.content import Content
+from dirlay.nested_dict import NestedDict
+from dirlay.types import DictNode, DictTree, StrDict
+
+DIR: int
+TEXT: int
+CONTENT: int
+OFFSET: str
+LINEAR_SEARCH: int
+ENCODING: str
+ERRORS: str
+MAGIC: bytes
+HEADER: Struct
+
+def intern(name: str) -> str: ...
+
+class CompactStore(object):
+    names: List[str]
+    name_index: Dict[str, int]
+    name_ids: array[int]
+    parents: array[int]
+    kinds: array[int]
+    starts: array[int]
+    lengths: array[int]
+    by_name: array[int]
+    buffer: Union[bytes, memoryview]
+    contents: Dict[int, Content]
+    source: Any
+    def __init__(self, entries: DictTree) -> None: ...
+    def _append(
+        self,
+        name: str,
+        parent: int,
+        kind: int,
+        start: int = ...,
+        length: int = ...,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def nbytes(self) -> int: ...
+    def value(self, index: int) -> Union[str, Content, 'CompactMapping']: ...
+    def child(self, index: int, name: str) -> int: ...
+    def key(self, index: int, sep: str = ...) -> str: ...
+    def _arrays(self) -> Tuple[array[int], ...]: ...
+    def dump(self, f: BinaryIO) -> int: ...
+    @classmethod
+    def load(cls, source: Any) -> 'CompactStore': ...
+
+def cast(view: memoryview, typecode: str) -> Union[memoryview, array[int]]: ...
+
+D = TypeVar('D', bound=Dict[str, Any])
+
+class CompactMapping(Mapping[str, DictNode]):
+    _store: CompactStore
+    _index: int
+    def __init__(self, store: CompactStore, index: int = ...) -> None: ...
+    def __getitem__(self, name: str) -> DictNode: ...
+    def __contains__(self, name: object) -> bool: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def __len__(self) -> int: ...
+    def items(self) -> Iterator[Tuple[str, DictNode]]: ...  # type: ignore[override]
+    def __repr__(self) -> str: ...
+    def __reduce__(self) -> Tuple[Type[Dict[str, Any]], Tuple[StrDict]]: ...
+    def to_dict(self, dict_class: Type[D] = ...) -> D: ...
+
+class CompactTree(NestedDict[Any]):
+    store: CompactStore
+    data: CompactMapping
+    def __init__(
+        self,
+        entries: Optional[DictTree] = ...,
+        store: Optional[CompactStore] = ...,
+    ) -> None: ...
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn: ...
+    def _walk(  # type: ignore[override]
+        self,
+        entries: CompactMapping,
+        prefix: Optional[str] = ...,
+    ) -> Iterable[Tuple[str, Any, CompactMapping]]: ...
+    def subtree(self, key: Union[str, Tuple[str, ...]]) -> 'CompactTree': ...
+    def __copy__(self) -> 'CompactTree': ...
@@ -0,0 +1,381 @@
+import codecs
+import os
+import sys
+
+try:
+    from collections import OrderedDict
+except ImportError:  # pragma: no cover
+    OrderedDict = dict
+
+CHUNK_SIZE = 64 * 1024
+CODECS = ('zlib', 'lzma')
+CACHE_SIZE = 16 * 1024 * 1024  # characters of decompressed text kept in memory
+
+ENCODING = 'utf-8'
+ERRORS = 'surrogatepass' if sys.version_info >= (3,) else 'strict'
+
+
+class Content(object):
+    """
+    Base class for file content that is produced on demand instead of being stored
+    in memory as ``str``. Content objects can be used as file values in
+    `~dirlay.Dir` and are written chunk by chunk by `~dirlay.Dir.mktree`;
+    `~dirlay.Node.data` returns the full text.
+
+    Attributes:
+
+        size (``int``):
+            Content length in characters.
+    """
+
+    __slots__ = ()
+
+    size = 0
+
+    def read(self):
+        """
+        Return full content as ``str``.
+        """
+        return ''.join(self.chunks())
+
+    def chunks(self):
+        """
+        Iterate over content as ``str`` chunks.
+        """
+        raise NotImplementedError
+
+
+class SizedContent(Content):
+    """
+    Deterministic pseudo-random printable text of given size, generated on demand.
+
+    >>> SizedContent(10, seed=1) == SizedContent(10, seed=1)
+    True
+    >>> len(SizedContent(100000).read())
+    100000
+
+    Args:
+
+        size (``int``):
+            Content length in characters.
+
+        seed (``int``):
+            Random seed, defaults to ``0``.
+    """
+
+    __slots__ = ('size', 'seed')
+
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789 '
+    line_length = 64
+    block_lines = 16
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.seed = seed
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, SizedContent)
+            and self.size == other.size
+            and self.seed == other.seed
+        )
+
+    def __ne__(self, other):  # Python 2 support
+        return not self == other
+
+    def __hash__(self):
+        return hash((SizedContent, self.size, self.seed))
+
+    def __repr__(self):
+        return '<SizedContent size={} seed={}>'.format(self.size, self.seed)
+
+    def __getstate__(self):
+        return self.size, self.seed
+
+    def __setstate__(self, state):
+        self.size, self.seed = state
+
+    def chunks(self):
+        from random import Random
+
+        rng = Random(self.seed)  # noqa: S311  # not used for security
+        line = self.line_length - 1
+        block = ''.join(
+            ''.join(rng.choice(self.alphabet) for _ in range(line)) + '\n'
+            for _ in range(self.block_lines)
+        )
+        chunk = block * (CHUNK_SIZE // len(block))
+        remaining = self.size
+        while remaining > 0:
+            yield chunk[:remaining]
+            remaining -= len(chunk)
+
+
+class CompressedContent(Content):
+    """
+    Text held in memory compressed with ``zlib`` or ``lzma``. Full text returned by
+    `read` is kept in shared `TextCache` of recently used content, and `chunks`
+    decompress incrementally without building full text. Compressed content is
+    equal to its text and has the same hash, regardless of codec.
+
+    >>> text = 'line\\n' * 100000
+    >>> content = CompressedContent.from_text(text)
+    >>> content.size, len(content.data) < 1000, content.read() == text
+    (500000, True, True)
+
+    Args:
+
+        data (``bytes``):
+            Compressed UTF-8 encoded text.
+
+        size (``int``):
+            Text length in characters.
+
+        codec (``str``):
+            Compression codec, ``'zlib'`` (default) or ``'lzma'``.
+    """
+
+    __slots__ = ('data', 'size', 'codec', '_hash')
+
+    def __init__(self, data, size, codec='zlib'):
+        self.data = data
+        self.size = size
+        self.codec = codec
+        self._hash = None  # hash of text, computed once
+
+    @classmethod
+    def from_text(cls, text, codec='zlib'):
+        """
+        Compress ``text`` with ``codec``.
+
+        Raises:
+
+            ValueError: If ``codec`` is not supported or not available.
+        """
+        data = text.encode(ENCODING, ERRORS)
+        ret = cls(compressor(codec).compress(data), len(text), codec)
+        ret._hash = hash(text)
+        return ret
+
+    def __eq__(self, other):
+        if isinstance(other, CompressedContent):
+            if self.codec == other.codec and self.data == other.data:
+                return True
+            other = other.read() if self.size == other.size else None
+        if isinstance(other, str):  # compare with uncompressed text
+            return self.size == len(other) and self.read() == other
+        return False
+
+    def __ne__(self, other):  # Python 2 support
+        return not self == other
+
+    def __hash__(self):
+        if self._hash is None:  # same as hash of equal text
+            self._hash = hash(self.read())
+        return self._hash
+
+    def __repr__(self):
+        return '<CompressedContent size={} codec={} compressed={}>'.format(
+            self.size, self.codec, len(self.data)
+        )
+
+    def __getstate__(self):
+        return self.data, self.size, self.codec
+
+    def __setstate__(self, state):
+        self.data, self.size, self.codec = state
+        self._hash = None  # str hash is randomized per process
+
+    def read(self):
+        key = (self.codec, self.data)
+        text = cache.get(key)
+        if text is None:
+            text = ''.join(self.chunks())
+            cache.put(key, text)
+        return text
+
+    def chunks(self):
+        decoder = codecs.getincrementaldecoder(ENCODING)(ERRORS)
+        for data in decompress(self.codec, self.data):
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+
+
+class FileRef(Content):
+    """
+    Reference to existing file, materialized by `~dirlay.Dir.mktree` without reading
+    its content into memory: copied in kernel, cloned, hard linked, or symlinked,
+    depending on ``mode``. File bytes are copied as is, without newline translation
+    or re-encoding; `~dirlay.Node.data` returns text decoded as UTF-8.
+
+    >>> ref = FileRef('/data/sample.bin', mode='symlink')
+    >>> ref
+    <FileRef path='/data/sample.bin' mode='symlink'>
+    >>> ref == FileRef('/data/sample.bin', mode='symlink'), ref.linked
+    (True, True)
+
+    Modes:
+
+    - ``'copy'`` (default): copy with `os.copy_file_range` where available,
+      falling back to chunked copy
+    - ``'reflink'``: clone with copy-on-write ``FICLONE`` ioctl on Linux file systems
+      that support it, e.g. Btrfs or XFS, falling back to ``'copy'``
+    - ``'hardlink'``: create hard link with `os.link`
+    - ``'symlink'``: create symbolic link with `os.symlink`
+
+    Linked files share content with the referenced file, and modifications through
+    either path affect both.
+
+    Args:
+
+        path (`~pathlib.Path` | ``str``):
+            Path to referenced file, made absolute.
+
+        mode (``str``):
+            Materialization mode, one of `MODES`.
+
+    Raises:
+
+        ValueError: If ``mode`` is not supported.
+    """
+
+    __slots__ = ('path', 'mode')
+
+    MODES = ('copy', 'reflink', 'hardlink', 'symlink')
+
+    def __init__(self, path, mode='copy'):
+        if mode not in self.MODES:
+            raise ValueError('Unsupported mode: {!r}'.format(mode))
+        self.path = os.path.abspath(str(path))
+        self.mode = mode
+
+    @property
+    def size(self):
+        """
+        Size of referenced file in bytes.
+        """
+        return os.stat(self.path).st_size
+
+    @property
+    def linked(self):
+        """
+        Whether materialized file is a link to the referenced file.
+        """
+        return self.mode in ('hardlink', 'symlink')
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, FileRef)
+            and self.path == other.path
+            and self.mode == other.mode
+        )
+
+    def __ne__(self, other):  # Python 2 support
+        return not self == other
+
+    def __hash__(self):
+        return hash((FileRef, self.path, self.mode))
+
+    def __repr__(self):
+        return '<FileRef path={!r} mode={!r}>'.format(self.path, self.mode)
+
+    def __getstate__(self):
+        return self.path, self.mode
+
+    def __setstate__(self, state):
+        self.path, self.mode = state
+
+    def chunks(self):
+        decoder = codecs.getincrementaldecoder(ENCODING)(ERRORS)
+        with open(self.path, 'rb') as f:
+            for data in iter(lambda: f.read(CHUNK_SIZE), b''):
+                text = decoder.decode(data)
+                if text:
+                    yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+
+
+def compressor(codec):
+    """
+    Return module implementing ``codec``.
+
+    Raises:
+
+        ValueError: If ``codec`` is not supported or not available.
+    """
+    if codec == 'zlib':
+        import zlib
+
+        return zlib
+    elif codec == 'lzma':
+        try:
+            import lzma
+        except ImportError:  # pragma: no cover  # Python 2
+            raise ValueError('Codec is not available: lzma')  # noqa: B904
+        return lzma
+    raise ValueError('Unsupported codec: {!r}'.format(codec))
+
+
+def decompress(codec, data):
+    """
+    Iterate over decompressed ``data`` in chunks of at most `CHUNK_SIZE` bytes.
+    """
+    if codec == 'zlib':
+        d = compressor(codec).decompressobj()
+        while data:
+            yield d.decompress(data, CHUNK_SIZE)
+            data = d.unconsumed_tail
+        yield d.flush()
+    else:
+        d = compressor(codec).LZMADecompressor()
+        chunk = d.decompress(data, CHUNK_SIZE)
+        while True:
+            yield chunk
+            if d.eof:
+                break
+            if d.needs_input:
+                raise EOFError('Compressed data ended before end-of-stream marker')
+            chunk = d.decompress(b'', CHUNK_SIZE)
+
+
+class TextCache(object):
+    """
+    Least recently used cache of decompressed text, limited by total number of
+    characters. Text longer than the limit is not cached.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.items = OrderedDict()
+
+    def get(self, key):
+        text = self.items.pop(key, None)
+        if text is not None:
+            self.items[key] = text  # most recently used
+        return text
+
+    def put(self, key, text):
+        if len(text) > self.max_size:
+            return
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.items[key] = text
+        self.size += len(text)
+        while self.size > self.max_size:
+            _, old = self.items.popitem(last=False)
+            self.size -= len(old)
+
+    def clear(self):
+        self.items.clear()
+        self.size = 0
+
+
+cache = TextCache()
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from collections.abc import Iterator
+from types import ModuleType
+from typing import Any, Optional, Tuple
+
+from dirlay.types import PathType
+
+CHUNK_SIZE: int
+CODECS: Tuple[str, ...]
+CACHE_SIZE: int
+ENCODING: str
+ERRORS: str
+
+class Content(object):
+    size: int
+    def read(self) -> str: ...
+    def chunks(self) -> Iterator[str]: ...
+
+class SizedContent(Content):
+    alphabet: str
+    line_length: int
+    block_lines: int
+    seed: int
+    def __init__(self, size: int, seed: int = ...) -> None: ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __ne__(self, other: Any) -> bool: ...
+    def __hash__(self) -> int: ...
+    def __repr__(self) -> str: ...
+    def __getstate__(self) -> Tuple[int, int]: ...
+    def __setstate__(self, state: Tuple[int, int]) -> None: ...
+
+class CompressedContent(Content):
+    data: bytes
+    codec: str
+    _hash: Optional[int]
+    def __init__(self, data: bytes, size: int, codec: str = ...) -> None: ...
+    @classmethod
+    def from_text(cls, text: str, codec: str = ...) -> 'CompressedContent': ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __ne__(self, other: Any) -> bool: ...
+    def __hash__(self) -> int: ...
+    def __repr__(self) -> str: ...
+    def __getstate__(self) -> Tuple[bytes, int, str]: ...
+    def __setstate__(self, state: Tuple[bytes, int, str]) -> None: ...
+
+class FileRef(Content):
+    MODES: Tuple[str, ...]
+    path: str
+    mode: str
+    def __init__(self, path: PathType, mode: str = ...) -> None: ...
+    @property
+    def size(self) -> int: ...  # type: ignore[override]
+    @property
+    def linked(self) -> bool: ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __ne__(self, other: Any) -> bool: ...
+    def __hash__(self) -> int: ...
+    def __repr__(self) -> str: ...
+    def __getstate__(self) -> Tuple[str, str]: ...
+    def __setstate__(self, state: Tuple[str, str]) -> None: ...
+
+def compressor(codec: str) -> ModuleType: ...
+def decompress(codec: str, data: bytes) -> Iterator[bytes]: ...
+
+class TextCache(object):
+    max_size: int
+    size: int
+    items: OrderedDict[Tuple[str, bytes], str]
+    def __init__(self, max_size: int = ...) -> None: ...
+    def get(self, key: Tuple[str, bytes]) -> Optional[str]: ...
+    def put(self, key: Tuple[str, bytes], text: str) -> None: ...
+    def clear(self) -> None: ...
+
+cache: TextCache
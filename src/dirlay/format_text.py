@@ -0,0 +1,82 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+import sys
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from dirlay.content import Content
+
+
+class DefaultTheme:
+    root = '.'  # type: str
+    branch = '├── '  # type: str
+    branch_last = '└── '  # type: str
+    indent = '│   '  # type: str
+    indent_last = '    '  # type: str
+    dir_suffix = '/'  # type: str
+    data_indent = '  '  # type: str
+
+
+def write_tree(tree, fp=None, show_data=False, max_depth=None):
+    """
+    Write plain text representation of the directory layout, similar to ``tree -F``
+    output. Lines are written one by one while walking the layout, entries are sorted
+    by name within each directory. See `~dirlay.Dir.format_tree` for examples.
+
+    Args:
+
+        tree (`~dirlay.Dir`):
+            Directory layout to be formatted.
+
+        fp (``TextIO`` | ``None``):
+            Text stream to write to; defaults to `sys.stdout`.
+
+        show_data (``bool``):
+            Whether to include file content indented under the file name; defaults to
+            ``False``.
+
+        max_depth (``int`` | ``None``):
+            Maximum number of levels to display below the root; ``None`` (default)
+            means no limit.
+
+    Returns:
+
+        ``None``
+    """
+    theme = DefaultTheme
+    write = (sys.stdout if fp is None else fp).write
+
+    write(theme.root + '\n')
+    stack = [(children(tree.data), 0, '')] if max_depth != 0 else []
+    while stack:
+        entries, i, prefix = stack.pop()
+        if i == len(entries):
+            continue
+        stack.append((entries, i + 1, prefix))
+        name, value = entries[i]
+        last = i == len(entries) - 1
+        isdir = isinstance(value, Mapping)
+        write(
+            '{}{}{}{}\n'.format(
+                prefix,
+                theme.branch_last if last else theme.branch,
+                name,
+                theme.dir_suffix if isdir else '',
+            )
+        )
+        inner = prefix + (theme.indent_last if last else theme.indent)
+        if isdir:
+            if max_depth is None or len(stack) < max_depth:
+                stack.append((children(value), 0, inner))
+        elif show_data:
+            text = value.read() if isinstance(value, Content) else value
+            for line in text.splitlines():
+                write('{}{}{}\n'.format(inner, theme.data_indent, line))
+
+
+def children(entries):
+    return sorted(entries.items(), key=lambda kv: kv[0])
@@ -0,0 +1,21 @@
+from typing import List, Optional, TextIO, Tuple
+
+from dirlay import Dir
+from dirlay.types import DictNode, DictTree
+
+class DefaultTheme:
+    root: str
+    branch: str
+    branch_last: str
+    indent: str
+    indent_last: str
+    dir_suffix: str
+    data_indent: str
+
+def write_tree(
+    tree: Dir,
+    fp: Optional[TextIO] = ...,
+    show_data: bool = ...,
+    max_depth: Optional[int] = ...,
+) -> None: ...
+def children(entries: DictTree) -> List[Tuple[str, DictNode]]: ...
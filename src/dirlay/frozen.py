@@ -0,0 +1,179 @@
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from dirlay import Dir, NestedDict, Node
+from dirlay.nested_dict import copy_tree
+
+
+class FrozenNode(Node):
+    """
+    `~dirlay.Node` of frozen layout, with directories returned as read-only
+    mappings.
+    """
+
+    @property
+    def data(self):
+        value = Node.data.fget(self)
+        return FrozenMapping(value) if isinstance(value, Mapping) else value
+
+    @data.setter
+    def data(self, value):
+        self._tree._readonly()
+
+
+class FrozenDir(Dir):
+    """
+    Immutable directory layout, usually returned by `~dirlay.Dir.freeze`. Frozen
+    layout is hashable, with hash computed once, and can be read by many threads
+    without locks or copies. Methods that modify the layout raise `TypeError`, and
+    directories are returned as read-only mappings; `~dirlay.FrozenDir.thaw`
+    returns mutable layout.
+
+    Frozen layout can be materialized with `~dirlay.Dir.mktree`, which links it to
+    one base directory at a time, like any other layout; threads that materialize
+    shared layout concurrently should use layouts returned by
+    `~dirlay.FrozenDir.thaw`, that share data until modified.
+
+    >>> frozen = Dir({'a': {'b.txt': 'B'}}).freeze()
+    >>> frozen == Dir({'a': {'b.txt': 'B'}}), frozen['a/b.txt'].data
+    (True, 'B')
+    >>> hash(frozen) == hash(FrozenDir({'a/b.txt': 'B'}))
+    True
+    >>> frozen['a/c.txt'] = 'C'
+    Traceback (most recent call last):
+      ...
+    TypeError: Frozen directory layout is read-only
+
+    Args:
+
+        entries (``dict[str, str | dict]`` | ``None``):
+            Same as for `~dirlay.Dir`.
+    """
+
+    _node_class = FrozenNode
+
+    def __init__(self, entries=None):
+        Dir.__init__(self, entries)
+        tree = self._tree
+        self._tree = FrozenTree.adopt(tree.data)
+        self._tree._len = len(tree)
+
+    @property
+    def data(self):
+        """
+        Read-only view of internal data mapping.
+        """
+        return FrozenMapping(self._tree.data)
+
+    def __hash__(self):
+        return hash(self._tree)
+
+    def _readonly(self, *args, **kwargs):
+        self._tree._readonly()
+
+    compress = _readonly
+
+    def freeze(self):
+        """
+        Return self.
+        """
+        return self
+
+    def thaw(self):
+        """
+        Return mutable directory layout sharing data with self until first
+        modification, when data is copied.
+
+        >>> frozen = FrozenDir({'a/b.txt': 'B'})
+        >>> tree = frozen.thaw()
+        >>> tree['a/b.txt'] = 'changed'
+        >>> tree['a/b.txt'].data, frozen['a/b.txt'].data
+        ('changed', 'B')
+
+        Returns:
+
+            `~dirlay.Dir`
+        """
+        ret = Dir()
+        ret._tree = NestedDict.adopt(self._tree.data)
+        ret._tree._len = len(self._tree)
+        ret._tree._shared = True
+        return ret
+
+
+class FrozenTree(NestedDict):
+    """
+    Immutable `~dirlay.nested_dict.NestedDict` with cached hash.
+    """
+
+    _hash = None
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Frozen directory layout is read-only')
+
+    __setitem__ = __delitem__ = update = replace = put = clear = batch = _readonly
+    move = _readonly
+
+    def __hash__(self):
+        if self._hash is None:  # concurrent threads compute the same value
+            self._hash = hash_tree(self.data, self.dict_class)
+        return self._hash
+
+
+class FrozenMapping(Mapping):
+    """
+    Read-only view of nested directory ``dict`` of frozen layout; nested
+    directories are returned as views too.
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, name):
+        value = self._data[name]
+        return FrozenMapping(value) if isinstance(value, Mapping) else value
+
+    def __contains__(self, name):
+        return name in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def items(self):
+        for name, value in self._data.items():
+            yield name, FrozenMapping(value) if isinstance(value, Mapping) else value
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenMapping):
+            other = other._data
+        return self._data == other
+
+    def __ne__(self, other):  # Python 2 support
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]  # like dict
+
+    def __repr__(self):
+        return repr(self._data)
+
+    def __reduce__(self):
+        return (dict, (copy_tree(self._data, dict)[0],))
+
+
+def hash_tree(entries, dict_class):
+    """
+    Return hash of nested ``entries``, independent of item order.
+    """
+    items = []
+    for name, value in entries.items():
+        if isinstance(value, dict_class):
+            value = hash_tree(value, dict_class)
+        items.append((name, hash(value)))
+    return hash(frozenset(items))
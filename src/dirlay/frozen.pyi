@@ -0,0 +1,37 @@
+from collections.abc import Iterator, Mapping
+from typing import Any, Dict, NoReturn, Optional, Tuple, Type
+
+from dirlay import Dir, Node
+from dirlay.nested_dict import NestedDict
+from dirlay.types import DictNode, DictTree, StrDict
+
+class FrozenNode(Node):
+    @property
+    def data(self) -> DictNode: ...
+    @data.setter
+    def data(self, value: DictNode) -> None: ...
+
+class FrozenDir(Dir):
+    _tree: FrozenTree
+    _node_class: Type[FrozenNode]
+    def __init__(self, entries: Optional[DictTree] = ...) -> None: ...
+    @property
+    def data(self) -> 'FrozenMapping': ...
+    def __hash__(self) -> int: ...
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn: ...
+    def thaw(self) -> Dir: ...
+
+class FrozenTree(NestedDict[Any]):
+    _hash: Optional[int]
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn: ...
+    def __hash__(self) -> int: ...
+
+class FrozenMapping(Mapping[str, Any]):
+    _data: DictTree
+    def __init__(self, data: DictTree) -> None: ...
+    def __getitem__(self, name: str) -> Any: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def __len__(self) -> int: ...
+    def __reduce__(self) -> Tuple[Type[Dict[str, Any]], Tuple[StrDict]]: ...
+
+def hash_tree(entries: DictTree, dict_class: type) -> int: ...
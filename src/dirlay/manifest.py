@@ -0,0 +1,74 @@
+import errno
+import os
+import shutil
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+
+def missing(basedir, entries):
+    """
+    Return relative paths of ``entries`` that do not exist under ``basedir``, parents
+    before children, with trailing ``'/'`` for directories. Existence is checked
+    only for entries of existing directories, so the cost is proportional to the
+    layout, not to ``basedir`` contents.
+    """
+    ret = []
+    stack = [(str(basedir), '', entries, True)]
+    while stack:
+        dirpath, prefix, entries, exists = stack.pop()
+        for name, value in entries.items():
+            path = os.path.join(dirpath, name)
+            new = not exists or not os.path.lexists(path)
+            if isinstance(value, Mapping):
+                if new:
+                    ret.append(prefix + name + '/')
+                stack.append((path, prefix + name + '/', value, not new))
+            elif new:
+                ret.append(prefix + name)
+    return ret
+
+
+def foreign(basedir, entries):
+    """
+    Return relative paths of entries under ``basedir`` that are not in ``entries``,
+    as ``frozenset``. Only directories of ``entries`` that exist are listed, so the
+    cost is proportional to the layout, not to ``basedir`` contents.
+    """
+    ret = []
+    stack = [(str(basedir), '', entries)]
+    while stack:
+        dirpath, prefix, entries = stack.pop()
+        for name in os.listdir(dirpath):
+            if name not in entries:
+                ret.append(prefix + name)
+                continue
+            path = os.path.join(dirpath, name)
+            if isinstance(entries[name], Mapping) and os.path.isdir(path):
+                stack.append((path, prefix + name + '/', entries[name]))
+    return frozenset(ret)
+
+
+def cleanup(basedir, manifest):
+    """
+    Remove entries listed in ``manifest`` from ``basedir``, deepest first. Missing
+    entries are skipped; directories with entries not listed in ``manifest`` are
+    removed with all their contents, because they were created as listed.
+    """
+    basedir = str(basedir)
+    for key in reversed(manifest):
+        path = os.path.join(basedir, key.rstrip('/'))
+        try:
+            if key.endswith('/'):
+                os.rmdir(path)
+            else:
+                os.unlink(path)
+        except OSError as exc:
+            if exc.errno == errno.ENOENT:
+                continue
+            directory = key.endswith('/')
+            if not directory or exc.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                raise
+            shutil.rmtree(path)
@@ -0,0 +1,7 @@
+from typing import FrozenSet, List
+
+from dirlay.types import DictTree, PathType
+
+def missing(basedir: PathType, entries: DictTree) -> List[str]: ...
+def foreign(basedir: PathType, entries: DictTree) -> FrozenSet[str]: ...
+def cleanup(basedir: PathType, manifest: List[str]) -> None: ...
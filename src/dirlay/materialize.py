@@ -0,0 +1,364 @@
+import errno
+import locale
+import os
+import shutil
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover  # Windows
+    fcntl = None
+
+from dirlay.content import CHUNK_SIZE, Content, FileRef
+from dirlay.optional import pathlib
+from dirlay.stats import MaterializationStats, perf_counter
+
+
+Path = pathlib.Path
+
+
+def materialize(
+    basedir,
+    entries,
+    stats,
+    observers=(),
+    encoding=None,
+    newline=None,
+    snap=None,
+    prefix='',
+):
+    """
+    Create directories and files from nested ``entries`` under existing ``basedir``,
+    walking top-down, and update ``stats`` in place.
+
+    Text is encoded as in `open` text mode: ``encoding`` defaults to locale preferred
+    encoding, and ``'\\n'`` is translated to ``newline``, defaulting to `os.linesep`.
+
+    If ``snap`` is passed, `signature` of every file written, except linked ones,
+    is recorded by its relative path, prefixed with ``prefix``.
+    """
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    if newline is None:
+        newline = os.linesep
+    times = stats.times
+    stack = [(str(basedir), prefix, entries)]
+    while stack:
+        dirpath, prefix, entries = stack.pop()
+        for name, value in entries.items():
+            path = os.path.join(dirpath, name)
+            if isinstance(value, Mapping):
+                start = perf_counter()
+                created = mkdir(path)
+                times['mkdir'] += perf_counter() - start
+                if created:
+                    stats.dirs += 1
+                    for o in observers:
+                        o.on_mkdir(Path(path))
+                stack.append((path, prefix + name + '/', value))
+            else:
+                key = prefix + name
+                size = write(path, value, times, encoding, newline, snap, key)
+                stats.files += 1
+                stats.bytes += size
+                for o in observers:
+                    o.on_write(Path(path), size)
+
+
+def write(path, value, times, encoding, newline, snap=None, key=None):
+    """
+    Write ``str`` or `~dirlay.content.Content` to file chunk by chunk, update
+    ``'encode'`` and ``'write'`` phase times, and return number of bytes written.
+    `~dirlay.content.FileRef` is copied or linked with `link`. If ``snap`` is
+    passed, `signature` of written file is recorded as ``snap[key]``, taken from
+    open file for text, and never for linked files.
+    """
+    if isinstance(value, FileRef):
+        size = link(path, value, times)
+        if snap is not None and not value.linked:
+            snap[key] = signature(os.lstat(path))
+        return size
+    size = 0
+    encoding_time = 0.0
+    chunks = value.chunks() if isinstance(value, Content) else (value,)
+    start = perf_counter()
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            encoding_start = perf_counter()
+            data = encode(chunk, encoding, newline)
+            encoding_time += perf_counter() - encoding_start
+            f.write(data)
+            size += len(data)
+        if snap is not None:
+            f.flush()
+            snap[key] = signature(os.fstat(f.fileno()))
+    times['encode'] += encoding_time
+    times['write'] += perf_counter() - start - encoding_time
+    return size
+
+
+def signature(st):
+    """
+    Return ``(inode, size, mtime_ns)`` of ``stat_result``.
+    """
+    mtime_ns = getattr(st, 'st_mtime_ns', None)
+    if mtime_ns is None:  # pragma: no cover  # Python 2
+        mtime_ns = int(st.st_mtime * 1e9)
+    return (st.st_ino, st.st_size, mtime_ns)
+
+
+def link(path, ref, times):
+    """
+    Create file from `~dirlay.content.FileRef` by its mode, update ``'write'`` phase
+    time, and return number of bytes copied, zero for links. Existing file is
+    unlinked first, to never write through a link to the referenced file.
+    """
+    start = perf_counter()
+    try:
+        os.unlink(path)
+    except OSError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+    if ref.mode == 'symlink':
+        os.symlink(ref.path, path)
+        size = 0
+    elif ref.mode == 'hardlink':
+        os.link(ref.path, path)
+        size = 0
+    else:
+        size = copy_file(ref.path, path, reflink=ref.mode == 'reflink')
+    times['write'] += perf_counter() - start
+    return size
+
+
+FICLONE = 0x40049409  # Linux ioctl number, _IOW(0x94, 9, int)
+COPY_RANGE = 1 << 30  # max bytes per copy_file_range call
+
+
+def copy_file(src, dst, reflink=False):
+    """
+    Copy content of file ``src`` to ``dst`` and return number of bytes copied. If
+    ``reflink`` is set, file is cloned with ``FICLONE`` first; otherwise, or if
+    cloning is not supported, it is copied in kernel with `os.copy_file_range`,
+    falling back to chunked copy when kernel copy is not available.
+    """
+    with open(src, 'rb') as fsrc:
+        with open(dst, 'wb') as fdst:
+            if reflink and clone(fsrc.fileno(), fdst.fileno()):
+                return os.fstat(fdst.fileno()).st_size
+            size = copy_range(fsrc.fileno(), fdst.fileno())
+            if size is None:
+                shutil.copyfileobj(fsrc, fdst, CHUNK_SIZE)
+                size = fdst.tell()
+            return size
+
+
+def clone(infd, outfd):
+    """
+    Clone file ``infd`` to empty ``outfd``, return ``False`` if not supported.
+    """
+    if fcntl is None:  # pragma: no cover
+        return False
+    try:
+        fcntl.ioctl(outfd, FICLONE, infd)
+    except EnvironmentError:  # unsupported file system or cross-device
+        return False
+    return True
+
+
+def copy_range(infd, outfd):
+    """
+    Copy file ``infd`` to ``outfd`` in kernel, return number of bytes copied, or
+    ``None`` if `os.copy_file_range` is not available and nothing was copied.
+    """
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is None:  # pragma: no cover  # Python < 3.8 or not Linux
+        return None
+    size = 0
+    while True:
+        try:
+            n = copy_file_range(infd, outfd, COPY_RANGE)
+        except OSError as exc:
+            fallback = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP)
+            if size == 0 and exc.errno in fallback:
+                return None
+            raise
+        if n == 0:
+            return size
+        size += n
+
+
+def mkdir(path):
+    """
+    Create directory, return ``False`` if it already exists.
+    """
+    try:
+        os.mkdir(path)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST or not os.path.isdir(path):
+            raise
+        return False
+    return True
+
+
+def encode(text, encoding, newline):
+    if isinstance(text, bytes):  # pragma: no cover  # Python 2 str
+        text = text.decode('utf-8')
+    if newline != '\n':
+        text = text.replace('\n', newline)
+    return text.encode(encoding)
+
+
+# parallel
+
+
+BLOCK_SIZE = 4096  # file of this size weighs as one more entry
+
+
+def materialize_parallel(
+    basedir,
+    entries,
+    stats,
+    workers,
+    pool='process',
+    observers=(),
+    encoding=None,
+    newline=None,
+    snap=None,
+):
+    """
+    Create directories and files like `materialize`, using a pool of ``workers``
+    processes or threads. Layout is split into size-balanced shards, directories
+    shared by several shards are created first, and then workers materialize shards
+    independently. Workers report statistics, errors, and file signatures if
+    ``snap`` is passed, which are merged into ``stats`` and ``snap``; first error is
+    raised after all workers have finished.
+
+    Observers are notified of shared directories only, not of entries created by
+    workers. Merged phase times are totals across workers.
+    """
+    ancestors, shards = shard(entries, workers)
+    # shared directories
+    for key in ancestors:
+        path = os.path.join(str(basedir), key)
+        start = perf_counter()
+        created = mkdir(path)
+        stats.times['mkdir'] += perf_counter() - start
+        if created:
+            stats.dirs += 1
+            for o in observers:
+                o.on_mkdir(Path(path))
+    # shards
+    if pool == 'process':
+        from multiprocessing import Pool
+    else:
+        from multiprocessing.pool import ThreadPool as Pool
+    record = snap is not None
+    tasks = [(str(basedir), items, encoding, newline, record) for items in shards]
+    executor = Pool(min(workers, len(tasks)) or 1)
+    try:
+        reports = executor.map(materialize_shard, tasks, chunksize=1)
+    finally:
+        executor.close()
+        executor.join()
+    # merge
+    errors = []
+    for report, shard_errors, shard_snap in reports:
+        stats.merge(report)
+        errors.extend(shard_errors)
+        if record:
+            snap.update(shard_snap)
+    if errors:
+        raise errors[0]
+
+
+def materialize_shard(task):
+    """
+    Materialize shard in worker, return statistics, errors, and file signatures if
+    requested.
+    """
+    basedir, items, encoding, newline, record = task
+    stats = MaterializationStats()
+    errors = []
+    snap = {} if record else None
+    for prefix, entries in items:
+        try:
+            materialize(
+                os.path.join(basedir, prefix),
+                entries,
+                stats,
+                encoding=encoding,
+                newline=newline,
+                snap=snap,
+                prefix=prefix.replace(os.sep, '/') + '/' if prefix else '',
+            )
+        except EnvironmentError as exc:
+            errors.append(exc)
+    return stats.as_dict(), errors, snap
+
+
+def shard(entries, workers, split=4):
+    """
+    Split nested entries into at most ``workers`` shards of similar weight, where
+    weight is number of entries plus file sizes in `BLOCK_SIZE` units. Directories
+    heavier than ``1 / (workers * split)`` of the total are split further.
+
+    Returns:
+
+        Tuple of directory keys to be created before shards, parents first, and
+        list of shards, each being a list of ``(dir_key, partial_entries)`` tuples.
+    """
+    weights = {}
+    total = weigh(entries, weights)
+    group_class = type(entries) if isinstance(entries, dict) else dict
+    target = max(1, total // (workers * split))
+    ancestors = []
+    groups = []
+    stack = [('', entries)]
+    while stack:
+        prefix, node = stack.pop()
+        group, group_weight = group_class(), 0
+        for name, value in node.items():
+            key = os.path.join(prefix, name) if prefix else name
+            weight = weights[key] if isinstance(value, Mapping) else weigh(value)
+            if isinstance(value, Mapping) and weight > target and len(value):
+                ancestors.append(key)
+                stack.append((key, value))
+                continue
+            group[name] = value
+            group_weight += weight
+            if group_weight >= target:
+                groups.append((group_weight, prefix, group))
+                group, group_weight = group_class(), 0
+        if group:
+            groups.append((group_weight, prefix, group))
+    # longest processing time first
+    bins = [[0, []] for _ in range(workers)]
+    for weight, prefix, group in sorted(groups, key=lambda g: -g[0]):
+        b = min(bins, key=lambda b: b[0])
+        b[0] += weight
+        b[1].append((prefix, group))
+    return ancestors, [items for _, items in bins if items]
+
+
+def weigh(value, weights=None, key=''):
+    """
+    Return weight of file or directory with path ``key``; weights of nested
+    directories are stored in ``weights`` by path.
+    """
+    if not isinstance(value, Mapping):
+        size = value.size if isinstance(value, Content) else len(value)
+        return 1 + size // BLOCK_SIZE
+    ret = 1
+    for name, v in value.items():
+        if isinstance(v, Mapping):
+            ret += weigh(v, weights, os.path.join(key, name) if key else name)
+        else:
+            ret += weigh(v)
+    if weights is not None:
+        weights[key] = ret
+    return ret
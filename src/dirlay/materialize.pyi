@@ -0,0 +1,69 @@
+from collections.abc import Iterable
+from os import stat_result
+from typing import Dict, List, Optional, Tuple, Union
+
+from dirlay.content import Content, FileRef
+from dirlay.stats import MaterializationStats, Observer, StatsDict
+from dirlay.types import DictTree, PathType
+
+Signature = Tuple[int, int, int]
+
+def materialize(
+    basedir: PathType,
+    entries: DictTree,
+    stats: MaterializationStats,
+    observers: Iterable[Observer] = ...,
+    encoding: Optional[str] = ...,
+    newline: Optional[str] = ...,
+    snap: Optional[Dict[str, Signature]] = ...,
+    prefix: str = ...,
+) -> None: ...
+def write(
+    path: str,
+    value: Union[str, Content],
+    times: Dict[str, float],
+    encoding: str,
+    newline: str,
+    snap: Optional[Dict[str, Signature]] = ...,
+    key: Optional[str] = ...,
+) -> int: ...
+def signature(st: stat_result) -> Signature: ...
+def link(path: str, ref: FileRef, times: Dict[str, float]) -> int: ...
+
+FICLONE: int
+COPY_RANGE: int
+
+def copy_file(src: str, dst: str, reflink: bool = ...) -> int: ...
+def clone(infd: int, outfd: int) -> bool: ...
+def copy_range(infd: int, outfd: int) -> Optional[int]: ...
+def mkdir(path: str) -> bool: ...
+def encode(text: str, encoding: str, newline: str) -> bytes: ...
+
+BLOCK_SIZE: int
+
+Shard = List[Tuple[str, DictTree]]
+
+def materialize_parallel(
+    basedir: PathType,
+    entries: DictTree,
+    stats: MaterializationStats,
+    workers: int,
+    pool: str = ...,
+    observers: Iterable[Observer] = ...,
+    encoding: Optional[str] = ...,
+    newline: Optional[str] = ...,
+    snap: Optional[Dict[str, Signature]] = ...,
+) -> None: ...
+def materialize_shard(
+    task: Tuple[str, Shard, Optional[str], Optional[str], bool],
+) -> Tuple[StatsDict, List[EnvironmentError], Optional[Dict[str, Signature]]]: ...
+def shard(
+    entries: DictTree,
+    workers: int,
+    split: int = ...,
+) -> Tuple[List[str], List[Shard]]: ...
+def weigh(
+    value: Union[str, Content, DictTree],
+    weights: Optional[Dict[str, int]] = ...,
+    key: str = ...,
+) -> int: ...
@@ -1,3 +1,10 @@
+from contextlib import contextmanager
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
 try:
     from collections import UserDict
 except ImportError:  # pragma: no cover
@@ -8,24 +15,170 @@ except ImportError:  # pragma: no cover
 
 class NestedDict(UserDict):
     """
-    General purpose dict that allows accessing nested items by delimited keys.
+    General purpose dict that allows accessing nested items by delimited keys, or
+    by tuples of names:
+
+    >>> d = NestedDict({'a/b': 1})
+    >>> d['a/b'], d[('a', 'b')], ('a', 'b') in d
+    (1, 1, True)
     """
 
     dict_class = dict
     sep = '/'
+    _journal = None  # saved items of dicts modified in current batch
+    _parents = None  # parent dicts cached by key prefix in current batch
+    _shared = False  # data is shared and must be copied before modification
+    _root = None  # instance sharing data with this subtree view
 
     def __init__(self, dict=None, **kwargs):
         self.data = self.dict_class()
         self._len = 0
+        self._version = 0  # incremented on every modification
         self.update(dict, **kwargs)
 
+    @contextmanager
+    def batch(self):
+        """
+        Context manager grouping modifications. Parent dicts found by key are
+        cached, so keys sharing parent are traversed from the root once, length is
+        recounted once after batch, and all changes are undone if exception is
+        raised. Nested batches join the outer one.
+
+        >>> d = NestedDict({'a': {'b': 1}})
+        >>> with d.batch():
+        ...     d['a/c'] = 2
+        ...     del d['a/b']
+        >>> d
+        {'a': {'c': 2}}
+        >>> with d.batch():
+        ...     d['a/c'] = 3
+        ...     del d['missing']
+        Traceback (most recent call last):
+          ...
+        KeyError: 'missing'
+        >>> d, len(d)
+        ({'a': {'c': 2}}, 2)
+        """
+        if self._journal is not None:
+            yield self
+            return
+        if self._shared:
+            self._unshare()
+        length = len(self)
+        self._journal = {}
+        self._parents = {}
+        try:
+            yield self
+        except BaseException:
+            for parent, items in self._journal.values():
+                parent.clear()
+                parent.update(items)
+            self._len = length  # version is kept, restored objects differ
+            raise
+        else:
+            self._len = None
+        finally:
+            del self._journal, self._parents
+
+    def _touch(self, parent, name=None):
+        # save parent items before its first modification in batch, and forget
+        # cached parents if nested dict ``name`` is going to be detached
+        if id(parent) not in self._journal:
+            self._journal[id(parent)] = (parent, list(parent.items()))
+        if name is not None and isinstance(parent.get(name), self.dict_class):
+            self._parents.clear()
+
+    def _traverse_cached(self, key, create_parents):
+        # traverse from the root in batch, with parents cached by tuple of names
+        parts = key if isinstance(key, tuple) else tuple(key.split(self.sep))
+        if not parts:
+            raise KeyError(key)
+        prefix = parts[:-1]
+        parent = self._parents.get(prefix)
+        if parent is None:
+            parent, name = self._traverse_parts(parts, create_parents, self.data)
+            self._parents[prefix] = parent
+            return parent, name
+        return parent, parts[-1]
+
+    def subtree(self, key):
+        """
+        Return view of nested dict at ``key``: instance of the same class that uses
+        it as storage, without copying. Changes made through view or through self
+        are visible in both, and are counted as modifications of self.
+
+        >>> d = NestedDict({'a': {'b': {'c': 1}}})
+        >>> view = d.subtree('a/b')
+        >>> view['d'] = 2
+        >>> d, len(d), len(view)
+        ({'a': {'b': {'c': 1, 'd': 2}}}, 4, 2)
+
+        Raises:
+
+            KeyError: If ``key`` is not found.
+
+            ValueError: If item at ``key`` is not a nested dict.
+        """
+        if self._shared:
+            self._unshare()
+        data = self[key]
+        if not isinstance(data, Mapping):
+            raise ValueError('Not a dictionary: {}'.format(key))
+        root = self if self._root is None else self._root
+        ret = type(self).adopt(data)
+        ret._root = root
+        ret._root_version = root.version
+        return ret
+
+    @property
+    def version(self):
+        """
+        Number of modifications, shared by subtree views and their root.
+        """
+        return self._version if self._root is None else self._root.version
+
+    def _modified(self):
+        self._version += 1
+        root = self._root
+        if root is not None:  # root length is unknown, and version is shared
+            root._len = None
+            root._version += 1
+            self._root_version = root._version
+
+    def _unshare(self):
+        # copy shared data before modification; return map of ids of shared dicts
+        # to their copies
+        self.data, copies = copy_tree(self.data, self.dict_class)
+        self._shared = False
+        return copies
+
     def __eq__(self, other):
         try:
             return self.data == self._operand(other)
         except TypeError:
             return False
 
+    @classmethod
+    def adopt(cls, data):
+        """
+        Create instance that uses nested ``data`` of `dict_class` as storage, without
+        copying; length is computed on first use.
+        """
+        ret = cls.__new__(cls)
+        ret.data = data
+        ret._len = None
+        ret._version = 0
+        return ret
+
     def __len__(self):
+        if self._journal is not None:  # not updated in batch
+            return self._count(self.data) - 1
+        root = self._root
+        if root is not None and self._root_version != root.version:
+            self._len = None  # root or another view was modified
+            self._root_version = root.version
+        if self._len is None:
+            self._len = self._count(self.data) - 1
         return self._len
 
     def __getitem__(self, key):
@@ -33,13 +186,94 @@ class NestedDict(UserDict):
         return parent[lastpart]
 
     def __setitem__(self, key, item):
+        if self._shared:
+            self._unshare()
+        if self._journal is None:
+            len(self)  # length is updated incrementally, and recounted after batch
+        self._modified()
         self._update({key: item}, base=self.data)
 
     def __delitem__(self, key):
+        if self._shared:
+            self._unshare()
+        if self._journal is None:
+            len(self)  # length is updated incrementally, and recounted after batch
         parent, lastpart = self._traverse(key, create_parents=False, base=self.data)
-        self._len -= self._count(parent[lastpart])
+        self._modified()
+        if self._journal is None:
+            self._len -= self._count(parent[lastpart])
+        else:
+            self._touch(parent, lastpart)
         del parent[lastpart]
 
+    def put(self, key, item):
+        """
+        Set item by delimited key, creating parents, without merging with existing
+        nested dict.
+        """
+        if self._shared:
+            self._unshare()
+        if self._journal is None:
+            len(self)  # length is updated incrementally, and recounted after batch
+        parent, name = self._traverse(key, create_parents=True, base=self.data)
+        self.replace(parent, name, item)
+
+    def move(self, src, dst):
+        """
+        Move item from ``src`` key to ``dst`` key, creating parents of ``dst``.
+        Nested dict is relinked, not copied, so the cost depends on depth of keys
+        only.
+
+        >>> d = NestedDict({'a': {'b': {'c': 1}}})
+        >>> d.move('a/b', 'x/y')
+        >>> d, len(d)
+        ({'a': {}, 'x': {'y': {'c': 1}}}, 4)
+
+        Raises:
+
+            KeyError: If ``src`` is not found.
+
+            ValueError: If ``dst`` exists or is inside ``src``, or parent is not a
+                nested dict.
+        """
+        src_parts = src if isinstance(src, tuple) else tuple(src.split(self.sep))
+        dst_parts = dst if isinstance(dst, tuple) else tuple(dst.split(self.sep))
+        if dst_parts[: len(src_parts)] == src_parts:
+            raise ValueError('Cannot move into itself: {}'.format(dst))
+        if self._shared:
+            self._unshare()
+        if self._journal is None:
+            len(self)  # length is updated incrementally, and recounted after batch
+        parent, name = self._traverse(src, create_parents=False, base=self.data)
+        item = parent[name]
+        if dst in self:
+            raise ValueError('Already exists: {}'.format(dst))
+        self._modified()
+        target, target_name = self._traverse(dst, create_parents=True, base=self.data)
+        if self._journal is not None:
+            self._touch(parent, name)
+            self._touch(target)
+        del parent[name]
+        target[target_name] = item
+
+    def replace(self, parent, name, item):
+        """
+        Replace item in ``parent`` dict, obtained with `traverse`, without merging
+        with existing nested dict.
+        """
+        if self._shared:
+            parent = self._unshare()[id(parent)]
+        if self._journal is None:
+            len(self)  # length is updated incrementally, and recounted after batch
+        self._modified()
+        if name in parent:
+            if self._journal is None:
+                self._len -= self._count(parent[name])
+            else:
+                self._touch(parent, name)
+            del parent[name]
+        self._update({name: item}, base=parent)
+
     def _count(self, item):
         if not isinstance(item, self.dict_class):
             return 1
@@ -50,6 +284,10 @@ class NestedDict(UserDict):
         return self._traverse(key, create_parents=False, base=self.data)
 
     def _traverse(self, key, create_parents, base):
+        if self._parents is not None and base is self.data:  # in batch
+            return self._traverse_cached(key, create_parents)
+        if isinstance(key, tuple):
+            return self._traverse_parts(key, create_parents, base)
         parent = base
         prev, last = None, -1
         while last < len(key):
@@ -62,26 +300,63 @@ class NestedDict(UserDict):
             # traverse nested
             if part not in parent:
                 if create_parents:
+                    if self._journal is None:
+                        self._len += 1
+                    else:
+                        self._touch(parent)
                     parent[part] = self.dict_class()
-                    self._len += 1
                 else:
                     raise KeyError(key[:last])
             parent = parent[part]
             if not isinstance(parent, dict):
                 raise ValueError('Not a dictionary: {}'.format(key[:last]))
 
+    def _traverse_parts(self, parts, create_parents, base):
+        # traverse key split to tuple of names
+        if not parts:
+            raise KeyError(parts)
+        parent = base
+        for i in range(len(parts) - 1):
+            part = parts[i]
+            if part not in parent:
+                if create_parents:
+                    if self._journal is None:
+                        self._len += 1
+                    else:
+                        self._touch(parent)
+                    parent[part] = self.dict_class()
+                else:
+                    raise KeyError(self.sep.join(parts[: i + 1]))
+            parent = parent[part]
+            if not isinstance(parent, dict):
+                raise ValueError(
+                    'Not a dictionary: {}'.format(self.sep.join(parts[: i + 1]))
+                )
+        return parent, parts[-1]
+
     def update(self, other=None, **kwargs):  # type: ignore[override]
+        if self._shared:
+            self._unshare()
+        if self._journal is None:
+            len(self)  # length is updated incrementally, and recounted after batch
+        self._modified()
         if other:
             self._update(self._operand(other), base=self.data)
         self._update(kwargs, base=self.data)
 
     def _update(self, other, base):
+        journal = self._journal
         for k in other.keys():
             v = other[k]
             parent, key = self._traverse(k, create_parents=True, base=base)
-            if key not in parent:
-                self._len += 1
-            if isinstance(v, dict) or isinstance(v, self.dict_class):
+            if journal is None:
+                if key not in parent:
+                    self._len += 1
+            else:
+                self._touch(parent, None if isinstance(v, Mapping) else key)
+            if isinstance(v, dict) or (
+                not isinstance(v, str) and isinstance(v, Mapping)
+            ):
                 if key not in parent or not isinstance(parent[key], self.dict_class):
                     parent[key] = self.dict_class()
                 self._update(v, base=parent[key])
@@ -110,7 +385,7 @@ class NestedDict(UserDict):
                     yield kvp
 
     def __contains__(self, key):
-        if not isinstance(key, str):
+        if not isinstance(key, (str, tuple)):
             return False
         try:
             parent, name = self._traverse(key, create_parents=False, base=self.data)
@@ -147,7 +422,7 @@ class NestedDict(UserDict):
     def _operand(other):
         if isinstance(other, UserDict):
             return other.data
-        elif isinstance(other, dict):
+        elif isinstance(other, Mapping):
             return other
         else:
             raise TypeError('Not a dictionary type: {}'.format(type(other)))
@@ -156,6 +431,15 @@ class NestedDict(UserDict):
         return self.__class__(self.data)
 
     def clear(self):
+        self._modified()
+        self._len = 0
+        if self._shared:
+            self.data = self.dict_class()
+            self._shared = False
+            return
+        if self._journal is not None:
+            self._touch(self.data)
+            self._parents.clear()
         self.data.clear()
 
     def copy(self):
@@ -167,3 +451,22 @@ class NestedDict(UserDict):
         for key in iterable:
             d[key] = value
         return d
+
+
+def copy_tree(data, dict_class):
+    """
+    Return deep copy of nested mappings in ``data`` as ``dict_class`` objects, and
+    ``dict`` mapping ids of copied mappings to their copies. Leaf values are shared.
+    """
+    root = dict_class()
+    copies = {id(data): root}
+    stack = [(data, root)]
+    while stack:
+        src, dst = stack.pop()
+        for k, v in src.items():
+            if isinstance(v, Mapping) and not isinstance(v, str):
+                dst[k] = copies[id(v)] = dict_class()
+                stack.append((v, dst[k]))
+            else:
+                dst[k] = v
+    return root, copies
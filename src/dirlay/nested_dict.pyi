@@ -1,27 +1,69 @@
 from collections import UserDict
 from collections.abc import ItemsView, Iterable, Iterator, KeysView, ValuesView
-from typing import Any, Generic, MutableMapping, Optional, Tuple, Type, TypeVar
+from contextlib import AbstractContextManager
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from dirlay.types import AnyDict, StrDict
 
 D = TypeVar('D', bound=MutableMapping[str, Any])
+Key = Union[str, Tuple[str, ...]]
 
 class NestedDict(UserDict[str, Any], Generic[D]):
     dict_class: Type[D]
     data: D  # type: ignore[assignment]
     sep: str
-    _len: int
+    _len: Optional[int]
+    _version: int
+    _journal: Optional[Dict[int, Tuple[StrDict, List[Tuple[str, Any]]]]]
+    _parents: Optional[Dict[Tuple[str, ...], StrDict]]
+    _shared: bool
+    _root: Optional['NestedDict[D]']
+    _root_version: int
     def __init__(self, dict: Optional[StrDict] = None, sep: str = ...): ...
+    def batch(self) -> AbstractContextManager['NestedDict[D]']: ...
+    def _touch(self, parent: StrDict, name: Optional[str] = ...) -> None: ...
+    def _traverse_cached(
+        self,
+        key: Key,
+        create_parents: bool,
+    ) -> Tuple[StrDict, str]: ...
+    def subtree(self, key: Key) -> 'NestedDict[D]': ...
+    @property
+    def version(self) -> int: ...
+    def _modified(self) -> None: ...
+    def _unshare(self) -> Dict[int, D]: ...
+    @classmethod
+    def adopt(cls, data: D) -> 'NestedDict[D]': ...
     def __eq__(self, other: Any) -> bool: ...
     def __len__(self) -> int: ...
-    def __getitem__(self, key: str) -> Any: ...
-    def __setitem__(self, key: str, item: Any) -> None: ...
-    def __delitem__(self, key: str) -> None: ...
+    def __getitem__(self, key: Key) -> Any: ...
+    def __setitem__(self, key: Key, item: Any) -> None: ...
+    def __delitem__(self, key: Key) -> None: ...
+    def put(self, key: Key, item: Any) -> None: ...
+    def move(self, src: Key, dst: Key) -> None: ...
+    def replace(self, parent: StrDict, name: str, item: Any) -> None: ...
     def _count(self, item: Any) -> int: ...
-    def traverse(self, key: str) -> Tuple[StrDict, str]: ...
+    def traverse(self, key: Key) -> Tuple[StrDict, str]: ...
     def _traverse(
         self,
-        key: str,
+        key: Key,
+        create_parents: bool,
+        base: StrDict,
+    ) -> Tuple[StrDict, str]: ...
+    def _traverse_parts(
+        self,
+        parts: Tuple[str, ...],
         create_parents: bool,
         base: StrDict,
     ) -> Tuple[StrDict, str]: ...
@@ -37,7 +79,7 @@ class NestedDict(UserDict[str, Any], Generic[D]):
         prefix: Optional[str] = ...,
     ) -> Iterable[Tuple[str, Any, StrDict]]: ...
     def __contains__(self, key: object) -> bool: ...
-    def get(self, key: str, default: Any = ...) -> Any: ...
+    def get(self, key: Key, default: Any = ...) -> Any: ...
     def __repr__(self) -> str: ...
     def __or__(self, other: AnyDict) -> 'NestedDict': ...  # type: ignore
     def __ror__(self, other: AnyDict) -> 'NestedDict': ...  # type: ignore
@@ -49,3 +91,5 @@ class NestedDict(UserDict[str, Any], Generic[D]):
     def copy(self) -> 'NestedDict[D]': ...
     @classmethod
     def fromkeys(cls, iterable: Iterable[str], value: Any = ...) -> 'NestedDict[D]': ...  # type: ignore
+
+def copy_tree(data: StrDict, dict_class: Type[D]) -> Tuple[D, Dict[int, D]]: ...
@@ -1,14 +1,40 @@
+import sys
+
 try:
     import pathlib
 except ImportError:  # pragma: no cover
     import pathlib2 as pathlib  # type: ignore
 
-try:
-    import rich
-except ImportError:  # pragma: no cover
-    rich = None  # type: ignore
+
+def __getattr__(name):  # type: (str) -> object
+    # import heavy optional dependencies on first access (PEP 562)
+    if name == 'rich':
+        try:
+            import rich
+        except ImportError:  # pragma: no cover
+            rich = None  # type: ignore
+        globals()['rich'] = rich
+        return rich
+    if name == 'tomllib':
+        try:
+            import tomllib  # type: ignore[import-not-found,unused-ignore]
+        except ImportError:  # pragma: no cover  # Python < 3.11
+            try:
+                import tomli as tomllib  # type: ignore[import-not-found,no-redef,unused-ignore]
+            except ImportError:
+                tomllib = None  # type: ignore[assignment,unused-ignore]
+        globals()['tomllib'] = tomllib
+        return tomllib
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover  # PEP 562 not supported
+    rich = __getattr__('rich')
+    tomllib = __getattr__('tomllib')
+
 
 __all__ = [
     'pathlib',
     'rich',
+    'tomllib',
 ]
@@ -0,0 +1,189 @@
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+try:
+    from reprlib import aRepr
+except ImportError:  # pragma: no cover
+    from repr import aRepr
+
+from dirlay.nested_dict import NestedDict
+
+
+class Whiteout(object):
+    """
+    Type of `WHITEOUT` marker.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'WHITEOUT'
+
+    def __reduce__(self):
+        return 'WHITEOUT'
+
+
+WHITEOUT = Whiteout()  # overlay layer value that hides entry of lower layers
+MISSING = object()
+
+
+def lookup(layers, name):
+    """
+    Resolve ``name`` in ``layers`` of directory entries, topmost first. Directory
+    is merged with directories of lower layers, down to the first layer where
+    ``name`` is a file or `WHITEOUT`. Return `OverlayMapping` for directory, file
+    value, or `MISSING` if ``name`` is not defined or is whited out.
+    """
+    dirs = []
+    for layer in layers:
+        value = layer.get(name, MISSING)
+        if value is MISSING:
+            continue
+        if isinstance(value, Mapping):
+            dirs.append(value)
+            continue
+        if dirs or value is WHITEOUT:
+            break
+        return value
+    return OverlayMapping(dirs) if dirs else MISSING
+
+
+class OverlayMapping(Mapping):
+    """
+    Read-only union view of directory ``layers``, topmost first.
+    """
+
+    __slots__ = ('_layers',)
+
+    def __init__(self, layers):
+        self._layers = layers
+
+    def __getitem__(self, name):
+        value = lookup(self._layers, name)
+        if value is MISSING:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return lookup(self._layers, name) is not MISSING
+
+    def __iter__(self):
+        for name, _ in self.items():
+            yield name
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+    def items(self):
+        # names in order of lowest layer defining them, as if layers were merged
+        layers = self._layers
+        seen = set()
+        for layer in reversed(layers):
+            for name in layer:
+                if name in seen:
+                    continue
+                seen.add(name)
+                value = lookup(layers, name)
+                if value is not MISSING:
+                    yield name, value
+
+    def __repr__(self):
+        return aRepr.repr_dict(self, aRepr.maxlevel)
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
+
+    def to_dict(self, dict_class=dict):
+        """
+        Return merged deep copy as nested ``dict_class`` objects.
+        """
+        ret = dict_class()
+        stack = [(self, ret)]
+        while stack:
+            src, dst = stack.pop()
+            for name, value in src.items():
+                if isinstance(value, OverlayMapping):
+                    dst[name] = dict_class()
+                    stack.append((value, dst[name]))
+                else:
+                    dst[name] = value
+        return ret
+
+
+class OverlayTree(NestedDict):
+    """
+    Read-only `~dirlay.nested_dict.NestedDict` over `OverlayMapping`. Layers may be
+    storage of ``sources`` trees, that are modified independently; modifications
+    of sources change `version` of the overlay.
+    """
+
+    _sources = ()
+    _len_version = None  # version of sources when length was counted
+
+    def __init__(self, layers, sources=()):
+        self.data = OverlayMapping(layers)
+        self._sources = tuple(sources)
+        self._len = None
+        self._version = 0
+
+    @property
+    def version(self):
+        """
+        Sum of versions of source trees, changed by modification of any of them.
+        """
+        if self._root is not None:  # subtree view
+            return self._root.version
+        return self._version + sum(s.version for s in self._sources)
+
+    def __len__(self):
+        version = self.version
+        if version != self._len_version:  # source was modified
+            self._len = None
+            self._len_version = version
+        return NestedDict.__len__(self)
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Overlay directory layout is read-only')
+
+    __setitem__ = __delitem__ = update = replace = put = clear = batch = _readonly
+    move = _readonly
+
+    def _traverse(self, key, create_parents, base):
+        if create_parents:
+            self._readonly()
+        parent, sep = base, self.sep
+        parts = key if isinstance(key, tuple) else key.split(sep)
+        if not parts:
+            raise KeyError(key)
+        for i in range(len(parts) - 1):
+            parent = parent.get(parts[i], MISSING)
+            if parent is MISSING:
+                raise KeyError(sep.join(parts[: i + 1]))
+            if not isinstance(parent, OverlayMapping):
+                raise ValueError(
+                    'Not a dictionary: {}'.format(sep.join(parts[: i + 1]))
+                )
+        return parent, parts[-1]
+
+    def _count(self, item):
+        count, stack = 1, [item]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Mapping):
+                values = list(item.values())
+                count += len(values)
+                stack.extend(values)
+        return count
+
+    def _walk(self, entries, prefix=None):
+        for name, item in entries.items():
+            key = name if prefix is None else self.sep.join((prefix, name))
+            yield key, item, entries
+            if isinstance(item, OverlayMapping):
+                for kvp in self._walk(item, prefix=key):  # Python 2 support
+                    yield kvp
+
+    def __copy__(self):
+        return self.__class__(self.data._layers, self._sources)
@@ -0,0 +1,48 @@
+from collections.abc import Iterator, Mapping
+from typing import Any, Dict, Iterable, List, NoReturn, Optional, Tuple, Type, TypeVar
+
+from dirlay.nested_dict import NestedDict
+from dirlay.types import DictNode, StrDict
+
+D = TypeVar('D')
+
+class Whiteout(object):
+    def __repr__(self) -> str: ...
+    def __reduce__(self) -> str: ...
+
+WHITEOUT: Whiteout
+MISSING: object
+
+def lookup(layers: List[Mapping[str, Any]], name: str) -> Any: ...
+
+class OverlayMapping(Mapping[str, DictNode]):
+    _layers: List[Mapping[str, Any]]
+    def __init__(self, layers: List[Mapping[str, Any]]) -> None: ...
+    def __getitem__(self, name: str) -> DictNode: ...
+    def __contains__(self, name: object) -> bool: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def __len__(self) -> int: ...
+    def items(self) -> Iterator[Tuple[str, DictNode]]: ...  # type: ignore[override]
+    def __repr__(self) -> str: ...
+    def __reduce__(self) -> Tuple[Type[Dict[str, Any]], Tuple[StrDict]]: ...
+    def to_dict(self, dict_class: Type[D] = ...) -> D: ...
+
+class OverlayTree(NestedDict[Any]):
+    data: OverlayMapping
+    _sources: Tuple[NestedDict[Any], ...]
+    _len_version: Optional[int]
+    def __init__(
+        self,
+        layers: List[Mapping[str, Any]],
+        sources: Iterable[NestedDict[Any]] = ...,
+    ) -> None: ...
+    @property
+    def version(self) -> int: ...
+    def __len__(self) -> int: ...
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn: ...
+    def _walk(  # type: ignore[override]
+        self,
+        entries: OverlayMapping,
+        prefix: Optional[str] = ...,
+    ) -> Iterable[Tuple[str, Any, OverlayMapping]]: ...
+    def __copy__(self) -> 'OverlayTree': ...
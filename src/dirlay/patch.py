@@ -0,0 +1,209 @@
+import errno
+import locale
+import os
+import shutil
+import stat
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from dirlay.materialize import materialize, mkdir, write
+from dirlay.stats import MaterializationStats, perf_counter
+
+ADD = 'add'
+REMOVE = 'remove'
+MODIFY = 'modify'
+REPLACE = 'replace'
+
+MISSING = object()
+
+
+class Patch(object):
+    """
+    Immutable difference between two directory layouts: sequence of
+    ``(op, relpath, value)`` operations ordered top-down, where ``op`` is one of:
+
+    - `ADD`: entry ``value`` is added, file or directory with all its contents
+    - `REMOVE`: entry is removed with all its contents, ``value`` is ``None``
+    - `MODIFY`: file content is changed to ``value``
+    - `REPLACE`: entry type is changed, file is replaced with directory ``value``
+      or vice versa
+
+    Patches are created with `~dirlay.Dir.diff`. Values are shared with the target
+    layout, and the patch becomes stale when either layout is modified.
+
+    >>> from dirlay import Dir
+    >>> old = Dir({'a': {'b.txt': 'B', 'c.txt': 'C'}, 'd': {}})
+    >>> new = Dir({'a': {'b.txt': 'B2', 'e.txt': 'E'}, 'd': 'file'})
+    >>> for op in old.diff(new):
+    ...     print(op)
+    ('replace', 'd', 'file')
+    ('remove', 'a/c.txt', None)
+    ('modify', 'a/b.txt', 'B2')
+    ('add', 'a/e.txt', 'E')
+    """
+
+    __slots__ = ('_ops', '_sources')
+
+    def __init__(self, ops, sources=()):
+        self._ops = tuple(ops)
+        self._sources = tuple((s, s.version) for s in sources)
+
+    @classmethod
+    def compute(cls, old, new, sources=()):
+        """
+        Compute patch transforming nested ``old`` entries to ``new`` entries, walking
+        both in parallel. Subtrees and files that are the same objects in both are
+        skipped without comparing their contents. If ``sources``
+        `~dirlay.nested_dict.NestedDict` objects are given, the patch becomes stale
+        when any of them is modified.
+        """
+        ops = []
+        stack = [('', old, new)]
+        while stack:
+            prefix, old, new = stack.pop()
+            for name in old:
+                if name not in new:
+                    ops.append((REMOVE, prefix + name, None))
+            nested = []
+            for name, value in new.items():
+                prev = old.get(name, MISSING)
+                if prev is value:
+                    continue  # shared
+                relpath = prefix + name
+                if prev is MISSING:
+                    ops.append((ADD, relpath, value))
+                elif isinstance(value, Mapping) != isinstance(prev, Mapping):
+                    ops.append((REPLACE, relpath, value))
+                elif isinstance(value, Mapping):
+                    nested.append((relpath + '/', prev, value))
+                elif prev != value:
+                    ops.append((MODIFY, relpath, value))
+            stack.extend(reversed(nested))
+        return cls(ops, sources)
+
+    def __repr__(self):
+        return '<Patch: {} operations>'.format(len(self._ops))
+
+    def __len__(self):
+        return len(self._ops)
+
+    def __iter__(self):
+        return iter(self._ops)
+
+    @property
+    def ops(self):
+        """
+        Tuple of ``(op, relpath, value)`` operations.
+        """
+        return self._ops
+
+    @property
+    def added(self):
+        """
+        Tuple of relative paths of added entries.
+        """
+        return tuple(p for op, p, _ in self._ops if op == ADD)
+
+    @property
+    def removed(self):
+        """
+        Tuple of relative paths of removed entries.
+        """
+        return tuple(p for op, p, _ in self._ops if op == REMOVE)
+
+    @property
+    def modified(self):
+        """
+        Tuple of relative paths of files with changed content.
+        """
+        return tuple(p for op, p, _ in self._ops if op == MODIFY)
+
+    @property
+    def replaced(self):
+        """
+        Tuple of relative paths of entries with changed type.
+        """
+        return tuple(p for op, p, _ in self._ops if op == REPLACE)
+
+    @property
+    def stale(self):
+        """
+        Whether any of the compared layouts was modified after the patch was
+        computed.
+        """
+        return any(s.version != v for s, v in self._sources)
+
+    def apply(self, basedir, encoding=None, newline=None):
+        """
+        Change materialized old layout under ``basedir`` to the new one, removing,
+        writing, and creating only entries listed in the patch. Entries to be removed
+        that are already missing are skipped.
+
+        Args:
+
+            basedir (`~pathlib.Path` | ``str``):
+                Path to base directory of materialized old layout.
+
+            encoding (``str`` | ``None``, optional):
+                Text encoding; defaults to locale preferred encoding.
+
+            newline (``str`` | ``None``, optional):
+                Line separator that ``'\\n'`` is translated to; defaults to
+                `os.linesep`.
+
+        Returns:
+
+            `~dirlay.MaterializationStats`: Statistics of created entries; removal
+            is timed as ``'rmtree'`` phase.
+
+        Raises:
+
+            RuntimeError: If the patch is stale.
+        """
+        if self.stale:
+            raise RuntimeError('Patch is stale, compared layout was modified')
+        if encoding is None:
+            encoding = locale.getpreferredencoding(False)
+        if newline is None:
+            newline = os.linesep
+        stats = MaterializationStats()
+        times = stats.times
+        base = str(basedir)
+        for op, relpath, value in self._ops:
+            path = os.path.join(base, relpath)
+            if op in (REMOVE, REPLACE):
+                start = perf_counter()
+                remove(path)
+                times['rmtree'] += perf_counter() - start
+            if op == REMOVE:
+                continue
+            if isinstance(value, Mapping):
+                start = perf_counter()
+                mkdir(path)
+                times['mkdir'] += perf_counter() - start
+                stats.dirs += 1
+                materialize(path, value, stats, (), encoding, newline)
+            else:
+                stats.bytes += write(path, value, times, encoding, newline)
+                stats.files += 1
+        return stats
+
+
+def remove(path):
+    """
+    Remove file or directory with all its contents, not following symlinks; skip
+    missing entry.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError as exc:
+        if exc.errno == errno.ENOENT:
+            return
+        raise
+    if stat.S_ISDIR(st.st_mode):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
@@ -0,0 +1,53 @@
+from collections.abc import Iterator
+from typing import Any, Iterable, Optional, Tuple
+
+from dirlay.nested_dict import NestedDict
+from dirlay.stats import MaterializationStats
+from dirlay.types import DictNode, DictTree, PathType
+
+ADD: str
+REMOVE: str
+MODIFY: str
+REPLACE: str
+MISSING: object
+
+Op = Tuple[str, str, Optional[DictNode]]
+
+class Patch(object):
+    _ops: Tuple[Op, ...]
+    _sources: Tuple[Tuple[NestedDict[Any], int], ...]
+    def __init__(
+        self,
+        ops: Iterable[Op],
+        sources: Iterable[NestedDict[Any]] = ...,
+    ) -> None: ...
+    @classmethod
+    def compute(
+        cls,
+        old: DictTree,
+        new: DictTree,
+        sources: Iterable[NestedDict[Any]] = ...,
+    ) -> 'Patch': ...
+    def __repr__(self) -> str: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Op]: ...
+    @property
+    def ops(self) -> Tuple[Op, ...]: ...
+    @property
+    def added(self) -> Tuple[str, ...]: ...
+    @property
+    def removed(self) -> Tuple[str, ...]: ...
+    @property
+    def modified(self) -> Tuple[str, ...]: ...
+    @property
+    def replaced(self) -> Tuple[str, ...]: ...
+    @property
+    def stale(self) -> bool: ...
+    def apply(
+        self,
+        basedir: PathType,
+        encoding: Optional[str] = ...,
+        newline: Optional[str] = ...,
+    ) -> MaterializationStats: ...
+
+def remove(path: str) -> None: ...
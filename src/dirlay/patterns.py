@@ -0,0 +1,87 @@
+import fnmatch
+import re
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+
+def compile_pattern(pattern, sep='/'):
+    """
+    Split glob ``pattern`` of relative path into segments: ``'**'`` matching zero or
+    more path parts, or compiled regular expression matching one part, with
+    `fnmatch` wildcards ``*``, ``?``, and ``[...]``.
+    """
+    return tuple(
+        part if part == '**' else re.compile(fnmatch.translate(part))
+        for part in pattern.strip(sep).split(sep)
+    )
+
+
+def match(segments, parts, partial=False):
+    """
+    Return whether sequence of path ``parts`` matches compiled pattern
+    ``segments``; if ``partial`` is ``True``, also whether ``parts`` can be
+    extended to a matching path.
+
+    >>> match(compile_pattern('src/**/*.py'), ('src', 'a', 'b.py'))
+    True
+    >>> (
+    ...     match(compile_pattern('src/*.py'), ('src',)),
+    ...     match(compile_pattern('src/*.py'), ('src',), partial=True),
+    ... )
+    (False, True)
+    """
+    if not parts:
+        return partial or all(s == '**' for s in segments)
+    if not segments:
+        return False
+    first = segments[0]
+    if first == '**':
+        return match(segments[1:], parts, partial) or match(
+            segments, parts[1:], partial
+        )
+    return first.match(parts[0]) is not None and match(segments[1:], parts[1:], partial)
+
+
+def select(entries, include=None, exclude=None, dict_class=dict):
+    """
+    Return nested ``dict_class`` copy of ``entries`` with selected entries only;
+    file values and fully selected directories without excludes are shared, not
+    copied. Entry is selected if it or its parent directory matches any of
+    ``include`` patterns (every entry if ``None``), and neither entry nor its
+    parents match any of ``exclude`` patterns. Parent directories of selected
+    entries are kept. Subtrees that cannot contain selected entries are skipped
+    without visiting their entries.
+
+    >>> entries = {'src': {'a.py': '', 'b.txt': ''}, 'docs': {'c.py': ''}}
+    >>> select(entries, include=['**/*.py'], exclude=['docs'])
+    {'src': {'a.py': ''}}
+    """
+    include = None if include is None else [compile_pattern(p) for p in include]
+    exclude = [compile_pattern(p) for p in exclude or ()]
+    if include is None and not exclude:
+        return entries
+    return _select(entries, (), include, exclude, dict_class)
+
+
+def _select(entries, parts, include, exclude, dict_class):
+    ret = dict_class()
+    for name, value in entries.items():
+        key = parts + (name,)
+        if any(match(p, key) for p in exclude):
+            continue
+        selected = include is None or any(match(p, key) for p in include)
+        if isinstance(value, Mapping):
+            if selected and not exclude:
+                ret[name] = value
+            elif selected:
+                ret[name] = _select(value, key, None, exclude, dict_class)
+            elif any(match(p, key, partial=True) for p in include):
+                nested = _select(value, key, include, exclude, dict_class)
+                if nested:
+                    ret[name] = nested
+        elif selected:
+            ret[name] = value
+    return ret
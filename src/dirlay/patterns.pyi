@@ -0,0 +1,26 @@
+from re import Pattern
+from typing import Iterable, Optional, Sequence, Tuple, Type, Union
+
+from dirlay.types import DictTree, StrDict
+
+Segment = Union[str, Pattern[str]]
+
+def compile_pattern(pattern: str, sep: str = ...) -> Tuple[Segment, ...]: ...
+def match(
+    segments: Sequence[Segment],
+    parts: Sequence[str],
+    partial: bool = ...,
+) -> bool: ...
+def select(
+    entries: DictTree,
+    include: Optional[Iterable[str]] = ...,
+    exclude: Optional[Iterable[str]] = ...,
+    dict_class: Type[StrDict] = ...,
+) -> DictTree: ...
+def _select(
+    entries: DictTree,
+    parts: Tuple[str, ...],
+    include: Optional[Sequence[Tuple[Segment, ...]]],
+    exclude: Sequence[Tuple[Segment, ...]],
+    dict_class: Type[StrDict],
+) -> StrDict: ...
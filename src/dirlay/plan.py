@@ -0,0 +1,158 @@
+import errno
+import locale
+import os
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from dirlay.content import Content, FileRef
+from dirlay.materialize import encode, link
+from dirlay.stats import MaterializationStats, perf_counter
+
+
+class Plan(object):
+    """
+    Immutable materialization plan: flat sequence of ``(relpath, data)`` operations
+    ordered top-down, where ``data`` is ``None`` for directories and pre-encoded
+    ``bytes`` for files; `~dirlay.content.FileRef` files are kept as references and
+    copied or linked when the plan is applied. Plans are created with
+    `~dirlay.Dir.compile` and can be applied any number of times without traversing
+    the layout or encoding content.
+
+    >>> from dirlay import Dir
+    >>> plan = Dir({'a': {'b.txt': 'B'}, 'c': {}}).compile(newline='\\n')
+    >>> plan.ops
+    (('a', None), ('c', None), ('a/b.txt', b'B'))
+    """
+
+    __slots__ = ('_ops', '_encoding', '_newline', '_source', '_version')
+
+    def __init__(self, ops, encoding, newline, source=None):
+        self._ops = tuple(ops)
+        self._encoding = encoding
+        self._newline = newline
+        self._source = source
+        self._version = None if source is None else source.version
+
+    @classmethod
+    def compile(cls, entries, encoding=None, newline=None, source=None):
+        """
+        Compile nested ``entries`` to plan. Text is encoded as in `open` text mode:
+        ``encoding`` defaults to locale preferred encoding, and ``'\\n'`` is
+        translated to ``newline``, defaulting to `os.linesep`. If ``source``
+        `~dirlay.nested_dict.NestedDict` is given, the plan becomes stale when the
+        source is modified.
+        """
+        if encoding is None:
+            encoding = locale.getpreferredencoding(False)
+        if newline is None:
+            newline = os.linesep
+        ops = []
+        queue = [('', entries)]
+        for prefix, entries in queue:  # breadth-first, queue grows while iterating
+            for name, value in entries.items():
+                relpath = prefix + name
+                if isinstance(value, Mapping):
+                    ops.append((relpath, None))
+                    queue.append((relpath + '/', value))
+                elif isinstance(value, FileRef):
+                    ops.append((relpath, value))
+                else:
+                    chunks = value.chunks() if isinstance(value, Content) else (value,)
+                    data = b''.join(encode(c, encoding, newline) for c in chunks)
+                    ops.append((relpath, data))
+        return cls(ops, encoding, newline, source=source)
+
+    def __repr__(self):
+        return '<Plan: {} operations>'.format(len(self._ops))
+
+    def __len__(self):
+        return len(self._ops)
+
+    def __iter__(self):
+        return iter(self._ops)
+
+    @property
+    def ops(self):
+        """
+        Tuple of ``(relpath, data)`` operations.
+        """
+        return self._ops
+
+    @property
+    def encoding(self):
+        """
+        Encoding used to compile file content.
+        """
+        return self._encoding
+
+    @property
+    def newline(self):
+        """
+        Line separator used to compile file content.
+        """
+        return self._newline
+
+    @property
+    def stale(self):
+        """
+        Whether the source layout was modified after the plan was compiled.
+        """
+        return self._source is not None and self._source.version != self._version
+
+    def apply(self, basedir):
+        """
+        Create directories and files under ``basedir``, which is created if missing.
+        Existing directories are reused, existing files are overwritten.
+
+        Args:
+
+            basedir (`~pathlib.Path` | ``str``):
+                Path to base directory.
+
+        Returns:
+
+            `~dirlay.MaterializationStats`: Statistics of created entries; the whole
+            loop is timed as ``'write'`` phase.
+
+        Raises:
+
+            RuntimeError: If the plan is stale.
+        """
+        if self.stale:
+            raise RuntimeError('Plan is stale, source layout was modified')
+        stats = MaterializationStats()
+        start = perf_counter()
+        base = str(basedir)
+        if not os.path.isdir(base):
+            os.makedirs(base)
+            stats.dirs += 1
+        join = os.path.join
+        mkdir = os.mkdir
+        dirs = files = size = 0
+        times = {'write': 0.0}  # included in the loop time
+        for relpath, data in self._ops:
+            path = join(base, relpath)
+            if data is None:
+                try:
+                    mkdir(path)
+                except OSError as exc:
+                    if exc.errno != errno.EEXIST or not os.path.isdir(path):
+                        raise
+                else:
+                    dirs += 1
+            elif isinstance(data, FileRef):
+                files += 1
+                size += link(path, data, times)
+            else:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                files += 1
+                size += len(data)
+        stats.dirs += dirs
+        stats.files += files
+        stats.bytes += size
+        stats.times['write'] += perf_counter() - start
+        return stats
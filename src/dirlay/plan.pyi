@@ -0,0 +1,43 @@
+from collections.abc import Iterator
+from typing import Any, Iterable, Optional, Tuple, Union
+
+from dirlay.content import FileRef
+from dirlay.nested_dict import NestedDict
+from dirlay.stats import MaterializationStats
+from dirlay.types import DictTree, PathType
+
+Op = Tuple[str, Union[bytes, FileRef, None]]
+
+class Plan(object):
+    _ops: Tuple[Op, ...]
+    _encoding: str
+    _newline: str
+    _source: Optional[NestedDict[Any]]
+    _version: Optional[int]
+    def __init__(
+        self,
+        ops: Iterable[Op],
+        encoding: str,
+        newline: str,
+        source: Optional[NestedDict[Any]] = ...,
+    ) -> None: ...
+    @classmethod
+    def compile(
+        cls,
+        entries: DictTree,
+        encoding: Optional[str] = ...,
+        newline: Optional[str] = ...,
+        source: Optional[NestedDict[Any]] = ...,
+    ) -> 'Plan': ...
+    def __repr__(self) -> str: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Op]: ...
+    @property
+    def ops(self) -> Tuple[Op, ...]: ...
+    @property
+    def encoding(self) -> str: ...
+    @property
+    def newline(self) -> str: ...
+    @property
+    def stale(self) -> bool: ...
+    def apply(self, basedir: PathType) -> MaterializationStats: ...
@@ -0,0 +1,227 @@
+"""
+Pytest plugin providing ``dirlay`` fixture and marker. Each distinct layout is
+materialized once per session, shared by ``pytest-xdist`` workers, and every test
+gets its own copy. Layout setup and teardown times are reported in terminal summary;
+use ``--dirlay-durations=N`` to show N slowest tests (``0`` for all, default ``10``).
+The plugin is optional and is not registered automatically, so that ``dirlay`` is
+not imported by unrelated test runs; enable it with ``-p dirlay.pytest_plugin``
+command line option, or in ``conftest.py``:
+
+.. code-block:: python
+
+    pytest_plugins = ['dirlay.pytest_plugin']
+
+.. code-block:: python
+
+    from pathlib import Path
+
+    import pytest
+
+
+    @pytest.mark.dirlay({'a': {'b.txt': 'B'}}, chdir='a')
+    def test_b(dirlay):
+        assert Path('b.txt').read_text() == 'B'
+"""
+
+import errno
+import hashlib
+import locale
+import os
+import shutil
+import time
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+import pytest
+
+from dirlay import Dir, Path
+from dirlay.content import Content, FileRef, SizedContent
+from dirlay.materialize import link
+
+
+CACHE_DIR = 'dirlay-cache'
+SETUP = 'dirlay_setup'
+TEARDOWN = 'dirlay_teardown'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('dirlay')
+    group.addoption(
+        '--dirlay-durations',
+        type=int,
+        default=10,
+        metavar='N',
+        help='Show N slowest dirlay layout setup and teardown times (N=0 for all).',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'dirlay(layout, chdir=None): directory layout for dirlay fixture, '
+        '`dict` or `dirlay.Dir`; chdir is passed to `Dir.mktree`.',
+    )
+    config.pluginmanager.register(Timings(), 'dirlay-timings')
+
+
+@pytest.fixture(scope='session')
+def dirlay_cache(tmp_path_factory):
+    """
+    Session cache of materialized layouts, see `LayoutCache`.
+    """
+    root = tmp_path_factory.getbasetemp()
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        root = root.parent  # shared by workers
+    return LayoutCache(root / CACHE_DIR)
+
+
+@pytest.fixture
+def dirlay(request, dirlay_cache, tmp_path_factory):
+    """
+    Directory layout from ``dirlay`` marker (empty if there is no marker) as
+    `~dirlay.Dir`, materialized in private temporary directory. Changes made by the
+    test are not visible to other tests.
+    """
+    marker = request.node.get_closest_marker('dirlay')
+    layout = Dir() if marker is None or not marker.args else marker.args[0]
+    if not isinstance(layout, Dir):
+        layout = Dir(layout)
+    chdir = None if marker is None else marker.kwargs.get('chdir')
+
+    start = time.perf_counter()
+    source = dirlay_cache.get(layout)
+    target = tmp_path_factory.mktemp('dirlay') / 'tree'
+    tree = clone(layout, source, target)
+    if chdir not in (None, False):
+        tree.chdir('.' if chdir is True else chdir)
+    request.node.user_properties.append((SETUP, time.perf_counter() - start))
+
+    yield tree
+
+    start = time.perf_counter()
+    tree.rmtree()
+    request.node.user_properties.append((TEARDOWN, time.perf_counter() - start))
+
+
+class LayoutCache(object):
+    """
+    Directory of materialized layouts, keyed by `fingerprint`. Layout is written to
+    temporary directory and renamed atomically, so concurrent processes materialize
+    the same layout at most once each, and all use the first one renamed.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.paths = {}
+
+    def get(self, layout):
+        """
+        Return path of materialized ``layout``, creating it if missing.
+        """
+        key = fingerprint(layout.data)
+        if key not in self.paths:
+            path = self.root / key
+            if not path.is_dir():
+                self.root.mkdir(parents=True, exist_ok=True)
+                tmp = self.root / '{}.{}.tmp'.format(key, os.getpid())
+                layout.copy().mktree(tmp)
+                try:
+                    os.rename(str(tmp), str(path))
+                except OSError as exc:
+                    if exc.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                        raise
+                    shutil.rmtree(str(tmp))  # created by another process
+            self.paths[key] = path
+        return self.paths[key]
+
+
+def fingerprint(entries):
+    """
+    Return hex digest of layout ``entries``, file content, and text encoding.
+    """
+    h = hashlib.sha256()
+    h.update(repr((locale.getpreferredencoding(False), os.linesep)).encode())
+    stack = [('', entries)]
+    while stack:
+        prefix, entries = stack.pop()
+        for name in sorted(entries):
+            value = entries[name]
+            key = (prefix + name).encode('utf-8')
+            if isinstance(value, Mapping):
+                h.update(b'd' + key + b'\0')
+                stack.append((prefix + name + '/', value))
+            elif isinstance(value, SizedContent):  # defined by size and seed
+                h.update(b's' + key + b'\0' + repr(value).encode('utf-8') + b'\0')
+            else:
+                chunks = value.chunks() if isinstance(value, Content) else (value,)
+                h.update(b'f' + key + b'\0')
+                for chunk in chunks:
+                    data = chunk.encode('utf-8')
+                    h.update(str(len(data)).encode() + b'\0' + data)
+                h.update(b'\0')
+    return h.hexdigest()[:32]
+
+
+def clone(layout, source, target):
+    """
+    Copy materialized ``source`` to ``target`` and return copy of ``layout`` linked
+    to it. Files are copied with `shutil.copyfile`, which uses in-kernel copy where
+    available; symlinks are copied as symlinks, and hard linked
+    `~dirlay.content.FileRef` files are linked again.
+    """
+    shutil.copytree(
+        str(source), str(target), symlinks=True, copy_function=shutil.copyfile
+    )
+    times = {'write': 0.0}
+    stack = [(str(target), layout.data)]
+    while stack:
+        dirpath, entries = stack.pop()
+        for name, value in entries.items():
+            path = os.path.join(dirpath, name)
+            if isinstance(value, Mapping):
+                stack.append((path, value))
+            elif isinstance(value, FileRef) and value.mode == 'hardlink':
+                link(path, value, times)
+    tree = layout.copy()
+    tree._basedir = Path(target).resolve()
+    tree._basedir_remove = True
+    return tree
+
+
+class Timings(object):
+    """
+    Collect layout setup and teardown times from test reports, including reports
+    sent by ``pytest-xdist`` workers, and write them in terminal summary.
+    """
+
+    def __init__(self):
+        self.times = {}
+
+    def pytest_runtest_logreport(self, report):
+        for name, value in report.user_properties:
+            if name in (SETUP, TEARDOWN):
+                self.times.setdefault(report.nodeid, {})[name] = value
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if not self.times:
+            return
+        limit = config.getoption('dirlay_durations')
+        rows = sorted(
+            self.times.items(),
+            key=lambda kv: -sum(kv[1].values()),
+        )
+        write = terminalreporter.write_line
+        terminalreporter.write_sep('=', 'dirlay layout durations')
+        total = [
+            sum(t.get(k, 0.0) for t in self.times.values()) for k in (SETUP, TEARDOWN)
+        ]
+        write('{} tests, setup {:.4f}s, teardown {:.4f}s'.format(len(rows), *total))
+        for nodeid, t in rows[:limit] if limit else rows:
+            write(
+                '{:.4f}s setup  {:.4f}s teardown  {}'.format(
+                    t.get(SETUP, 0.0), t.get(TEARDOWN, 0.0), nodeid
+                )
+            )
@@ -0,0 +1,42 @@
+from collections.abc import Generator
+from typing import Dict
+
+from _pytest.terminal import TerminalReporter
+import pytest
+
+from dirlay import Dir, Path
+from dirlay.types import DictTree, PathType
+
+CACHE_DIR: str
+SETUP: str
+TEARDOWN: str
+
+def pytest_addoption(parser: pytest.Parser) -> None: ...
+def pytest_configure(config: pytest.Config) -> None: ...
+@pytest.fixture(scope='session')
+def dirlay_cache(tmp_path_factory: pytest.TempPathFactory) -> 'LayoutCache': ...
+@pytest.fixture
+def dirlay(
+    request: pytest.FixtureRequest,
+    dirlay_cache: 'LayoutCache',
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Generator[Dir, None, None]: ...
+
+class LayoutCache(object):
+    root: Path
+    paths: Dict[str, Path]
+    def __init__(self, root: PathType) -> None: ...
+    def get(self, layout: Dir) -> Path: ...
+
+def fingerprint(entries: DictTree) -> str: ...
+def clone(layout: Dir, source: PathType, target: PathType) -> Dir: ...
+
+class Timings(object):
+    times: Dict[str, Dict[str, float]]
+    def __init__(self) -> None: ...
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None: ...
+    def pytest_terminal_summary(
+        self,
+        terminalreporter: TerminalReporter,
+        config: pytest.Config,
+    ) -> None: ...
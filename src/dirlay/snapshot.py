@@ -0,0 +1,208 @@
+import locale
+import os
+import shutil
+import stat
+import time
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover  # Python < 3.5
+    scandir = None
+
+from dirlay.content import CHUNK_SIZE, Content, FileRef
+from dirlay.materialize import encode, materialize, mkdir, signature, write
+from dirlay.optional import pathlib
+from dirlay.stats import perf_counter
+
+
+Path = pathlib.Path
+
+RACY_NS = 2 * 10**9  # timestamp granularity margin for whole second timestamps
+RACY_FINE_NS = 20 * 10**6  # margin for finer timestamps, set on kernel clock tick
+
+
+def reset(
+    basedir,
+    entries,
+    snap,
+    stats,
+    observers=(),
+    trusted=True,
+    skip=(),
+    encoding=None,
+    newline=None,
+):
+    """
+    Restore ``entries`` under ``basedir`` to pristine state in one scanning pass.
+    Files matching snapshot ``snap`` are left untouched, files missing from
+    snapshot are compared by content, other files are rewritten, missing entries
+    are created, and unexpected entries are removed. Entries with relative paths in
+    ``skip`` are ignored. If ``trusted`` is ``False``, layout was modified after
+    snapshot was taken, and all files are rewritten.
+
+    Snapshot ``snap`` maps relative path to ``(inode, size, mtime_ns)`` of file
+    verified to be pristine, and is updated in place. File system timestamps are
+    coarse, and file modified shortly after it was written may keep its
+    modification time, so `racy` files are not added to snapshot, and are compared
+    by content again next time. ``stats`` count only entries that were rewritten or
+    created.
+    """
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    if newline is None:
+        newline = os.linesep
+    if not trusted:
+        snap.clear()
+    times = stats.times
+    codec = (encoding, newline)
+    now = time_ns()
+    stack = [(str(basedir), '', entries)]
+    while stack:
+        dirpath, prefix, entries = stack.pop()
+        start = perf_counter()
+        listing = listdir(dirpath)
+        times['scan'] += perf_counter() - start
+        # compare
+        unchanged = set()
+        for name, st in listing:
+            if skip and prefix + name in skip:
+                continue
+            path = os.path.join(dirpath, name)
+            if name in entries:
+                value = entries[name]
+                if isinstance(value, Mapping):
+                    if stat.S_ISDIR(st.st_mode):
+                        stack.append((path, prefix + name + '/', value))
+                        unchanged.add(name)
+                        continue
+                elif stat.S_ISREG(st.st_mode):
+                    key = prefix + name
+                    start = perf_counter()
+                    if trusted and pristine(path, value, st, snap, key, now, codec):
+                        unchanged.add(name)
+                    else:
+                        snap.pop(key, None)
+                    times['scan'] += perf_counter() - start
+                    continue  # overwritten below
+            remove(path, st, times)
+        # restore
+        for name, value in entries.items():
+            if name in unchanged or (skip and prefix + name in skip):
+                continue
+            path = os.path.join(dirpath, name)
+            if isinstance(value, Mapping):
+                start = perf_counter()
+                mkdir(path)
+                times['mkdir'] += perf_counter() - start
+                stats.dirs += 1
+                for o in observers:
+                    o.on_mkdir(Path(path))
+                materialize(path, value, stats, observers, encoding, newline)
+            else:
+                size = write(path, value, times, encoding, newline)
+                stats.files += 1
+                stats.bytes += size
+                for o in observers:
+                    o.on_write(Path(path), size)
+
+
+def linked(value):
+    return isinstance(value, FileRef) and value.linked
+
+
+def listdir(path):
+    """
+    Return list of ``(name, stat_result)`` of directory entries, not following
+    symlinks.
+    """
+    if scandir is None:  # pragma: no cover
+        return [(n, os.lstat(os.path.join(path, n))) for n in os.listdir(path)]
+    it = scandir(path)
+    try:
+        return [(e.name, e.stat(follow_symlinks=False)) for e in it]
+    finally:
+        if hasattr(it, 'close'):
+            it.close()
+
+
+def racy(mtime_ns, now):
+    """
+    Return whether file with modification time ``mtime_ns``, verified at ``now``,
+    could be modified after that without changing its modification time. Margin is
+    `RACY_NS` for timestamps in whole seconds, and `RACY_FINE_NS` otherwise.
+    """
+    margin = RACY_NS if mtime_ns % 10**9 == 0 else RACY_FINE_NS
+    return mtime_ns > now - margin
+
+
+def settle(snap):
+    """
+    Remove `racy` entries from snapshot ``snap`` of files just written, and return
+    it. Remaining files are trusted by signature, and racy ones are compared by
+    content once on next `reset`.
+    """
+    now = time_ns()
+    for key in [k for k, sig in snap.items() if racy(sig[2], now)]:
+        del snap[key]
+    return snap
+
+
+def pristine(path, value, st, snap, key, now, codec):
+    """
+    Return whether file at ``path`` with stat ``st`` has content ``value``, by
+    snapshot ``snap`` or by content encoded with ``(encoding, newline)`` ``codec``.
+    File with content verified at ``now`` is added to snapshot, unless `racy`.
+    Linked files are never pristine, to be relinked.
+    """
+    sig = signature(st)
+    if snap.get(key) == sig:
+        return True
+    if linked(value) or not same(path, value, *codec):
+        return False
+    if not racy(sig[2], now):
+        snap[key] = sig
+    return True
+
+
+def same(path, value, encoding=None, newline=None):
+    """
+    Return whether file at ``path`` has content ``value``, encoded as by `write`.
+    File and content are compared chunk by chunk.
+    """
+    if isinstance(value, FileRef):
+        with open(value.path, 'rb') as src:
+            return equal(path, iter(lambda: src.read(CHUNK_SIZE), b''))
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    if newline is None:
+        newline = os.linesep
+    chunks = value.chunks() if isinstance(value, Content) else (value,)
+    return equal(path, (encode(c, encoding, newline) for c in chunks))
+
+
+def equal(path, chunks):
+    with open(path, 'rb') as f:
+        for data in chunks:
+            if f.read(len(data)) != data:
+                return False
+        return not f.read(1)
+
+
+def time_ns():
+    if hasattr(time, 'time_ns'):
+        return time.time_ns()
+    return int(time.time() * 1e9)  # pragma: no cover  # Python < 3.7
+
+
+def remove(path, st, times):
+    start = perf_counter()
+    if stat.S_ISDIR(st.st_mode):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+    times['rmtree'] += perf_counter() - start
@@ -0,0 +1,44 @@
+from collections.abc import Container, Iterable
+from os import stat_result
+from typing import Any, Dict, List, Optional, Tuple
+
+from dirlay.materialize import Signature as Signature, signature as signature
+from dirlay.stats import MaterializationStats, Observer
+from dirlay.types import DictTree, PathType
+
+RACY_NS: int
+RACY_FINE_NS: int
+
+def reset(
+    basedir: PathType,
+    entries: DictTree,
+    snap: Dict[str, Signature],
+    stats: MaterializationStats,
+    observers: Iterable[Observer] = ...,
+    trusted: bool = ...,
+    skip: Container[str] = ...,
+    encoding: Optional[str] = ...,
+    newline: Optional[str] = ...,
+) -> None: ...
+def linked(value: Any) -> bool: ...
+def listdir(path: str) -> List[Tuple[str, stat_result]]: ...
+def racy(mtime_ns: int, now: int) -> bool: ...
+def settle(snap: Dict[str, Signature]) -> Dict[str, Signature]: ...
+def pristine(
+    path: str,
+    value: Any,
+    st: stat_result,
+    snap: Dict[str, Signature],
+    key: str,
+    now: int,
+    codec: Tuple[str, str],
+) -> bool: ...
+def same(
+    path: str,
+    value: Any,
+    encoding: Optional[str] = ...,
+    newline: Optional[str] = ...,
+) -> bool: ...
+def equal(path: str, chunks: Iterable[bytes]) -> bool: ...
+def time_ns() -> int: ...
+def remove(path: str, st: stat_result, times: Dict[str, float]) -> None: ...
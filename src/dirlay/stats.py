@@ -0,0 +1,99 @@
+try:
+    from time import perf_counter
+except ImportError:  # pragma: no cover
+    from time import time as perf_counter  # noqa: F401  # exported
+
+
+class Observer(object):
+    """
+    Base class for filesystem operation observers, see
+    `~dirlay.Dir.add_observer`. Subclasses override methods of interest; all
+    methods do nothing by default.
+    """
+
+    def on_mkdir(self, path):
+        """
+        Called after directory ``path`` (`~pathlib.Path`) was created.
+        """
+
+    def on_write(self, path, size):
+        """
+        Called after file ``path`` (`~pathlib.Path`) was written with ``size`` bytes.
+        """
+
+    def on_chdir(self, path):
+        """
+        Called after current directory was changed to ``path`` (`~pathlib.Path`).
+        """
+
+    def on_rmtree(self, path):
+        """
+        Called after directory layout linked to ``path`` (`~pathlib.Path`) was
+        removed.
+        """
+
+
+class MaterializationStats(object):
+    """
+    Aggregated statistics of the last `~dirlay.Dir.mktree` or `~dirlay.Dir.reset`
+    call, available as `~dirlay.Dir.stats`, and subsequent `~dirlay.Dir.chdir` and
+    `~dirlay.Dir.rmtree` calls.
+
+    Attributes:
+
+        dirs (``int``):
+            Number of directories created.
+
+        files (``int``):
+            Number of files written.
+
+        bytes (``int``):
+            Total number of bytes written.
+
+        times (``dict[str, float]``):
+            Wall time in seconds by phase, one of `~dirlay.MaterializationStats.phases`.
+    """
+
+    phases = ('prepare', 'mkdir', 'encode', 'write', 'scan', 'chdir', 'rmtree')
+
+    def __init__(self):
+        self.dirs = 0
+        self.files = 0
+        self.bytes = 0
+        self.times = dict.fromkeys(self.phases, 0.0)
+
+    def __repr__(self):
+        return '<MaterializationStats dirs={} files={} bytes={} time={:.6f}>'.format(
+            self.dirs, self.files, self.bytes, self.total_time
+        )
+
+    @property
+    def total_time(self):
+        """
+        Total wall time of all phases, in seconds.
+        """
+        return sum(self.times.values())
+
+    def merge(self, other):
+        """
+        Add counts and phase times from another `~dirlay.MaterializationStats` or its
+        `~dirlay.MaterializationStats.as_dict` representation.
+        """
+        if isinstance(other, MaterializationStats):
+            other = other.as_dict()
+        self.dirs += other['dirs']
+        self.files += other['files']
+        self.bytes += other['bytes']
+        for phase, value in other['times'].items():
+            self.times[phase] = self.times.get(phase, 0.0) + value
+
+    def as_dict(self):
+        """
+        Return statistics as plain ``dict``, e.g. to export to metrics system.
+        """
+        return {
+            'dirs': self.dirs,
+            'files': self.files,
+            'bytes': self.bytes,
+            'times': dict(self.times),
+        }
@@ -0,0 +1,30 @@
+from typing import Dict, Tuple, TypedDict, Union
+
+from dirlay.types import Path
+
+def perf_counter() -> float: ...
+
+class Observer(object):
+    def on_mkdir(self, path: Path) -> None: ...
+    def on_write(self, path: Path, size: int) -> None: ...
+    def on_chdir(self, path: Path) -> None: ...
+    def on_rmtree(self, path: Path) -> None: ...
+
+class StatsDict(TypedDict):
+    dirs: int
+    files: int
+    bytes: int
+    times: Dict[str, float]
+
+class MaterializationStats(object):
+    phases: Tuple[str, ...]
+    dirs: int
+    files: int
+    bytes: int
+    times: Dict[str, float]
+    def __init__(self) -> None: ...
+    def __repr__(self) -> str: ...
+    @property
+    def total_time(self) -> float: ...
+    def merge(self, other: Union['MaterializationStats', StatsDict]) -> None: ...
+    def as_dict(self) -> StatsDict: ...
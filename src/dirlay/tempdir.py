@@ -0,0 +1,105 @@
+import os
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from dirlay.content import Content
+from dirlay.materialize import BLOCK_SIZE
+
+
+MODES = ('auto', 'tmpfs', 'disk')
+MOUNTS = '/proc/mounts'
+TMPFS_TYPES = ('tmpfs', 'ramfs')
+
+
+def temp_parent(mode, size, mounts=MOUNTS):
+    """
+    Return parent directory for temporary ``basedir`` according to ``mode``:
+
+    - ``'disk'``: ``None``, meaning `tempfile` default location
+    - ``'auto'``: first of `candidates` that is on tmpfs and has room for ``size``
+      bytes, or ``None`` if there is no such directory
+    - ``'tmpfs'``: same as ``'auto'``, but raise `RuntimeError` when there is no
+      such directory
+
+    Raises:
+
+        ValueError: If ``mode`` is not supported.
+
+        RuntimeError: If ``mode`` is ``'tmpfs'`` and no tmpfs directory is available.
+    """
+    if mode not in MODES:
+        raise ValueError('Unsupported temp mode: {!r}'.format(mode))
+    if mode == 'disk':
+        return None
+    for path in candidates():
+        if is_tmpfs(path, mounts) and free_space(path) >= size:
+            return path
+    if mode == 'tmpfs':
+        raise RuntimeError('No tmpfs directory with {} bytes available'.format(size))
+    return None
+
+
+def candidates():
+    """
+    Directories that are usually on tmpfs: ``/dev/shm`` and ``$XDG_RUNTIME_DIR``.
+    """
+    ret = ['/dev/shm']  # noqa: S108  # checked to be a writable tmpfs
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        ret.append(os.environ['XDG_RUNTIME_DIR'])
+    return [p for p in ret if os.path.isdir(p) and os.access(p, os.W_OK)]
+
+
+def is_tmpfs(path, mounts=MOUNTS):
+    """
+    Check whether ``path`` belongs to memory-backed file system, using the longest
+    matching mount point from ``mounts`` table. Return ``False`` if the table is not
+    available.
+    """
+    path = os.path.realpath(path)
+    best, fstype = '', None
+    try:
+        with open(mounts) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                point = fields[1].replace('\\040', ' ')
+                inside = path == point or path.startswith(point.rstrip('/') + '/')
+                if inside and len(point) >= len(best):
+                    best, fstype = point, fields[2]
+    except (IOError, OSError):
+        return False
+    return fstype in TMPFS_TYPES
+
+
+def free_space(path):
+    """
+    Number of bytes available to unprivileged user at ``path``, or ``0`` if unknown.
+    """
+    try:
+        st = os.statvfs(path)
+    except (AttributeError, OSError):  # pragma: no cover  # Windows
+        return 0
+    return st.f_bavail * st.f_frsize
+
+
+def estimate_size(entries):
+    """
+    Estimate disk usage of nested ``entries`` in bytes, counting content size of
+    every file, rounded up to `~dirlay.materialize.BLOCK_SIZE`, and one block per
+    directory.
+    """
+    size = 0
+    stack = [entries]
+    while stack:
+        for value in stack.pop().values():
+            if isinstance(value, Mapping):
+                size += BLOCK_SIZE
+                stack.append(value)
+            else:
+                n = value.size if isinstance(value, Content) else len(value)
+                size += -(-n // BLOCK_SIZE) * BLOCK_SIZE
+    return size
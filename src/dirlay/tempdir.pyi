@@ -0,0 +1,13 @@
+from typing import List, Optional, Tuple
+
+from dirlay.types import DictTree
+
+MODES: Tuple[str, ...]
+MOUNTS: str
+TMPFS_TYPES: Tuple[str, ...]
+
+def temp_parent(mode: str, size: int, mounts: str = ...) -> Optional[str]: ...
+def candidates() -> List[str]: ...
+def is_tmpfs(path: str, mounts: str = ...) -> bool: ...
+def free_space(path: str) -> int: ...
+def estimate_size(entries: DictTree) -> int: ...
@@ -1,15 +1,17 @@
 from collections import UserDict
 from collections.abc import Mapping
 import sys
-from typing import Any as Any, Dict as Dict, Union as Union
+from typing import Any as Any, Dict as Dict, Tuple as Tuple, Union as Union
 
 from typing_extensions import TypeAlias  # noqa: F401  # used in type hints
 
+from dirlay.content import Content
 from dirlay.optional import pathlib
 
 
 Path = pathlib.Path  # type: TypeAlias
 PathType = Union[Path, str]  # type: TypeAlias
+KeyType = Union[PathType, Tuple[str, ...]]  # type: TypeAlias
 
 # dicts
 
@@ -34,7 +36,8 @@ else:
     >>> tree |= {'c.md': 'c file content'}
     """
 
-DictNode = Union[str, DictTree]  # type: TypeAlias
+DictNode = Union[str, Content, DictTree]  # type: TypeAlias
 """
-TypeAlias: User representation of directory node — a file or a directory.
+TypeAlias: User representation of directory node — a file or a directory. File
+content is ``str`` or `~dirlay.content.Content` produced on demand.
 """
@@ -0,0 +1,60 @@
+import sys
+from unittest import TestCase, skipIf
+
+from dirlay import Dir
+from dirlay.content import SizedContent
+from tests.util import listing
+
+try:
+    from typing import Any, Dict, List, Tuple, Type  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+@skipIf(sys.version_info < (3,), 'nested dicts are OrderedDict')
+class TestAdopt(TestCase):
+    def test_no_copy(self):  # type: () -> None
+        data = {'a': {'b.txt': 'B', 'c': {}}, 'd.bin': SizedContent(3)}  # type: Dict[str, Any]
+        tree = Dir.adopt(data)
+        self.assertIs(data, tree.data)
+        self.assertIs(data['a'], tree['a'].data)
+        self.assertEqual(Dir(data), tree)
+        self.assertIsNone(tree._tree._len)
+        self.assertEqual(4, len(tree._tree))
+
+    def test_mutate(self):  # type: () -> None
+        data = {'a': {'b.txt': 'B'}}  # type: Dict[str, Any]
+        tree = Dir.adopt(data)
+        tree |= {'a/c/d.txt': 'D'}
+        self.assertEqual(4, len(tree._tree))
+        del tree._tree['a/b.txt']
+        self.assertEqual(3, len(tree._tree))
+        self.assertEqual({'a': {'c': {'d.txt': 'D'}}}, data)
+
+    def test_mktree(self):  # type: () -> None
+        data = {'a': {'b.txt': 'B', 'c': {}}}  # type: Dict[str, Any]
+        with Dir.adopt(data).mktree() as tree:
+            expected = {'a': None, 'a/b.txt': 'B', 'a/c': None}
+            self.assertEqual(expected, listing(str(tree.basedir)))
+
+    def test_validate(self):  # type: () -> None
+        cases = [
+            ({'a/b.txt': 'B'}, ValueError),
+            ({'a': {'..': {}}}, ValueError),
+            ({'a': {'': 'x'}}, ValueError),
+            ({'a': {'b': 1}}, TypeError),
+        ]  # type: List[Tuple[Dict[str, Any], Type[Exception]]]
+        for data, exc in cases:
+            with self.assertRaises(exc):
+                Dir.adopt(data, validate='eager')
+            tree = Dir.adopt(data)
+            with self.assertRaises(exc):
+                tree.mktree()
+            self.assertIsNone(tree.basedir)
+            with self.assertRaises(exc):
+                Dir.adopt(data).compile()
+            Dir.adopt(data, validate='none')  # not checked
+        tree = Dir.adopt({'a': {'b.txt': 'B'}}, validate='eager')
+        self.assertEqual(2, tree._tree._len)
+        with self.assertRaises(ValueError):
+            Dir.adopt({}, validate='always')
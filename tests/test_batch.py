@@ -0,0 +1,104 @@
+from copy import deepcopy
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.nested_dict import NestedDict
+
+try:
+    from typing import Any, Dict  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class TestBatch(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d1': {'f0': 'A'}, 'f0': ''},
+                'd1': {'f0': 'B', 'f1': ''},
+                'd2': {'f0': 'C'},
+                'e': {},
+                'f.txt': 'F',
+            }
+        )
+        self.data = deepcopy(self.tree.data)
+
+    def test_commit(self):  # type: () -> None
+        expected = Dir(self.data)
+        with self.tree.batch() as tree:
+            self.assertIs(self.tree, tree)
+            for i in range(10):
+                tree['d0/d1/new{}.txt'.format(i)] = str(i)
+                expected |= {'d0/d1/new{}.txt'.format(i): str(i)}
+            tree |= {'d0': {'d1': {'new0.txt': 'changed'}}}
+            tree['d0/d1'] = {'x': {}}  # replaces cached parent
+            tree['d0/d1/y.txt'] = 'Y'
+            del tree['d1']
+        del expected['d0/d1']
+        del expected['d1']
+        expected['d0/d1'] = {'x': {}, 'y.txt': 'Y'}
+        self.assertEqual(expected, self.tree)
+        self.assertEqual(len(expected._tree), len(self.tree._tree))
+        self.assertEqual(len(self.tree.keys()), len(self.tree._tree))
+
+    def test_rollback(self):  # type: () -> None
+        keys = self.tree.keys()
+        version = self.tree._tree._version
+        with self.assertRaises(KeyError):
+            with self.tree.batch():
+                self.tree['d0/d1/new.txt'] = 'N'
+                self.tree |= {'d0/new': {'a': 'A'}, 'f.txt': {'g': ''}}
+                self.tree['d1'] = 'now a file'
+                del self.tree['d2/f0']
+                self.tree._tree.clear()
+                self.tree['z'] = {}
+                del self.tree['missing']
+        self.assertEqual(self.data, self.tree.data)
+        self.assertEqual(keys, self.tree.keys())
+        self.assertEqual(len(keys), len(self.tree._tree))
+        self.assertNotEqual(version, self.tree._tree._version)
+
+    def test_nested(self):  # type: () -> None
+        d = NestedDict({'a': {'b': 1}})  # type: NestedDict[Dict[str, Any]]
+        with self.assertRaises(ValueError):
+            with d.batch():
+                d['a/c'] = 2
+                with d.batch():
+                    d['a/d'] = 3
+                d['a/b/x'] = 4
+        self.assertEqual({'a': {'b': 1}}, d.data)
+        self.assertFalse('_traverse' in vars(d))
+        self.assertIsNone(d._parents)
+
+    def test_len(self):  # type: () -> None
+        d = NestedDict({'a': {'b': 1}})  # type: NestedDict[Dict[str, Any]]
+        with d.batch():
+            d['a/c/d'] = 2
+            self.assertEqual(4, len(d))
+            d.put(('a', 'c'), {})
+            del d['a/b']
+            d |= {'x': {'y': 3}}
+            self.assertEqual(4, len(d))
+        self.assertIsNone(d._len)  # recounted on first use
+        self.assertEqual(4, len(d))
+        view = d.subtree('x')
+        with d.batch():
+            view['z'] = 4
+            d['a/e'] = 5
+        self.assertEqual(6, len(d))
+
+    def test_setitem(self):  # type: () -> None
+        tree = Dir({'a': {'b': {'c.txt': 'C'}}})
+        tree['a/b'] = {'d.txt': 'D'}
+        self.assertEqual({'a': {'b': {'d.txt': 'D'}}}, tree.data)
+        tree['x/y.txt'] = 'Y'
+        del tree['a']
+        self.assertEqual({'x': {'y.txt': 'Y'}}, tree.data)
+        self.assertEqual(2, len(tree._tree))
+        with self.assertRaises(ValueError):
+            tree['/abs'] = ''
+
+    def test_compact(self):  # type: () -> None
+        with self.assertRaises(TypeError):
+            with self.tree.compact().batch():
+                pass
@@ -0,0 +1,171 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+from tempfile import mkdtemp
+from unittest import TestCase, skipIf
+
+from dirlay import Dir, optional
+from dirlay.cli import main, scan
+
+try:
+    from typing import Any, List, Tuple  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class TestCli(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tmp = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.tree = Dir({'a': {'b.txt': 'B', 'c': {}}, 'd.txt': 'D\nD\n'})
+
+    def path(self, *parts):  # type: (str) -> str
+        return os.path.join(self.tmp, *parts)
+
+    def manifest(self, name, data):  # type: (str, Any) -> str
+        with io.open(self.path(name), 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False) + '\n')
+        return self.path(name)
+
+    def run_cli(self, *argv):  # type: (str) -> Tuple[int, str, str]
+        stdout, stderr = io.StringIO(), io.StringIO()
+        status = main(list(argv), stdout, stderr)
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_mktree(self):  # type: () -> None
+        a = self.manifest('a.json', self.tree.data)
+        b = self.manifest('b.json', {'x/y.txt': 'Y'})
+        report = self.path('report.json')
+        for pool in ('thread', 'process'):
+            out = self.path('out-' + pool)
+            argv = ['--report', report, 'mktree', a, b, '-o', out, '-j', '2']
+            status, stdout, stderr = self.run_cli(*(argv + ['--pool', pool]))
+            self.assertEqual((0, ''), (status, stdout))
+            self.assertEqual(self.tree.data, scan(os.path.join(out, 'a')))
+            self.assertEqual({'x': {'y.txt': 'Y'}}, scan(os.path.join(out, 'b')))
+            lines = stderr.splitlines()
+            self.assertEqual(3, len(lines))
+            self.assertTrue(lines[0].startswith('a: 3 dirs, 2 files, '))
+            self.assertTrue(lines[2].startswith('mktree: 2 layouts, '))
+            with io.open(report, encoding='utf-8') as f:
+                data = json.load(f)
+            self.assertEqual(('mktree', 0), (data['command'], data['status']))
+            self.assertEqual(['a', 'b'], [x['name'] for x in data['layouts']])
+            self.assertEqual(3, data['stats']['files'])
+
+    @skipIf(optional.tomllib is None, 'TOML is not supported')
+    def test_toml(self):  # type: () -> None
+        with io.open(self.path('t.toml'), 'w', encoding='utf-8') as f:
+            f.write('"d.txt" = "D"\n[a]\n"b.txt" = "B"\n')
+        status, _, stderr = self.run_cli(
+            '-q', 'mktree', self.path('t.toml'), '-o', self.path('out')
+        )
+        self.assertEqual((0, ''), (status, stderr))
+        self.assertEqual(
+            {'a': {'b.txt': 'B'}, 'd.txt': 'D'}, scan(self.path('out', 't'))
+        )
+
+    def test_errors(self):  # type: () -> None
+        a = self.manifest('a.json', {})
+        os.mkdir(self.path('x'))
+        b = self.manifest(os.path.join('x', 'a.json'), {})
+        c = self.manifest('c.json', ['a'])
+        d = self.manifest('d.json', {'a': {'b.txt': 1}})
+        e = self.manifest('e.json', {'e.txt': True})
+        for argv, message in (
+            (['mktree', a, b, '-o', self.tmp], 'Manifest names are not unique'),
+            (['mktree', c, '-o', self.tmp], 'Manifest is not a mapping'),
+            (['mktree', d, '-o', self.tmp], "Value of 'a/b.txt' is not text: 1"),
+            (['render', e], "Value of 'e.txt' is not text: True"),
+            (['mktree', self.path('x'), '-o', self.tmp], 'Is a directory'),
+            (['verify', self.tmp, self.path('missing.json')], 'No such file'),
+        ):
+            status, _, stderr = self.run_cli(*argv)
+            self.assertEqual(2, status)
+            self.assertTrue(stderr.startswith('dirlay {}: error: '.format(argv[0])))
+            self.assertTrue(message in stderr, stderr)
+
+    def test_no_partial_output(self):  # type: () -> None
+        a = self.manifest('a.json', {'a.txt': 'A'})
+        b = self.manifest('b.json', {'b.txt': None})
+        for jobs in ('1', '2'):
+            argv = ['mktree', a, b, '-o', self.path('out'), '-j', jobs]
+            status, _, stderr = self.run_cli(*argv)
+            self.assertEqual(2, status)
+            self.assertTrue("Value of 'b.txt' is not text: None" in stderr, stderr)
+            self.assertFalse(os.path.exists(self.path('out')))
+
+    def test_verify_undecodable(self):  # type: () -> None
+        manifest = self.manifest('m.json', {'a.bin': 'A', 'b.bin': 'B'})
+        os.mkdir(self.path('tree'))
+        for name in ('a.bin', 'b.bin', 'c.bin'):
+            with open(self.path('tree', name), 'wb') as f:
+                f.write(b'\xff\xfe\x00' if name != 'b.bin' else b'B')
+        argv = ['-q', 'verify', self.path('tree'), manifest, '--encoding', 'utf-8']
+        status, stdout, stderr = self.run_cli(*argv)
+        self.assertEqual((1, ''), (status, stderr))
+        self.assertEqual(
+            ['modified a.bin', 'unexpected c.bin'], sorted(stdout.splitlines())
+        )
+
+    def test_scan_verify(self):  # type: () -> None
+        self.tree.mktree(self.path('tree'))
+        status, stdout, stderr = self.run_cli('scan', self.path('tree'))
+        self.assertEqual(0, status)
+        self.assertEqual(self.tree.data, json.loads(stdout))
+        self.assertTrue(stderr.startswith('scan: 4 entries, '))
+        manifest = self.path('m.json')
+        self.run_cli('scan', self.path('tree'), '-o', manifest)
+        status, stdout, stderr = self.run_cli('verify', self.path('tree'), manifest)
+        self.assertEqual((0, ''), (status, stdout))
+        self.assertTrue(stderr.startswith('verify: 0 differences, '))
+        with open(str(self.tree // 'd.txt'), 'w') as f:
+            f.write('changed')
+        os.rmdir(str(self.tree // 'a/c'))
+        with open(str(self.tree // 'a/c'), 'w') as f:
+            f.write('file')
+        os.remove(str(self.tree // 'a/b.txt'))
+        os.mkdir(self.path('tree', 'extra'))
+        status, stdout, _ = self.run_cli('-q', 'verify', self.path('tree'), manifest)
+        self.assertEqual(1, status)
+        self.assertEqual(
+            ['missing a/b.txt', 'modified d.txt', 'replaced a/c', 'unexpected extra'],
+            sorted(stdout.splitlines()),
+        )
+
+    def test_render(self):  # type: () -> None
+        expected = io.StringIO()
+        self.tree.format_tree(fp=expected, show_data=True)
+        manifest = self.manifest('m.json', self.tree.data)
+        self.tree.mktree(self.path('tree'))
+        for path in (manifest, self.path('tree')):
+            status, stdout, _ = self.run_cli('-q', 'render', path, '--data')
+            self.assertEqual((0, expected.getvalue()), (status, stdout))
+        status, stdout, _ = self.run_cli('-q', 'render', manifest, '--depth', '0')
+        self.assertEqual('.\n', stdout)
+
+    def test_module(self):  # type: () -> None
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                '-m',
+                'dirlay',
+                '-q',
+                'render',
+                self.manifest('m.json', {}),
+            ],
+            stdout=subprocess.PIPE,
+        )
+        stdout, _ = proc.communicate()
+        self.assertEqual((0, b'.\n'), (proc.returncode, stdout))
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'dirlay'], stderr=subprocess.PIPE
+        )
+        _, stderr = proc.communicate()
+        self.assertEqual(2, proc.returncode)
+        self.assertTrue(b'usage: dirlay' in stderr)
@@ -0,0 +1,82 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+import io
+import pickle
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.compact import CompactMapping
+from dirlay.content import SizedContent
+from tests.util import listing
+
+
+class TestCompact(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d1': {'f0': 'A\nB\n', 'f1': ''}, 'f0': 'C', 'x': {}},
+                'd1': {'d0': {'f0': 'D' * 50}},
+                'e': {},
+                'f0': 'E',
+                'lazy': SizedContent(10),
+            }
+        )
+        self.compact = self.tree.compact()
+
+    def test_api(self):  # type: () -> None
+        tree = self.tree | {'u.txt': 'é\n'}
+        compact = tree.compact()
+        self.assertEqual(tree, compact)
+        self.assertEqual(tree.keys(), compact.keys())
+        self.assertEqual(len(tree._tree), len(compact._tree))
+        for k, node in tree.items():
+            cnode = compact[k]
+            self.assertEqual(node.isdir, cnode.isdir)
+            self.assertEqual(node.data, cnode.data)
+        self.assertTrue('d0/d1/f0' in compact)
+        self.assertFalse('d0/missing' in compact)
+        self.assertFalse('u.txt/x' in compact)
+        self.assertEqual('é\n', compact['u.txt'].data)
+        with self.assertRaises(KeyError):
+            compact['missing']
+        self.assertEqual(len(tree.leaves()), len(compact.leaves()))
+
+    def test_readonly(self):  # type: () -> None
+        with self.assertRaises(TypeError):
+            self.compact |= {'new': ''}
+        with self.assertRaises(TypeError):
+            self.compact['d0/f0'].data = 'changed'
+        with self.assertRaises(TypeError):
+            del self.compact._tree['e']
+        mutable = self.compact.copy()
+        mutable |= {'new': ''}
+        self.assertEqual(self.tree | {'new': ''}, mutable)
+
+    def test_format(self):  # type: () -> None
+        expected, actual = io.StringIO(), io.StringIO()
+        self.tree.format_tree(expected, show_data=True)
+        self.compact.format_tree(actual, show_data=True)
+        self.assertEqual(expected.getvalue(), actual.getvalue())
+
+    def test_mktree(self):  # type: () -> None
+        with self.tree.mktree() as expected:
+            for kwargs in ({}, {'workers': 2, 'pool': 'process'}):
+                with self.compact.mktree(**kwargs):  # type: ignore[arg-type]
+                    self.assertEqual(
+                        listing(str(expected.basedir)),
+                        listing(str(self.compact.basedir)),
+                    )
+                    self.compact.reset()
+            self.assertEqual(self.tree.compile().ops, self.compact.compile().ops)
+
+    def test_pickle(self):  # type: () -> None
+        data = pickle.loads(pickle.dumps(self.compact.data))  # noqa: S301
+        self.assertIsInstance(data, dict)
+        self.assertEqual(self.tree.data, data)
+        self.assertIsInstance(self.compact.data, CompactMapping)
+
+    def test_size(self):  # type: () -> None
+        store = Dir.synthetic(3, 10, 10).compact()._tree.store  # type: ignore[attr-defined]
+        self.assertEqual(len(store.names), 21)  # with root
+        self.assertLess(store.nbytes() / len(store), 40)
@@ -0,0 +1,118 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+import pickle
+import sys
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.content import CompressedContent, SizedContent, TextCache, cache
+from tests.util import listing
+
+try:
+    from typing import Any, Dict, Union  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+CODECS = ('zlib', 'lzma') if sys.version_info >= (3, 3) else ('zlib',)
+
+
+class TestCompress(TestCase):
+    def setUp(self):  # type: () -> None
+        self.big = SizedContent(200000, seed=1).read()
+        self.entries = {'a': {'big.txt': self.big, 'small.txt': 'S'}, 'e': {}}
+
+    def test_compress(self):  # type: () -> None
+        for codec in CODECS:
+            tree = Dir(self.entries).compress(threshold=100, codec=codec)
+            data = tree.data  # type: Any
+            value = data['a']['big.txt']
+            self.assertIsInstance(value, CompressedContent)
+            self.assertEqual(codec, value.codec)
+            self.assertLess(len(value.data), len(self.big))
+            self.assertEqual('S', data['a']['small.txt'])
+            self.assertEqual(self.big, tree['a/big.txt'].data)
+            self.assertEqual(self.big, ''.join(value.chunks()))
+            self.assertEqual(Dir(self.entries), tree)
+            self.assertEqual(4, len(tree._tree))
+
+    def test_mktree(self):  # type: () -> None
+        expected = Dir(self.entries).mktree()
+        for workers in (None, 2):
+            tree = Dir(self.entries).compress(threshold=1)
+            tree.mktree(workers=workers, pool='thread')
+            self.assertEqual(listing(str(expected.basedir)), listing(str(tree.basedir)))
+            tree.rmtree()
+        expected.rmtree()
+
+    def test_unicode(self):  # type: () -> None
+        text = 'é€\U0001f600\n' * 30000
+        value = CompressedContent.from_text(text)
+        self.assertEqual(text, ''.join(value.chunks()))
+        self.assertEqual(len(text), value.size)
+
+    def test_materialized(self):  # type: () -> None
+        tree = Dir(self.entries).mktree()
+        plan = tree.compile()
+        patch = tree.diff(tree.copy())
+        tree.compress(threshold=1)
+        self.assertTrue(plan.stale)
+        self.assertTrue(patch.stale)
+        tree.reset()
+        self.assertEqual(0, tree.stats.files)  # type: ignore[union-attr]
+        tree.rmtree()
+
+    def test_hash_once(self):  # type: () -> None
+        value = CompressedContent.from_text(self.big)
+        loaded = pickle.loads(pickle.dumps(value))  # noqa: S301
+        cache.clear()
+        self.assertEqual(hash(self.big), hash(value))
+        self.assertIsNone(cache.get((value.codec, value.data)))  # not decompressed
+        self.assertEqual(hash(self.big), hash(loaded))
+        cache.clear()
+        self.assertEqual(hash(self.big), hash(loaded))
+        self.assertIsNone(cache.get((value.codec, value.data)))
+
+    def test_pickle(self):  # type: () -> None
+        value = CompressedContent.from_text(self.big, codec=CODECS[-1])
+        self.assertEqual(value, pickle.loads(pickle.dumps(value)))  # noqa: S301
+        self.assertNotEqual(value, CompressedContent.from_text(self.big[1:]))
+
+    def test_equal(self):  # type: () -> None
+        values = [CompressedContent.from_text(self.big, codec=c) for c in CODECS]
+        for value in values:
+            self.assertEqual(self.big, value)
+            self.assertEqual(value, self.big)
+            self.assertEqual(hash(self.big), hash(value))
+            self.assertEqual({self.big}, {self.big} & {value})
+            lookup = {value: 'B'}  # type: Dict[Union[str, CompressedContent], str]
+            self.assertEqual('B', lookup[self.big])
+            self.assertNotEqual(value, self.big[1:])
+            self.assertNotEqual(value, CompressedContent.from_text(self.big[1:]))
+            self.assertEqual(values[0], value)
+            self.assertEqual(hash(values[0]), hash(value))
+        compressed = [Dir(self.entries).compress(threshold=1, codec=c) for c in CODECS]
+        for tree in compressed:
+            self.assertEqual(compressed[0], tree)
+
+    def test_errors(self):  # type: () -> None
+        with self.assertRaises(ValueError):
+            Dir(self.entries).compress(codec='gzip')
+        with self.assertRaises(TypeError):
+            Dir(self.entries).compact().compress()
+
+    def test_cache(self):  # type: () -> None
+        c = TextCache(max_size=10)
+        a, b, d = (('zlib', t) for t in (b'a', b'b', b'd'))
+        c.put(a, 'aaaa')
+        c.put(b, 'bbbb')
+        c.get(a)  # b is least recently used
+        c.put(d, 'dddd')
+        self.assertEqual((None, 'aaaa', 'dddd'), (c.get(b), c.get(a), c.get(d)))
+        self.assertEqual(8, c.size)
+        c.put(b, 'b' * 11)  # too long
+        self.assertIsNone(c.get(b))
+        value = CompressedContent.from_text(self.big)
+        cache.clear()
+        self.assertEqual(self.big, value.read())
+        self.assertIs(value.read(), cache.get((value.codec, value.data)))
@@ -0,0 +1,107 @@
+from __future__ import unicode_literals
+
+import os
+import pickle
+import shutil
+import sys
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.content import FileRef
+from dirlay.materialize import copy_file
+
+try:
+    from typing import Any  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+DATA = 'line one\nline two \xe9\r\n'.encode('utf-8') * 1000
+
+
+class TestFileRef(TestCase):
+    def setUp(self):  # type: () -> None
+        self.src = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.src)
+        self.path = os.path.join(self.src, 'sample.bin')
+        with open(self.path, 'wb') as f:
+            f.write(DATA)
+
+    def read(self, path):  # type: (str) -> bytes
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_modes(self):  # type: () -> None
+        for mode in FileRef.MODES:
+            tree = Dir({'a': {'s.bin': FileRef(self.path, mode=mode)}}).mktree()
+            path = str(tree // 'a/s.bin')
+            self.assertEqual(DATA, self.read(path))
+            self.assertEqual(mode == 'symlink', os.path.islink(path))
+            self.assertEqual(
+                mode in ('hardlink', 'symlink'), os.path.samefile(path, self.path)
+            )
+            size = 0 if mode in ('hardlink', 'symlink') else len(DATA)
+            self.assertEqual(size, tree.stats.bytes)  # type: ignore[union-attr]
+            tree.rmtree()
+            self.assertEqual(DATA, self.read(self.path))
+
+    def test_value(self):  # type: () -> None
+        ref = FileRef(os.path.relpath(self.path))
+        self.assertEqual(self.path, ref.path)
+        self.assertEqual(len(DATA), ref.size)
+        self.assertEqual(DATA.decode('utf-8'), Dir({'s': ref})['s'].data)
+        self.assertEqual(ref, pickle.loads(pickle.dumps(ref)))  # noqa: S301
+        self.assertNotEqual(ref, FileRef(self.path, mode='reflink'))
+        self.assertEqual(hash(ref), hash(FileRef(self.path)))
+        with self.assertRaises(ValueError):
+            FileRef(self.path, mode='move')
+
+    def test_copy_fallback(self):  # type: () -> None
+        module = sys.modules[copy_file.__module__]  # type: Any
+        copy_range = module.copy_range
+        module.copy_range = lambda infd, outfd: None  # no kernel copy
+        try:
+            dst = os.path.join(self.src, 'copy.bin')
+            self.assertEqual(len(DATA), copy_file(self.path, dst))
+        finally:
+            module.copy_range = copy_range
+        self.assertEqual(DATA, self.read(dst))
+        dst = os.path.join(self.src, 'reflink.bin')
+        self.assertEqual(len(DATA), copy_file(self.path, dst, reflink=True))
+        self.assertEqual(DATA, self.read(dst))
+
+    def test_reset(self):  # type: () -> None
+        mtime = os.stat(self.path).st_mtime
+        tree = Dir({'h': FileRef(self.path, 'hardlink'), 'c': FileRef(self.path)})
+        tree.mktree()
+        self.addCleanup(tree.rmtree)
+        self.assertEqual(mtime, os.stat(self.path).st_mtime)  # not backdated
+        with open(str(tree // 'c'), 'wb') as f:
+            f.write(b'changed')
+        tree.reset()
+        self.assertEqual(DATA, self.read(str(tree // 'c')))
+        tree['h'] = FileRef(self.path)  # replace link with copy
+        tree.reset()
+        self.assertFalse(os.path.samefile(str(tree // 'h'), self.path))
+        self.assertEqual(DATA, self.read(self.path))
+        self.assertEqual(mtime, os.stat(self.path).st_mtime)
+
+    def test_plan(self):  # type: () -> None
+        ref = FileRef(self.path, 'symlink')
+        plan = Dir({'a': {'s': ref}, 'c': FileRef(self.path)}).compile()
+        self.assertEqual(
+            (('a', None), ('c', FileRef(self.path)), ('a/s', ref)), plan.ops
+        )
+        basedir = os.path.join(self.src, 'plan')
+        stats = plan.apply(basedir)
+        self.assertEqual((2, len(DATA)), (stats.files, stats.bytes))
+        self.assertEqual(self.path, os.readlink(os.path.join(basedir, 'a', 's')))
+        self.assertEqual(DATA, self.read(os.path.join(basedir, 'c')))
+
+    def test_parallel(self):  # type: () -> None
+        entries = {'d{}'.format(i): {'s': FileRef(self.path)} for i in range(8)}
+        for pool in ('thread', 'process'):
+            tree = Dir(entries).mktree(workers=2, pool=pool)
+            self.assertEqual(DATA, self.read(str(tree // 'd7/s')))
+            self.assertEqual(8 * len(DATA), tree.stats.bytes)  # type: ignore[union-attr]
+            tree.rmtree()
@@ -0,0 +1,40 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+import io
+from unittest import TestCase
+
+from dirlay import Dir
+
+
+class TestFormatTree(TestCase):
+    def format(self, tree, **kwargs):  # type: (Dir, object) -> str
+        buf = io.StringIO()
+        tree.format_tree(fp=buf, **kwargs)  # type: ignore[arg-type]
+        return buf.getvalue()
+
+    def test_empty(self):  # type: () -> None
+        self.assertEqual('.\n', self.format(Dir()))
+
+    def test_sorted(self):  # type: () -> None
+        tree = Dir({'b.txt': '', 'a': {'d': {}, 'c.txt': ''}})
+        self.assertEqual(
+            '.\n├── a/\n│   ├── c.txt\n│   └── d/\n└── b.txt\n',
+            self.format(tree),
+        )
+
+    def test_max_depth(self):  # type: () -> None
+        tree = Dir({'a/b/c/d.txt': 'D'})
+        self.assertEqual('.\n', self.format(tree, max_depth=0))
+        self.assertEqual('.\n└── a/\n', self.format(tree, max_depth=1))
+        self.assertEqual(
+            '.\n└── a/\n    └── b/\n        └── c/\n            └── d.txt\n',
+            self.format(tree, max_depth=None),
+        )
+
+    def test_show_data_multiline(self):  # type: () -> None
+        tree = Dir({'a.txt': 'x\ny\n', 'b.txt': ''})
+        self.assertEqual(
+            '.\n├── a.txt\n│     x\n│     y\n└── b.txt\n',
+            self.format(tree, show_data=True),
+        )
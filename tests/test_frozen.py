@@ -0,0 +1,169 @@
+import os
+import threading
+from unittest import TestCase
+
+from dirlay import Dir, FrozenDir
+from dirlay.content import CompressedContent
+from tests.util import listing
+
+try:
+    from typing import Any, Callable, List  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+def batch_update(tree):  # type: (Dir) -> None
+    with tree.batch():
+        tree.update({'d0/x': ''})
+
+
+def setitem(mapping, name, value):  # type: (Any, str, str) -> None
+    mapping[name] = value
+
+
+def clear(mapping):  # type: (Any) -> None
+    mapping.clear()
+
+
+class TestFrozen(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d1': {'f0': 'A', 'f1': ''}, 'f0': 'B'},
+                'd1': {'f0': 'C'},
+                'e': {},
+                'big.txt': 'B' * 1000,
+            }
+        )
+        self.frozen = self.tree.freeze()
+        self.expected = self.tree.copy()
+
+    def test_freeze(self):  # type: () -> None
+        self.assertIsInstance(self.frozen, FrozenDir)
+        self.assertIs(self.frozen, self.frozen.freeze())
+        self.assertEqual(self.tree, self.frozen)
+        self.assertEqual(len(self.tree._tree), len(self.frozen._tree))
+        self.tree['d0/d1'] = 'changed'
+        del self.tree['e']
+        self.assertEqual(self.expected, self.frozen)
+        self.assertEqual(self.expected, self.expected.compact().freeze())
+
+    def test_hash(self):  # type: () -> None
+        h = hash(self.frozen)
+        self.assertEqual(h, hash(self.expected.freeze()))
+        self.assertEqual(h, hash(FrozenDir(self.expected.data)))
+        compressed = self.expected.copy().compress(threshold=100).freeze()
+        self.assertEqual(h, hash(compressed))
+        self.assertEqual(self.frozen, compressed)
+        other = (self.expected | {'e/x': ''}).freeze()
+        self.assertNotEqual(h, hash(other))
+        self.assertEqual(2, len({self.frozen, compressed, other}))
+
+    def test_readonly(self):  # type: () -> None
+        frozen = self.frozen
+        for f in (
+            lambda: frozen.update({'x': ''}),
+            lambda: frozen.__ior__({'x': ''}),
+            lambda: frozen.__setitem__('x', ''),
+            lambda: frozen.__delitem__('e'),
+            lambda: setattr(frozen['big.txt'], 'data', ''),
+            lambda: frozen.batch().__enter__(),
+            lambda: frozen.compress(),
+            lambda: frozen.move('e', 'x'),
+        ):
+            with self.assertRaises(TypeError):
+                f()
+        self.assertEqual(self.expected, frozen)
+        self.assertIsNone(frozen.basedir)
+        self.assertEqual(self.expected | {'x': ''}, frozen | {'x': ''})
+
+    def test_thaw(self):  # type: () -> None
+        frozen = self.frozen
+        for f in (
+            lambda t: t.update({'d0/d1/x': ''}),
+            lambda t: t.__setitem__('d0/d1/f0', 'x'),
+            lambda t: t.__delitem__('d0/d1/f0'),
+            lambda t: setattr(t['d0/d1/f0'], 'data', 'x'),
+            lambda t: t._tree.clear(),
+            lambda t: t.compress(threshold=1),
+            batch_update,
+        ):
+            tree = frozen.thaw()
+            self.assertIs(frozen._tree.data, tree._tree.data)
+            f(tree)
+            self.assertEqual(self.expected, frozen)
+            self.assertIsNot(frozen._tree.data, tree._tree.data)
+            self.assertEqual(len(tree.keys()), len(tree._tree))
+        tree = frozen.thaw()
+        node = tree['d0/d1/f0']  # obtained before data is copied
+        node.data = 'x'
+        self.assertEqual('x', tree['d0/d1/f0'].data)
+        self.assertEqual(self.expected, frozen)
+
+    def test_thaw_stale_node(self):  # type: () -> None
+        frozen = self.frozen
+        h = hash(frozen)
+        tree = frozen.thaw()
+        node = tree['d0/d1/f0']  # obtained before data is copied
+        tree['x.txt'] = 'X'  # copies data
+        after = tree['d0/f0']  # obtained after data is copied
+        node.data = 'changed'
+        after.data = 'changed'
+        self.assertEqual('changed', tree['d0/d1/f0'].data)
+        self.assertEqual('changed', tree['d0/f0'].data)
+        self.assertEqual(self.expected, frozen)
+        self.assertEqual(h, hash(self.expected.freeze()))
+
+    def test_thaw_data(self):  # type: () -> None
+        frozen = self.frozen
+        tree = frozen.thaw()
+        tree['d0'].data['x'] = 'X'  # type: ignore[index]
+        tree.data['y'] = 'Y'  # type: ignore[index]
+        self.assertEqual('X', tree['d0/x'].data)
+        self.assertEqual('Y', tree['y'].data)
+        self.assertEqual(self.expected, frozen)
+
+    def test_readonly_data(self):  # type: () -> None
+        frozen = self.frozen
+        h = hash(frozen)
+        modifications = [
+            lambda: setitem(frozen.data, 'q', 'Q'),
+            lambda: setitem(frozen['d0'].data, 'z', 'Z'),
+            lambda: clear(frozen['d0/d1'].data),
+            lambda: setitem(frozen.root().data, 'q', 'Q'),
+        ]  # type: List[Callable[[], None]]
+        for f in modifications:
+            with self.assertRaises((TypeError, AttributeError)):
+                f()
+        self.assertEqual(self.expected, frozen)
+        self.assertEqual(self.expected.data, frozen.data)
+        self.assertEqual(frozen.data, self.expected.data)
+        self.assertEqual(h, hash(self.expected.freeze()))
+
+    def test_mktree(self):  # type: () -> None
+        with self.frozen.mktree() as frozen, self.expected.mktree() as expected:
+            pristine = listing(str(expected.basedir))
+            self.assertEqual(pristine, listing(str(frozen.basedir)))
+            os.remove(str(frozen // 'd0/f0'))
+            frozen.reset()
+            self.assertEqual(pristine, listing(str(frozen.basedir)))
+        self.assertIsNone(self.frozen.basedir)
+        self.assertEqual(self.expected, self.frozen)
+
+    def test_threads(self):  # type: () -> None
+        keys = [k for k, n in self.frozen.items() if not n.isdir]
+        expected = [self.expected[k].data for k in keys]
+        results = []
+
+        def read():  # type: () -> None
+            data = [self.frozen[k].data for k in keys]
+            results.append((data, hash(self.frozen)))
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([(expected, hash(self.expected.freeze()))] * 4, results)
+        self.assertIsInstance(self.frozen.data['big.txt'], str)
+        self.assertNotIsInstance(self.frozen.data['big.txt'], CompressedContent)
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase, skipIf, skipUnless
+
+try:
+    from typing import Dict  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+# budget for cumulative `import dirlay` time, best of several runs; wall-clock
+# time depends on the machine, so it is checked only when set, e.g. to 50000
+IMPORT_BUDGET_US = int(os.environ.get('DIRLAY_IMPORT_BUDGET_US', 0))
+IMPORT_RUNS = 5
+
+
+def importtime(module):  # type: (str) -> Dict[str, int]
+    """
+    Return cumulative import times in microseconds, by module name.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    _, stderr = proc.communicate()
+    ret = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:') :].split('|')
+        ret[name.strip()] = int(cumulative)
+    return ret
+
+
+@skipIf(sys.version_info < (3, 7), '-X importtime not supported')
+class TestImportTime(TestCase):
+    def test_optional_not_imported(self):  # type: () -> None
+        modules = importtime('dirlay')
+        self.assertIn('dirlay', modules)
+        self.assertNotIn('rich', modules)
+        self.assertNotIn('dirlay.format_rich', modules)
+
+    def test_features_not_imported(self):  # type: () -> None
+        modules = importtime('dirlay')
+        for name in (
+            'dirlay.compact',
+            'dirlay.manifest',
+            'dirlay.materialize',
+            'dirlay.overlay',
+            'dirlay.patch',
+            'dirlay.patterns',
+            'dirlay.plan',
+            'dirlay.snapshot',
+            'dirlay.tempdir',
+        ):
+            self.assertNotIn(name, modules)
+
+    @skipUnless(IMPORT_BUDGET_US, 'DIRLAY_IMPORT_BUDGET_US is not set')
+    def test_budget(self):  # type: () -> None
+        best = min(importtime('dirlay')['dirlay'] for _ in range(IMPORT_RUNS))
+        self.assertLessEqual(
+            best,
+            IMPORT_BUDGET_US,
+            msg='import dirlay took {} us, budget is {} us'.format(
+                best, IMPORT_BUDGET_US
+            ),
+        )
@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+from dirlay import Dir, Path, key
+import dirlay
+
+
+class TestKey(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir({'a': {'b': {'c.md': 'C'}}, 'd.txt': 'D'})
+
+    def test_key(self):  # type: () -> None
+        self.assertEqual(('a', 'b', 'c.md'), key('a/./b//c.md'))
+        self.assertEqual(('a', 'b'), key(Path('a/b/c.md/..')))
+        self.assertEqual((), key('.'))
+        self.assertIs(key('a/b'), key('a/b'))
+        t = ('a', 'b')
+        self.assertIs(t, key(t))
+        with self.assertRaises(ValueError):
+            key('/a')
+        for path in ('..', '../a', 'a/../../b'):
+            with self.assertRaises(ValueError):
+                key(path)
+
+    def test_cache_size(self):  # type: () -> None
+        size = dirlay.KEY_CACHE_SIZE
+        dirlay.key_cache.clear()
+        dirlay.KEY_CACHE_SIZE = 2
+        try:
+            for i in range(5):
+                key('k{}'.format(i))
+                self.assertLessEqual(len(dirlay.key_cache), 2)
+        finally:
+            dirlay.KEY_CACHE_SIZE = size
+
+    def test_dir(self):  # type: () -> None
+        node = self.tree[key('a/b/c.md')]
+        self.assertEqual(self.tree['a/b/c.md'], node)
+        self.assertEqual('a/b/c.md', node.key)
+        self.assertTrue(('a', 'b') in self.tree)
+        self.assertFalse(('a', 'x', 'y') in self.tree)
+        self.assertFalse(('d.txt', 'y') in self.tree)
+        self.assertFalse(() in self.tree)
+        self.tree[('a', 'e', 'f.md')] = 'F'
+        self.assertEqual('F', self.tree['a/e/f.md'].data)
+        del self.tree[('a', 'b')]
+        self.assertEqual(('a', 'a/e', 'a/e/f.md', 'd.txt'), self.tree.keys())
+        with self.assertRaises(KeyError):
+            self.tree[('a', 'x', 'y')]
+        with self.assertRaises(KeyError):
+            self.tree[()]
+        with self.assertRaises(ValueError):
+            self.tree[('d.txt', 'y')]
+        with self.tree.batch():
+            self.tree[('a', 'g.md')] = ''
+            self.tree[('a', 'h.md')] = ''
+        self.assertEqual(6, len(self.tree._tree))
+
+    def test_invalid(self):  # type: () -> None
+        for k in (('a', '..'), ('a', ''), ('.', 'b'), ('a/b',)):
+            with self.assertRaises(ValueError):
+                self.tree[k] = 'X'
+            with self.assertRaises(ValueError):
+                self.tree.move('d.txt', k)
+            with self.assertRaises(ValueError):
+                self.tree.move(k, 'x')
+        self.assertEqual(('a', 'a/b', 'a/b/c.md', 'd.txt'), self.tree.keys())
+
+    def test_readonly(self):  # type: () -> None
+        for tree in (self.tree.compact(), Dir.overlay(self.tree, {'x': ''})):
+            self.assertEqual('C', tree[('a', 'b', 'c.md')].data)
+            self.assertTrue(('a', 'b') in tree)
+            self.assertFalse(('a', 'x', 'y') in tree)
+            with self.assertRaises(KeyError):
+                tree[()]
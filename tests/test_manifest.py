@@ -0,0 +1,56 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from dirlay import Dir, Path
+from dirlay.manifest import missing
+from tests.util import listing
+
+
+class TestManifest(TestCase):
+    def setUp(self):  # type: () -> None
+        self.basedir = Path(mkdtemp())
+        self.existing = Dir({'a': {'old.txt': 'O', 'b.txt': 'old'}, 'x.txt': 'X'})
+        self.existing.mktree(self.basedir)
+        self.before = listing(str(self.basedir))
+        self.tree = Dir(
+            {'a': {'b.txt': 'B', 'c': {'d.txt': 'D'}}, 'e': {}, 'f.txt': ''}
+        )
+
+    def tearDown(self):  # type: () -> None
+        shutil.rmtree(str(self.basedir))
+
+    def test_missing(self):  # type: () -> None
+        paths = missing(self.basedir, self.tree.data)
+        self.assertEqual(['a/c/', 'a/c/d.txt', 'e/', 'f.txt'], sorted(paths))
+        self.assertLess(paths.index('a/c/'), paths.index('a/c/d.txt'))
+
+    def test_rmtree(self):  # type: () -> None
+        for workers in (None, 2):
+            self.tree.mktree(self.basedir, workers=workers, pool='thread')
+            self.tree.rmtree()
+            expected = dict(self.before, **{'a/b.txt': 'B'})  # overwritten, kept
+            self.assertEqual(expected, listing(str(self.basedir)))
+
+    def test_modified(self):  # type: () -> None
+        os.remove(str(self.existing // 'a/old.txt'))  # only top level is preserved
+        del self.before['a/old.txt']
+        self.tree.mktree(self.basedir)
+        os.remove(str(self.tree // 'f.txt'))
+        self.tree |= {'g': {'h.txt': 'H'}}
+        self.tree.reset()
+        self.assertTrue((self.tree // 'g/h.txt').exists())
+        ((self.tree // 'a/c') / 'extra.txt').write_text('extra')
+        self.tree.rmtree()
+        self.assertEqual(
+            dict(self.before, **{'a/b.txt': 'B'}), listing(str(self.basedir))
+        )
+
+    def test_created(self):  # type: () -> None
+        basedir = self.basedir / 'new'
+        self.tree.mktree(basedir)
+        self.tree.rmtree()
+        self.assertFalse(basedir.exists())
@@ -0,0 +1,87 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from dirlay import Dir, Path
+from tests.util import listing
+
+
+class TestMove(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d1': {'f0': 'A', 'f1': 'B'}, 'f0': ''},
+                'd1': {'f0': 'C'},
+                'f0': 'D',
+                'f1': 'E',
+            }
+        )
+
+    def test_memory(self):  # type: () -> None
+        node = self.tree['d0/d1'].data
+        expected = self.tree.copy()
+        del expected['d0/d1']
+        expected['x/y'] = node
+        self.tree.move('d0/d1', 'x/y')
+        self.assertEqual(expected, self.tree)
+        self.assertIs(node, self.tree['x/y'].data)
+        self.assertEqual(len(self.tree.keys()), len(self.tree._tree))
+        self.tree.move(('x', 'y', 'f0'), ('f9',))
+        self.assertEqual('f9', self.tree.keys()[-1])
+
+    def test_errors(self):  # type: () -> None
+        expected = self.tree.copy()
+        for src, dst, exc in (
+            ('missing', 'x', KeyError),
+            ('d0', 'd1', ValueError),
+            ('d0', 'd0/x', ValueError),
+            ('d0', 'f0/x', ValueError),
+            ('d0', '/x', ValueError),
+        ):
+            with self.assertRaises(exc):
+                self.tree.move(src, dst)
+        self.assertEqual(expected, self.tree)
+        self.assertEqual(len(expected._tree), len(self.tree._tree))
+        for tree in (self.tree.compact(), self.tree.freeze()):
+            with self.assertRaises(TypeError):
+                tree.move('d0', 'x')
+
+    def test_batch(self):  # type: () -> None
+        expected = self.tree.copy()
+        with self.assertRaises(KeyError):
+            with self.tree.batch():
+                self.tree.move('d0', 'x/y')
+                self.tree['x/y/d1/new'] = ''
+                del self.tree['missing']
+        self.assertEqual(expected, self.tree)
+        self.assertEqual(len(expected._tree), len(self.tree._tree))
+
+    def test_rename(self):  # type: () -> None
+        with self.tree.mktree():
+            inode = os.stat(str(self.tree // 'd0/d1/f0')).st_ino
+            self.tree.move('d0/d1', 'x/y')
+            self.assertEqual(inode, os.stat(str(self.tree // 'x/y/f0')).st_ino)
+            expected = listing(str(self.tree.basedir))
+            self.tree.reset()
+            self.assertEqual(0, self.tree.stats.files)  # type: ignore[union-attr]
+            self.assertEqual(expected, listing(str(self.tree.basedir)))
+            os.mkdir(os.path.join(str(self.tree.basedir), 'z'))
+            with self.assertRaises(OSError):
+                self.tree.move('d1', 'z')
+            self.assertTrue('d1' in self.tree)
+            self.assertFalse('z' in self.tree)
+
+    def test_manifest(self):  # type: () -> None
+        basedir = Path(mkdtemp())
+        try:
+            (basedir / 'keep.txt').write_text('K')
+            self.tree.mktree(basedir)
+            self.tree.move('d0', 'x/y/d0')
+            self.tree.move('f1', 'd1/f9')
+            self.tree.rmtree()
+            self.assertEqual(['keep.txt'], os.listdir(str(basedir)))
+        finally:
+            shutil.rmtree(str(basedir))
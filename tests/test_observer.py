@@ -0,0 +1,95 @@
+import os
+from unittest import TestCase
+
+from dirlay import Dir, MaterializationStats, Observer
+
+try:
+    from typing import Any, List, Tuple  # noqa: F401  # used in type hints
+    from dirlay import Path  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class Recorder(Observer):
+    def __init__(self):  # type: () -> None
+        self.events = []  # type: List[Tuple[Any, ...]]
+
+    def on_mkdir(self, path):  # type: (Path) -> None
+        self.events.append(('mkdir', path))
+
+    def on_write(self, path, size):  # type: (Path, int) -> None
+        self.events.append(('write', path, size))
+
+    def on_chdir(self, path):  # type: (Path) -> None
+        self.events.append(('chdir', path))
+
+    def on_rmtree(self, path):  # type: (Path) -> None
+        self.events.append(('rmtree', path))
+
+
+class TestObserver(TestCase):
+    def test_events(self):  # type: () -> None
+        tree = Dir({'a': {'b.txt': 'bb', 'c': {}}})
+        rec = Recorder()
+        tree.add_observer(rec)
+        cwd = os.getcwd()
+        try:
+            tree.mktree(chdir='a')
+            base = tree.basedir
+            assert base is not None
+            tree.rmtree()
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(
+            [
+                ('mkdir', base),
+                ('mkdir', base / 'a'),
+                ('write', base / 'a/b.txt', 2),
+                ('mkdir', base / 'a/c'),
+                ('chdir', base / 'a'),
+                ('rmtree', base),
+            ],
+            sorted(rec.events[:4], key=lambda e: str(e[1])) + rec.events[4:],
+        )
+
+    def test_remove_observer(self):  # type: () -> None
+        tree = Dir({'a.txt': 'A'})
+        rec = Recorder()
+        tree.add_observer(rec)
+        tree.remove_observer(rec)
+        with tree.mktree():
+            pass
+        self.assertEqual([], rec.events)
+        with self.assertRaises(ValueError):
+            tree.remove_observer(rec)
+
+
+class TestStats(TestCase):
+    def test_not_created(self):  # type: () -> None
+        self.assertIsNone(Dir({'a.txt': 'A'}).stats)
+
+    def test_stats(self):  # type: () -> None
+        tree = Dir({'a': {'b.txt': 'bb', 'c': {'d.txt': 'ddd'}}, 'e': {}})
+        with tree.mktree():
+            stats = tree.stats
+            assert stats is not None
+            self.assertEqual(3 + 1, stats.dirs)  # including temporary basedir
+            self.assertEqual(2, stats.files)
+            self.assertEqual(5, stats.bytes)
+            self.assertEqual(0.0, stats.times['rmtree'])
+        self.assertIs(stats, tree.stats)
+        self.assertGreater(stats.times['rmtree'], 0.0)
+        self.assertEqual(
+            set(MaterializationStats.phases), set(stats.as_dict()['times'])
+        )
+        self.assertAlmostEqual(sum(stats.times.values()), stats.total_time)
+
+    def test_existing_basedir(self):  # type: () -> None
+        tree = Dir({'a.txt': 'A'})
+        with Dir().mktree() as base:
+            assert base.basedir is not None
+            tree.mktree(base.basedir)
+            assert tree.stats is not None
+            self.assertEqual(0, tree.stats.dirs)
+            self.assertEqual(1, tree.stats.files)
+            tree.rmtree()
@@ -0,0 +1,105 @@
+import os
+import pickle
+from unittest import TestCase
+
+from dirlay import WHITEOUT, Dir
+
+try:
+    from typing import Any, Dict  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class TestOverlay(TestCase):
+    def setUp(self):  # type: () -> None
+        self.base = Dir(
+            {
+                'f0': 'A',
+                'f1': '',
+                'd0': {'d0': {'f0': 'B'}, 'd1': {'f0': 'C'}},
+                'd1': {'f0': 'D'},
+                'd2': {},
+                'e': {'f.txt': 'F'},
+                'g.txt': 'G',
+            }
+        )
+        self.top = {'d0/d1/new.txt': 'N', 'e': 'file', 'g.txt': {'h': {}}}  # type: Dict[str, Any]
+
+    def test_union(self):  # type: () -> None
+        view = Dir.overlay(self.base, self.top)
+        expected = self.base | self.top
+        self.assertEqual(expected, view)
+        self.assertEqual(expected.keys(), view.keys())
+        self.assertEqual(len(expected.keys()), len(view._tree))
+        self.assertEqual('N', view['d0/d1/new.txt'].data)
+        self.assertFalse(view['e'].isdir)
+        self.assertFalse('e/f.txt' in view)
+        self.assertEqual(Dir.overlay(view, {'x': ''}), expected | {'x': ''})
+
+    def test_whiteout(self):  # type: () -> None
+        view = Dir.overlay(self.base, {'d0': WHITEOUT, 'g.txt': WHITEOUT, 'x': {}})
+        self.assertFalse('d0' in view)
+        self.assertFalse('d0/d0' in view)
+        self.assertFalse('g.txt' in view)
+        self.assertTrue('d1' in view)
+        self.assertEqual(['f0', 'f1', 'd1', 'd2', 'e', 'x'], list(view.data))
+        with self.assertRaises(KeyError):
+            view['d0/d0']
+        recreated = Dir.overlay(view, {'d0/y.txt': 'Y'})
+        self.assertEqual({'y.txt': 'Y'}, recreated['d0'].data)
+        self.assertIs(WHITEOUT, pickle.loads(pickle.dumps(WHITEOUT)))  # noqa: S301
+
+    def test_view(self):  # type: () -> None
+        view = Dir.overlay(self.base, self.top)
+        self.base['e/f.txt'].data = 'changed'
+        self.base['d2'] = 'file'
+        self.assertEqual(self.base | self.top, view)
+        with self.assertRaises(TypeError):
+            view['x'] = ''
+        with self.assertRaises(TypeError):
+            view |= {'x': ''}
+        with self.assertRaises(TypeError):
+            view.compress()
+        copy = view.copy()
+        copy['x'] = ''
+        self.assertFalse('x' in view)
+        self.assertEqual(view.data, pickle.loads(pickle.dumps(view.data)))  # noqa: S301
+
+    def test_mktree(self):  # type: () -> None
+        view = Dir.overlay(self.base, self.top, {'d1': WHITEOUT})
+        expected = self.base | self.top
+        del expected['d1']
+        with view.mktree():
+            self.assertFalse(os.path.exists(os.path.join(str(view.basedir), 'd1')))
+            with open(str(view // 'e')) as f:
+                self.assertEqual('file', f.read())
+            expected.mktree()
+            try:
+                self.assertEqual(
+                    sorted(os.listdir(str(expected.basedir))),
+                    sorted(os.listdir(str(view.basedir))),
+                )
+            finally:
+                expected.rmtree()
+        with view.mktree(workers=2, pool='process'):
+            self.assertTrue(os.path.isdir(str(view // 'g.txt/h')))
+
+    def test_stale(self):  # type: () -> None
+        base = Dir({'a.txt': 'A', 'b': {'c.txt': 'C'}})
+        view = Dir.overlay(base, {'d.txt': 'D'})
+        plan = view.compile()
+        patch = view.diff({'d.txt': 'D'})
+        sub = view.subtree('b')
+        self.assertEqual(1, len(sub._tree))
+        view.mktree()
+        self.addCleanup(view.rmtree)
+        base['a.txt'] = 'A2'
+        base['b/e.txt'] = 'E'
+        self.assertTrue(plan.stale)
+        self.assertTrue(patch.stale)
+        self.assertEqual(2, len(sub._tree))
+        self.assertEqual(5, len(view._tree))
+        view.reset()
+        with open(str(view // 'a.txt')) as f:
+            self.assertEqual('A2', f.read())
+        self.assertTrue(os.path.exists(str(view // 'b/e.txt')))
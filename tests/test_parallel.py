@@ -0,0 +1,67 @@
+import os
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.materialize import shard
+from tests.util import listing
+
+
+class TestShard(TestCase):
+    def test_cover(self):  # type: () -> None
+        tree = Dir.synthetic(3, 4, 3, size_dist=(0, 20000), lazy=False)
+        for workers in (1, 2, 3, 8):
+            ancestors, shards = shard(tree.data, workers)
+            self.assertLessEqual(len(shards), workers)
+            # parents first
+            for i, key in enumerate(ancestors):
+                parent = os.path.dirname(key)
+                if parent:
+                    self.assertIn(parent, ancestors[:i])
+            # every entry is covered exactly once
+            keys = list(ancestors)
+            for items in shards:
+                for prefix, entries in items:
+                    self.assertTrue(prefix == '' or prefix in ancestors)
+                    keys.extend(os.path.join(prefix, k) for k in Dir(entries).keys())
+            self.assertEqual(sorted(tree.keys()), sorted(keys))
+
+    def test_balance(self):  # type: () -> None
+        tree = Dir.synthetic(1, 8, 0) | {'d0': Dir.synthetic(2, 8, 8).data}
+        _, shards = shard(tree.data, 4)
+        sizes = [sum(len(Dir(e).keys()) for _, e in items) for items in shards]
+        self.assertEqual(4, len(sizes))
+        self.assertLess(max(sizes), 2 * min(sizes))
+
+
+class TestParallel(TestCase):
+    def test_mktree(self):  # type: () -> None
+        tree = Dir.synthetic(3, 3, 4, size_dist=(0, 10000), seed=3)
+        with tree.copy().mktree() as expected:
+            for pool in ('thread', 'process'):
+                with tree.mktree(workers=3, pool=pool):
+                    self.assertEqual(
+                        listing(str(expected.basedir)), listing(str(tree.basedir))
+                    )
+                    assert tree.stats is not None and expected.stats is not None
+                    self.assertEqual(expected.stats.dirs, tree.stats.dirs)
+                    self.assertEqual(expected.stats.files, tree.stats.files)
+                    self.assertEqual(expected.stats.bytes, tree.stats.bytes)
+
+    def test_error(self):  # type: () -> None
+        tree = Dir({'a': {'b': {'c.txt': 'C'}}, 'd.txt': 'D'})
+        with Dir({'a/b/c.txt': {}}).mktree() as base:
+            for pool in ('thread', 'process'):
+                with self.assertRaises(EnvironmentError):
+                    tree.mktree(base.basedir, workers=2, pool=pool)
+                tree.rmtree()
+
+    def test_invalid_pool(self):  # type: () -> None
+        with self.assertRaises(ValueError):
+            Dir({'a.txt': 'A'}).mktree(workers=2, pool='fiber')
+
+    def test_invalid_workers(self):  # type: () -> None
+        tree = Dir({'a.txt': 'A'})
+        for workers in (0, -1):
+            with self.assertRaises(ValueError):
+                tree.mktree(workers=workers)
+            self.assertIsNone(tree.basedir)
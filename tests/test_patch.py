@@ -0,0 +1,85 @@
+import os
+from unittest import TestCase
+
+from dirlay import Dir
+from tests.util import listing
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping  # type: ignore[attr-defined,unused-ignore]
+
+try:
+    from typing import Any, Dict, Iterator  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class Untouchable(Mapping):  # type: ignore[type-arg]
+    def __getitem__(self, name):  # type: (str) -> Any
+        raise AssertionError('shared subtree is visited')
+
+    def __iter__(self):  # type: () -> Iterator[str]
+        raise AssertionError('shared subtree is visited')
+
+    def __len__(self):  # type: () -> int
+        return 1
+
+
+class TestPatch(TestCase):
+    def setUp(self):  # type: () -> None
+        self.old = Dir(
+            {
+                'd0': {'d1': {'f0': 'A'}, 'f0': 'B'},
+                'd1': {'d1': {'f0': 'C'}, 'f1': 'D'},
+                'd2': {'f0': 'E'},
+                'f0': '',
+            }
+        )
+        self.new = self.old.copy()
+        self.new['d0/f0'] = 'changed'
+        self.new['d0/d1'] = 'file'
+        self.new['d1/f1'] = {'x': ''}
+        del self.new['d2']
+        self.new['d1/d1/new.txt'] = 'N'
+        self.new['e'] = {'f': {}}
+
+    def test_compute(self):  # type: () -> None
+        patch = self.old.diff(self.new)
+        self.assertEqual(('d2',), patch.removed)
+        self.assertEqual(('d0/f0',), patch.modified)
+        self.assertEqual(('d0/d1', 'd1/f1'), tuple(sorted(patch.replaced)))
+        self.assertEqual(('e', 'd1/d1/new.txt'), patch.added)
+        self.assertEqual(6, len(patch))
+        self.assertEqual(0, len(self.old.diff(self.old.copy())))
+        self.assertEqual(patch.ops, self.old.compact().diff(self.new.data).ops)
+        self.assertEqual('<Patch: 6 operations>', repr(patch))
+
+    def test_shared(self):  # type: () -> None
+        shared = Untouchable()
+        old = Dir.adopt({'big': shared, 'x': '1'}, validate='none')
+        new = Dir.adopt({'big': shared, 'x': '2'}, validate='none')
+        self.assertEqual((('modify', 'x', '2'),), old.diff(new).ops)
+
+    def test_apply(self):  # type: () -> None
+        with self.old.mktree(), self.new.mktree():
+            patch = self.old.diff(self.new)
+            os.remove(str(self.old // 'd2/f0'))
+            stats = patch.apply(str(self.old.basedir))
+            self.assertEqual(4, stats.files)
+            self.assertEqual(3, stats.dirs)
+            self.assertEqual(
+                listing(str(self.new.basedir)), listing(str(self.old.basedir))
+            )
+            patch.apply(str(self.old.basedir))  # idempotent
+            self.assertEqual(
+                listing(str(self.new.basedir)), listing(str(self.old.basedir))
+            )
+
+    def test_stale(self):  # type: () -> None
+        patch = self.old.diff(self.new)
+        self.assertFalse(patch.stale)
+        self.old['x'] = ''
+        self.assertTrue(patch.stale)
+        with self.assertRaises(RuntimeError):
+            patch.apply('.')
@@ -0,0 +1,84 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+import os
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.content import SizedContent
+from tests.util import listing
+
+try:
+    from typing import Set  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class TestPlan(TestCase):
+    def tmpdir(self):  # type: () -> str
+        path = mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        return path
+
+    def test_apply(self):  # type: () -> None
+        tree = Dir(
+            {
+                'a': {'b': {'c.txt': SizedContent(5000, seed=1)}, 'd.txt': 'D'},
+                'e.txt': '',
+                'empty': {},
+                'lines.txt': 'a\nb\n',
+            }
+        )
+        plan = tree.compile(newline='\n')
+        self.assertEqual(len(tree.keys()), len(plan))
+        with tree.mktree() as expected:
+            for _ in range(2):  # idempotent
+                basedir = os.path.join(self.tmpdir(), 'a', 'b')
+                stats = plan.apply(basedir)
+                self.assertEqual(listing(str(expected.basedir)), listing(basedir))
+            self.assertEqual(expected.stats.files, stats.files)  # type: ignore[union-attr]
+            self.assertEqual(expected.stats.bytes, stats.bytes)  # type: ignore[union-attr]
+
+    def test_order(self):  # type: () -> None
+        plan = Dir({'a/b/c.txt': 'C', 'd.txt': 'D'}).compile(encoding='utf-8')
+        created = set()  # type: Set[str]
+        for relpath, _ in plan:
+            parent = os.path.dirname(relpath)
+            self.assertTrue(parent == '' or parent in created)
+            created.add(relpath)
+
+    def test_encoding(self):  # type: () -> None
+        content = SizedContent(3, seed=0)
+        tree = Dir({'a.txt': 'é\n', 'b': content})
+        plan = tree.compile(encoding='utf-16-le', newline='\r\n')
+        ops = dict(plan.ops)
+        self.assertEqual('é\r\n'.encode('utf-16-le'), ops['a.txt'])
+        self.assertEqual(content.read().encode('utf-16-le'), ops['b'])
+
+    def test_stale(self):  # type: () -> None
+        tree = Dir({'a': {'b.txt': 'B'}})
+
+        def update():  # type: () -> None
+            tree.update({'c': {}})
+
+        def set_data():  # type: () -> None
+            tree['a/b.txt'].data = 'X'
+
+        def delete():  # type: () -> None
+            del tree._tree['a']
+
+        for mutate in (update, set_data, delete):
+            plan = tree.compile()
+            self.assertFalse(plan.stale)
+            mutate()
+            self.assertTrue(plan.stale)
+            with self.assertRaises(RuntimeError):
+                plan.apply(self.tmpdir())
+
+    def test_node_data_len(self):  # type: () -> None
+        tree = Dir({'a': {'b.txt': 'B'}})
+        tree['a'].data = {'c': {}, 'd': ''}
+        self.assertEqual(3, len(tree._tree))
+        self.assertEqual(('a', 'a/c', 'a/d'), tree.keys())
@@ -0,0 +1,77 @@
+# encoding: utf-8
+from __future__ import unicode_literals
+
+from multiprocessing import Pool
+import os
+import sys
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.content import CompressedContent, SizedContent
+from tests.util import listing
+
+
+def read(args):  # type: (tuple[str, str]) -> object
+    path, key = args
+    return Dir.attach(path)[key].data
+
+
+class TestPublish(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d1': {'f0': 'A\nB\n', 'f1': ''}, 'f0': 'C'},
+                'd1': {'f0': 'D' * 50},
+                'e': {},
+                'lazy': SizedContent(10),
+                'z.txt': CompressedContent.from_text('Z' * 1000),
+            }
+        )
+        self.path = str(self.tree.publish())
+
+    def tearDown(self):  # type: () -> None
+        os.remove(self.path)
+
+    def test_attach(self):  # type: () -> None
+        tree = Dir.attach(self.path)
+        self.assertEqual(self.tree, tree)
+        self.assertEqual(self.tree.keys(), tree.keys())
+        self.assertEqual('Z' * 1000, tree['z.txt'].data)
+        self.assertEqual(SizedContent(10), tree.data['lazy'])
+        with self.assertRaises(TypeError):
+            tree |= {'new': ''}
+        if sys.version_info >= (3,):
+            self.assertIsInstance(tree._tree.store.buffer, memoryview)  # type: ignore[attr-defined]
+        with tree.mktree() as t, self.tree.mktree() as expected:
+            self.assertEqual(listing(str(expected.basedir)), listing(str(t.basedir)))
+
+    def test_unicode(self):  # type: () -> None
+        path = Dir({'a': {'u.txt': 'é\n'}}).publish()
+        self.assertEqual('é\n', Dir.attach(path)['a/u.txt'].data)
+        os.remove(str(path))
+
+    def test_path(self):  # type: () -> None
+        tmp = mkdtemp()
+        path = os.path.join(tmp, 'layout')
+        self.assertEqual(path, str(Dir.attach(self.path).publish(path)))
+        self.assertEqual(self.tree, Dir.attach(path))
+        self.assertEqual(['layout'], os.listdir(tmp))
+        os.remove(path)
+        os.rmdir(tmp)
+
+    def test_processes(self):  # type: () -> None
+        keys = [k for k, n in self.tree.items() if not n.isdir]
+        pool = Pool(2)
+        try:
+            data = pool.map(read, [(self.path, k) for k in keys])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual([self.tree[k].data for k in keys], data)
+
+    def test_invalid(self):  # type: () -> None
+        with open(self.path, 'wb') as f:
+            f.write(b'{"a": "b"}' * 10)
+        with self.assertRaises(ValueError):
+            Dir.attach(self.path)
@@ -0,0 +1,138 @@
+import os
+import shutil
+import subprocess
+import sys
+from tempfile import mkdtemp
+from textwrap import dedent
+from unittest import TestCase, skipIf
+
+try:
+    import pytest
+except ImportError:
+    pytest = None  # type: ignore[assignment]
+
+import dirlay
+from dirlay import Dir
+from dirlay.content import FileRef, SizedContent
+
+try:
+    from typing import List, Tuple  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+TESTS = """
+import os
+from pathlib import Path
+
+import pytest
+
+from dirlay import Dir
+
+LAYOUT = {'a': {'b.txt': 'B'}, 'c': {}}
+
+
+@pytest.mark.parametrize('i', range(3))
+@pytest.mark.dirlay(LAYOUT)
+def test_mutate(dirlay, i):
+    assert (dirlay // 'a/b.txt').read_text() == 'B'
+    assert sorted(os.listdir(str(dirlay.basedir))) == ['a', 'c']
+    (dirlay // 'a/b.txt').write_text('changed')
+    (dirlay // 'c' / 'new.txt').write_text('new')
+
+
+@pytest.mark.dirlay(Dir(LAYOUT), chdir='a')
+def test_chdir(dirlay):
+    assert Path('b.txt').read_text() == 'B'
+    (dirlay // 'a/b.txt').write_text('changed')
+    dirlay.reset()
+    assert Path('b.txt').read_text() == 'B'
+
+
+def test_empty(dirlay):
+    assert os.listdir(str(dirlay.basedir)) == []
+"""
+
+
+@skipIf(pytest is None, 'pytest is not installed')
+class TestPytestPlugin(TestCase):
+    def run_pytest(self, *args):  # type: (str) -> Tuple[int, str, List[str]]
+        tmp = mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        with open(os.path.join(tmp, 'test_layouts.py'), 'w') as f:
+            f.write(dedent(TESTS))
+        basetemp = os.path.join(tmp, 'basetemp')
+        env = dict(os.environ)  # dirlay may be imported from source, not installed
+        src = os.path.dirname(os.path.dirname(os.path.abspath(dirlay.__file__)))
+        env['PYTHONPATH'] = os.pathsep.join([src, env.get('PYTHONPATH', '')])
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'pytest', '-p', 'no:cacheprovider']
+            + ['-p', 'dirlay.pytest_plugin']
+            + ['--basetemp', basetemp, '-o', 'addopts=']
+            + list(args),
+            cwd=tmp,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+        )
+        stdout, _ = proc.communicate()
+        cache = os.path.join(basetemp, 'dirlay-cache')
+        return proc.returncode, stdout, os.listdir(cache)
+
+    def test_fixture(self):  # type: () -> None
+        code, stdout, cache = self.run_pytest('--dirlay-durations=2')
+        self.assertEqual(0, code, stdout)
+        self.assertIn('5 passed', stdout)
+        self.assertEqual(2, len(cache))  # LAYOUT and empty
+        self.assertIn('dirlay layout durations', stdout)
+        self.assertIn('5 tests, setup', stdout)
+        self.assertEqual(2, stdout.count('s teardown  test_layouts.py::'))
+
+
+@skipIf(pytest is None, 'pytest is not installed')
+class TestClone(TestCase):
+    def test_links(self):  # type: () -> None
+        from dirlay.pytest_plugin import clone
+
+        tmp = mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        sample = os.path.join(tmp, 'sample.txt')
+        with open(sample, 'w') as f:
+            f.write('S')
+        layout = Dir(
+            {
+                'a': {'hard.txt': FileRef(sample, mode='hardlink')},
+                'soft.txt': FileRef(sample, mode='symlink'),
+                'copy.txt': FileRef(sample),
+            }
+        )
+        source = os.path.join(tmp, 'source')
+        layout.copy().mktree(source)
+        tree = clone(layout, source, os.path.join(tmp, 'target'))
+        self.assertTrue(os.path.islink(str(tree // 'soft.txt')))
+        self.assertFalse(os.path.islink(str(tree // 'copy.txt')))
+        self.assertTrue(os.path.samefile(sample, str(tree // 'a/hard.txt')))
+        self.assertFalse(os.path.samefile(sample, str(tree // 'copy.txt')))
+        tree.rmtree()
+        with open(sample) as f:
+            self.assertEqual('S', f.read())
+
+
+class TestFingerprint(TestCase):
+    @skipIf(pytest is None, 'pytest is not installed')
+    def test_fingerprint(self):  # type: () -> None
+        from dirlay.pytest_plugin import fingerprint
+
+        a = Dir({'a': {'b.txt': 'B'}, 'c': SizedContent(10)})
+        self.assertEqual(
+            fingerprint(a.data),
+            fingerprint(Dir({'c': SizedContent(10), 'a/b.txt': 'B'}).data),
+        )
+        for b in (
+            a | {'d': {}},
+            a | {'a/b.txt': 'X'},
+            a | {'c': SizedContent(10, seed=1)},
+            Dir({'a/b.txt': 'B', 'c': {}}),
+        ):
+            self.assertNotEqual(fingerprint(a.data), fingerprint(b.data))
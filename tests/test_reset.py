@@ -0,0 +1,153 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import time
+from tempfile import mkdtemp
+from unittest import TestCase
+
+import dirlay.snapshot
+from dirlay import Dir
+from tests.util import listing
+
+try:
+    from typing import Any, List, Optional  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+class TestReset(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d0': {'f0': 'A'}, 'f0': 'abc\n'},
+                'd1': {'f0': 'B'},
+                'e': {},
+                'f0': 'C',
+                'f1': 'D\n',
+            }
+        )
+        self.tree.mktree()
+        self.addCleanup(self.tree.rmtree)
+        self.pristine = listing(str(self.tree.basedir))
+
+    def assertPristine(self):  # type: () -> None
+        self.assertEqual(self.pristine, listing(str(self.tree.basedir)))
+
+    def test_unchanged(self):  # type: () -> None
+        self.tree.reset()
+        self.assertPristine()
+        self.assertEqual(0, self.tree.stats.files)  # type: ignore[union-attr]
+        self.assertEqual(0, self.tree.stats.dirs)  # type: ignore[union-attr]
+
+    def test_changed(self):  # type: () -> None
+        path = self.tree // 'd0/f0'
+        with open(str(path), 'r+') as f:  # same size, immediately after mktree
+            f.write('cba\n')
+        self.tree.reset()
+        self.assertPristine()
+        self.assertEqual(1, self.tree.stats.files)  # type: ignore[union-attr]
+        # reset after reset
+        path.write_text('changed')
+        self.tree.reset()
+        self.assertPristine()
+        self.assertEqual(1, self.tree.stats.files)  # type: ignore[union-attr]
+
+    def test_snapshot_mktree(self):  # type: () -> None
+        # signatures recorded when written are trusted without reading content
+        snapshot = dirlay.snapshot
+        for name in ('RACY_NS', 'RACY_FINE_NS', 'same'):
+            self.addCleanup(setattr, snapshot, name, getattr(snapshot, name))
+        snapshot.RACY_NS = snapshot.RACY_FINE_NS = 0
+        compared = []  # type: List[str]
+        same = snapshot.same
+
+        def spy(path, value, encoding=None, newline=None):
+            # type: (str, Any, Optional[str], Optional[str]) -> bool
+            compared.append(os.path.basename(path))
+            return same(path, value, encoding, newline)
+
+        snapshot.same = spy
+        for workers in (None, 2):
+            tree = Dir({'a': {'b.txt': 'B'}, 'c.txt': 'C'})
+            tree.mktree(workers=workers, pool='thread')
+            self.addCleanup(tree.rmtree)
+            self.assertEqual(['a/b.txt', 'c.txt'], sorted(tree._snapshot or {}))
+            (tree // 'a/b.txt').write_text('changed')
+            del compared[:]
+            tree.reset()
+            self.assertEqual(['b.txt'], compared)
+            self.assertEqual('B', (tree // 'a/b.txt').read_text())
+            self.assertEqual(1, tree.stats.files)  # type: ignore[union-attr]
+
+    def test_added_deleted(self):  # type: () -> None
+        os.remove(str(self.tree // 'f1'))
+        shutil.rmtree(str(self.tree // 'd1'))
+        (self.tree // 'e' / 'x.txt').write_text('added')
+        os.makedirs(str(self.tree // 'd0' / 'x' / 'y'))
+        self.tree.reset()
+        self.assertPristine()
+
+    def test_type_changed(self):  # type: () -> None
+        os.remove(str(self.tree // 'f0'))
+        os.mkdir(str(self.tree // 'f0'))
+        shutil.rmtree(str(self.tree // 'd0/d0'))
+        (self.tree // 'd0/d0').write_text('file')
+        self.tree.reset()
+        self.assertPristine()
+
+    def test_layout_modified(self):  # type: () -> None
+        self.tree['f0'].data = 'new'
+        self.tree |= {'g.txt': 'G'}
+        self.tree.reset()
+        self.pristine.update({'f0': 'new', 'g.txt': 'G'})
+        self.assertPristine()
+        self.tree.reset()
+        self.assertEqual(0, self.tree.stats.files)  # type: ignore[union-attr]
+
+    def test_foreign(self):  # type: () -> None
+        basedir = mkdtemp()
+        self.addCleanup(shutil.rmtree, basedir)
+        os.mkdir(os.path.join(basedir, 'foreign'))
+        tree = Dir({'a.txt': 'A'}).mktree(basedir)
+        os.mkdir(os.path.join(basedir, 'added'))
+        tree.reset()
+        self.assertEqual(['a.txt', 'foreign'], sorted(os.listdir(basedir)))
+
+    def test_foreign_nested(self):  # type: () -> None
+        basedir = mkdtemp()
+        self.addCleanup(shutil.rmtree, basedir)
+        os.makedirs(os.path.join(basedir, 'src', 'old'))
+        with open(os.path.join(basedir, 'src', 'keep.py'), 'w') as f:
+            f.write('K')
+        tree = Dir({'src': {'a.py': 'A'}}).mktree(basedir)
+        (tree // 'src' / 'added.py').write_text('added')
+        tree.reset()
+        self.assertEqual(
+            ['a.py', 'keep.py', 'old'], sorted(os.listdir(str(tree // 'src')))
+        )
+        tree.rmtree()
+        src = os.path.join(basedir, 'src')
+        self.assertEqual(['keep.py', 'old'], sorted(os.listdir(src)))
+
+    def test_mtime_kept(self):  # type: () -> None
+        path = str(self.tree // 'd0/f0')
+        mtime = os.stat(path).st_mtime
+        self.assertGreater(mtime, time.time() - 1)  # not backdated by mktree
+        self.tree.reset()
+        self.assertEqual(mtime, os.stat(path).st_mtime)
+        self.assertEqual(0, self.tree.stats.files)  # type: ignore[union-attr]
+
+    def test_snapshot(self):  # type: () -> None
+        old = time.time() - 10
+        for _, node in self.tree.items():
+            if not node.isdir:
+                os.utime(str(node.abspath), (old, old))
+        self.tree.reset()
+        files = [k for k, n in self.tree.items() if not n.isdir]
+        snap = self.tree._snapshot or {}
+        self.assertEqual(sorted(files), sorted(snap))
+        (self.tree // 'f0').write_text('changed')
+        self.tree.reset()
+        self.assertPristine()
+        self.assertEqual(1, self.tree.stats.files)  # type: ignore[union-attr]
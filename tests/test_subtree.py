@@ -0,0 +1,112 @@
+import os
+from unittest import TestCase
+
+from dirlay import Dir, FrozenDir
+from dirlay.patterns import select
+from tests.util import listing
+
+
+class TestSubtree(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {'d1': {'d0': {'f0': 'A'}, 'f0': 'B', 'f1': ''}, 'f0': 'C'},
+                'd1': {'f0': 'D'},
+                'f0': 'E',
+            }
+        )
+
+    def test_view(self):  # type: () -> None
+        view = self.tree.subtree('d0/d1')
+        self.assertIs(self.tree['d0/d1'].data, view.data)
+        self.assertEqual(len(view.keys()), len(view._tree))
+        count = len(self.tree._tree)
+        version = self.tree._tree.version
+        view['new/x.txt'] = 'X'
+        del view['f0']
+        self.assertEqual('X', self.tree['d0/d1/new/x.txt'].data)
+        self.assertFalse('d0/d1/f0' in self.tree)
+        self.assertEqual(count + 1, len(self.tree._tree))
+        self.assertLess(version, self.tree._tree.version)
+        self.tree['d0/d1/new/y.txt'] = 'Y'
+        self.tree.update({'d0/d1/d0': 'file'})
+        self.assertEqual(len(view.keys()), len(view._tree))
+        nested = view.subtree('new')
+        nested['z.txt'] = ''
+        self.assertEqual(['x.txt', 'y.txt', 'z.txt'], list(view['new'].data))  # type: ignore[arg-type]
+        self.assertEqual(len(self.tree.keys()), len(self.tree._tree))
+
+    def test_errors(self):  # type: () -> None
+        with self.assertRaises(KeyError):
+            self.tree.subtree('missing')
+        with self.assertRaises(ValueError):
+            self.tree.subtree('d0/f0')
+        with self.assertRaises(ValueError):
+            self.tree.subtree('/d0')
+
+    def test_readonly(self):  # type: () -> None
+        expected = self.tree['d0'].data
+        for tree in (self.tree.freeze(), self.tree.compact(), Dir.overlay(self.tree)):
+            view = tree.subtree('d0')
+            self.assertEqual(expected, view.data)
+            with self.assertRaises(TypeError):
+                view['x'] = ''
+        self.assertIsInstance(self.tree.freeze().subtree('d0'), FrozenDir)
+        compact = self.tree.compact().subtree('d0')
+        self.assertEqual(compact.data, Dir.attach(compact.publish()).data)
+
+    def test_thaw(self):  # type: () -> None
+        frozen = self.tree.freeze()
+        tree = frozen.thaw()
+        tree.subtree('d0')['x'] = ''
+        self.assertFalse('d0/x' in frozen)
+        self.assertTrue('d0/x' in tree)
+
+
+class TestSelect(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'src': {'pkg': {'a.py': '', 'b.txt': ''}, '__pycache__': {'a.pyc': ''}},
+                'docs': {'c.py': '', 'index.md': ''},
+                'setup.py': '',
+            }
+        )
+
+    def test_select(self):  # type: () -> None
+        data = self.tree.data
+        self.assertIs(data, select(data))
+        self.assertEqual(
+            {'src': {'pkg': {'a.py': ''}}, 'docs': {'c.py': ''}, 'setup.py': ''},
+            select(data, ['**/*.py']),
+        )
+        self.assertEqual(
+            {'src': {'pkg': {'a.py': '', 'b.txt': ''}}},
+            select(data, ['src/**'], ['**/__pycache__']),
+        )
+        self.assertIs(data['docs'], select(data, ['docs'])['docs'])
+        self.assertEqual({}, select(data, ['missing/*']))
+        self.assertEqual({'docs': {'index.md': ''}}, select(data, ['d*/[i]*']))
+
+    def test_mktree(self):  # type: () -> None
+        with self.tree.mktree(
+            include='src/**', exclude=['**/*.txt', '**/__pycache__/']
+        ):
+            self.assertEqual(
+                {'src': None, 'src/pkg': None, 'src/pkg/a.py': ''},
+                listing(str(self.tree.basedir)),
+            )
+            self.assertEqual(1, self.tree.stats.files)  # type: ignore[union-attr]
+            os.remove(str(self.tree // 'src/pkg/a.py'))
+            self.tree.reset()
+            self.assertEqual(
+                {'src': None, 'src/pkg': None, 'src/pkg/a.py': ''},
+                listing(str(self.tree.basedir)),
+            )
+        with self.tree.mktree(exclude='src', workers=2, pool='thread'):
+            self.assertEqual(
+                ['docs', 'docs/c.py', 'docs/index.md', 'setup.py'],
+                sorted(listing(str(self.tree.basedir))),
+            )
+        with self.tree.mktree():
+            self.assertEqual(6, self.tree.stats.files)  # type: ignore[union-attr]
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.content import SizedContent
+
+
+class TestSynthetic(TestCase):
+    def test_shape(self):  # type: () -> None
+        tree = Dir.synthetic(depth=3, fanout=2, files_per_dir=2)
+        dirs = 2 + 4 + 8
+        self.assertEqual(dirs + 2 * (dirs + 1), len(tree._tree))
+        self.assertEqual(len(tree.keys()), len(tree._tree))
+        self.assertTrue('d1/d0/d1/f1' in tree)
+        self.assertFalse('d1/d0/d1/d0' in tree)
+        self.assertEqual('', tree['d1/f0'].data)
+
+    def test_deterministic(self):  # type: () -> None
+        def make(seed):  # type: (int) -> Dir
+            return Dir.synthetic(2, 3, 4, size_dist=(0, 100), seed=seed)
+
+        self.assertEqual(make(1), make(1))
+        self.assertNotEqual(make(1), make(2))
+
+    def test_size_dist(self):  # type: () -> None
+        for size_dist, sizes in (
+            (5, {5}),
+            ((1, 3), {1, 2, 3}),
+            (lambda rng: rng.choice([4, 8]), {4, 8}),
+        ):
+            tree = Dir.synthetic(2, 4, 8, size_dist=size_dist)
+            self.assertEqual(
+                sizes,
+                {len(n.data) for n in tree.values() if not n.isdir},  # type: ignore[arg-type]
+            )
+
+    def test_lazy(self):  # type: () -> None
+        lazy = Dir.synthetic(1, 1, 1, size_dist=10)
+        eager = Dir.synthetic(1, 1, 1, size_dist=10, lazy=False)
+        self.assertIsInstance(lazy.data['f0'], SizedContent)
+        self.assertEqual(lazy['d0/f0'].data, eager['d0/f0'].data)
+
+    def test_mktree(self):  # type: () -> None
+        tree = Dir.synthetic(2, 2, 2, size_dist=(0, 200000), seed=7)
+        with tree.mktree():
+            for node in tree.values():
+                assert node.abspath is not None
+                if node.isdir:
+                    self.assertTrue(node.abspath.is_dir())
+                else:
+                    self.assertEqual(node.data, node.abspath.read_text())
+
+    def test_name_pattern(self):  # type: () -> None
+        tree = Dir.synthetic(2, 1, 1, name_pattern='{kind}{level}-{index}')
+        self.assertEqual(
+            ('f1-0', 'd1-0', 'd1-0/f2-0', 'd1-0/d2-0', 'd1-0/d2-0/f3-0'),
+            tree.keys(),
+        )
+        with self.assertRaises(ValueError):
+            Dir.synthetic(1, 2, 1, name_pattern='{kind}')
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dirlay import Dir
+from dirlay.content import SizedContent
+from dirlay.tempdir import candidates, estimate_size, is_tmpfs, temp_parent
+
+
+MOUNTS = """\
+overlay / overlay rw,relatime 0 0
+tmpfs /dev/shm tmpfs rw,nosuid,nodev 0 0
+/dev/sda1 /dev/shm/disk ext4 rw 0 0
+tmpfs /run/user/1000 tmpfs rw 0 0
+"""
+
+
+class TestTempdir(TestCase):
+    def setUp(self):  # type: () -> None
+        fd, self.mounts = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write(MOUNTS)
+        self.addCleanup(os.remove, self.mounts)
+
+    def test_is_tmpfs(self):  # type: () -> None
+        self.assertTrue(is_tmpfs('/dev/shm', self.mounts))
+        self.assertTrue(is_tmpfs('/dev/shm/x/y', self.mounts))
+        self.assertTrue(is_tmpfs('/run/user/1000', self.mounts))
+        self.assertFalse(is_tmpfs('/dev/shm/disk/x', self.mounts))
+        self.assertFalse(is_tmpfs('/dev/shmem', self.mounts))
+        self.assertFalse(is_tmpfs('/tmp', self.mounts))
+        self.assertFalse(is_tmpfs('/dev/shm', '/nonexistent/mounts'))
+
+    def test_estimate_size(self):  # type: () -> None
+        tree = Dir({'a': {'b': '', 'c': 'x' * 4097}, 'd': SizedContent(1)})
+        self.assertEqual(4096 + 0 + 8192 + 4096, estimate_size(tree.data))
+
+    def test_temp_parent(self):  # type: () -> None
+        self.assertIsNone(temp_parent('disk', 0, self.mounts))
+        self.assertIsNone(temp_parent('auto', 0, '/nonexistent/mounts'))
+        self.assertIsNone(temp_parent('auto', 2**62, self.mounts))
+        with self.assertRaises(RuntimeError):
+            temp_parent('tmpfs', 2**62, self.mounts)
+        with self.assertRaises(ValueError):
+            temp_parent('ram', 0, self.mounts)
+        if '/dev/shm' in candidates():
+            self.assertEqual('/dev/shm', temp_parent('auto', 0, self.mounts))
+
+    def test_mktree(self):  # type: () -> None
+        tree = Dir({'a': {'b.txt': 'B'}})
+        with self.assertRaises(ValueError):
+            tree.mktree(temp='ram')
+        with tree.mktree(temp='disk'):
+            parent = os.path.dirname(str(tree.basedir))
+            self.assertEqual(os.path.realpath(tempfile.gettempdir()), parent)
+        with tree.mktree(temp='auto'):
+            self.assertTrue((tree // 'a/b.txt').exists())
+        basedir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, basedir)
+        with tree.mktree(basedir, temp='tmpfs'):  # ignored
+            self.assertEqual(basedir, str(tree.basedir))
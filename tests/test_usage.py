@@ -166,3 +166,43 @@ class UsageTree(TestCase):
 
     >>> tree.rmtree()
     """
+
+
+@skipIf(sys.version_info < (3,), 'non-ASCII output')
+@case
+class UsageTextTree(TestCase):
+    """
+    Print as plain text tree
+
+    Plain text tree is written line by line and does not require `rich`; directory
+    names end with `/`:
+
+    >>> tree = Dir({'a': {'b/c.txt': 'ccc', 'd.txt': 'ddd'}, 'e': {}})
+    >>> tree.format_tree()
+    .
+    ├── a/
+    │   ├── b/
+    │   │   └── c.txt
+    │   └── d.txt
+    └── e/
+
+    Limit the depth and display file content:
+
+    >>> tree.format_tree(show_data=True, max_depth=2)
+    .
+    ├── a/
+    │   ├── b/
+    │   └── d.txt
+    │         ddd
+    └── e/
+
+    Any text stream can be used as output:
+
+    >>> import io
+    >>> buf = io.StringIO()
+    >>> tree.format_tree(fp=buf, max_depth=1)
+    >>> print(buf.getvalue().rstrip())
+    .
+    ├── a/
+    └── e/
+    """
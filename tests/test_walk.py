@@ -0,0 +1,67 @@
+import os
+from unittest import TestCase
+
+from dirlay import Dir
+
+try:
+    from typing import Any, Iterable, List, Tuple  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+def walked(items):  # type: (Iterable[Tuple[str, List[str], List[str]]]) -> List[Any]
+    # os.walk order of directory entries is arbitrary
+    return sorted((d, sorted(dn), sorted(fn)) for d, dn, fn in items)
+
+
+class TestWalk(TestCase):
+    def setUp(self):  # type: () -> None
+        self.tree = Dir(
+            {
+                'd0': {
+                    'd0': {'d0': {}, 'd1': {'f0': 'A'}},
+                    'd1': {'f0': 'B'},
+                    'd2': {'f0': ''},
+                    'empty': {},
+                    'f0': 'C',
+                },
+                'd1': {'d0': {}},
+                'e': {},
+                'f0': 'D',
+            }
+        )
+
+    def test_os_walk(self):  # type: () -> None
+        with self.tree.mktree(chdir=True):
+            for topdown in (True, False):
+                self.assertEqual(
+                    walked(os.walk('.', topdown=topdown)),
+                    walked(self.tree.walk(topdown=topdown)),
+                )
+            self.assertEqual(
+                walked(os.walk('d0')), walked(self.tree.walk(self.tree / 'd0'))
+            )
+
+    def test_order(self):  # type: () -> None
+        topdown = [d for d, _, _ in self.tree.walk()]
+        self.assertEqual(['.', './d0', './d0/d0'], topdown[:3])
+        bottomup = [d for d, _, _ in self.tree.walk(topdown=False)]
+        self.assertEqual(sorted(topdown), sorted(bottomup))
+        self.assertEqual(['./d0/d0/d0', './d0/d0/d1'], bottomup[:2])
+        self.assertEqual('.', bottomup[-1])
+
+    def test_prune(self):  # type: () -> None
+        visited = []
+        for dirpath, dirnames, _ in self.tree.walk():
+            visited.append(dirpath)
+            dirnames[:] = [d for d in dirnames if d != 'd1'] + ['missing']
+        self.assertIn('./d0/d2', visited)
+        self.assertFalse([d for d in visited if 'd1' in d or 'missing' in d])
+
+    def test_top(self):  # type: () -> None
+        self.assertEqual([('d0/empty', [], [])], list(self.tree.walk('d0/empty')))
+        self.assertEqual([], list(self.tree.walk('d0/f0')))
+        self.assertEqual([], list(self.tree.walk('missing')))
+        self.assertEqual(list(self.tree.walk()), list(self.tree.compact().walk()))
+        with self.assertRaises(ValueError):
+            self.tree.walk('/d0')
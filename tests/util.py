@@ -0,0 +1,18 @@
+import os
+
+try:
+    from typing import Dict, Optional  # noqa: F401  # used in type hints
+except ImportError:
+    pass
+
+
+def listing(basedir):  # type: (str) -> Dict[str, Optional[str]]
+    ret = {}  # type: Dict[str, Optional[str]]
+    for root, dirs, files in os.walk(basedir):
+        rel = os.path.relpath(root, basedir)
+        for d in dirs:
+            ret[os.path.normpath(os.path.join(rel, d))] = None
+        for f in files:
+            with open(os.path.join(root, f)) as fp:
+                ret[os.path.normpath(os.path.join(rel, f))] = fp.read()
+    return ret